@@ -0,0 +1,379 @@
+"""Platform-neutral access to displays, windows, the cursor and screen pixels.
+
+``record.py`` and ``screenshot.py`` talk to a :class:`CaptureBackend` instead of
+calling Quartz/AppKit directly, so the capture pipeline can be imported,
+tested and profiled anywhere:
+
+* :class:`QuartzBackend` – macOS (Quartz window server + ``mss``).
+* :class:`X11Backend` – Linux/X11 (EWMH window list via python-xlib + ``mss``).
+* :class:`SyntheticBackend` – deterministic in-memory displays, windows, frames
+  and input events for headless CI.
+
+Displays are ``mss``-style monitor dicts (``left``/``top``/``width``/``height``
+plus ``id``, ``is_main``, ``is_builtin``).  Windows are dicts using the Quartz
+key names (``kCGWindowOwnerName``, ``kCGWindowName``, ``kCGWindowBounds`` …),
+listed frontmost first.  Frames expose the ``mss.ScreenShot`` attributes the
+pipeline uses: ``width``, ``height``, ``size``, ``raw`` (BGRA) and ``rgb``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Region = Dict[str, int]
+MoveFn = Callable[[float, float], None]
+ClickFn = Callable[[float, float, object, bool], None]
+ScrollFn = Callable[[float, float, int, int], None]
+
+BACKENDS = ("quartz", "x11", "synthetic")
+
+###############################################################################
+# Interface                                                                   #
+###############################################################################
+
+
+class CaptureBackend(ABC):
+    """Interface every capture backend implements."""
+
+    name = "base"
+
+    @abstractmethod
+    def displays(self) -> List[dict]:
+        """Return the active displays in global coordinates."""
+
+    @abstractmethod
+    def windows(self) -> List[dict]:
+        """Return on-screen windows, frontmost first, as Quartz-style dicts."""
+
+    @abstractmethod
+    def cursor_position(self) -> Tuple[float, float]:
+        """Return the cursor position in global coordinates."""
+
+    @abstractmethod
+    def grab(self, region: Region):
+        """Capture *region* (``left``/``top``/``width``/``height``) and return a frame."""
+
+    def listen(self, on_move: MoveFn, on_click: ClickFn, on_scroll: ScrollFn):
+        """Return an unstarted input listener with ``start()``/``stop()``.
+
+        Callbacks follow ``pynput.mouse.Listener`` signatures and may be called
+        from a background thread.
+        """
+        from pynput import mouse
+        return mouse.Listener(on_move=on_move, on_click=on_click, on_scroll=on_scroll)
+
+    def capture_allowed(self) -> bool:
+        """Return True if this process may capture the screen."""
+        return True
+
+    def request_access(self) -> None:
+        """Ask the OS for screen-capture permission (no-op where not needed)."""
+
+    def close(self) -> None:
+        """Release native resources."""
+
+    def __enter__(self) -> "CaptureBackend":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _MssMixin:
+    """Lazily-created ``mss`` grabber shared by the native backends."""
+
+    _sct = None
+
+    def _mss(self):
+        if self._sct is None:
+            import mss
+            self._sct = mss.mss()
+        return self._sct
+
+    def grab(self, region: Region):
+        return self._mss().grab(region)
+
+    def close(self) -> None:
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
+
+###############################################################################
+# macOS                                                                       #
+###############################################################################
+
+
+class QuartzBackend(_MssMixin, CaptureBackend):
+    """macOS backend built on the Quartz window server APIs."""
+
+    name = "quartz"
+
+    def __init__(self) -> None:
+        import Quartz
+        self._q = Quartz
+
+    def displays(self) -> List[dict]:
+        Q = self._q
+        err, ids, cnt = Q.CGGetActiveDisplayList(16, None, None)
+        if err != Q.kCGErrorSuccess:  # pragma: no cover (defensive)
+            raise OSError(f"CGGetActiveDisplayList failed: {err}")
+        out = []
+        for did in ids[:cnt]:
+            r = Q.CGDisplayBounds(did)
+            out.append({
+                "id": did,
+                "left": int(r.origin.x),
+                "top": int(r.origin.y),
+                "width": int(r.size.width),
+                "height": int(r.size.height),
+                "is_main": bool(Q.CGDisplayIsMain(did)),
+                "is_builtin": bool(Q.CGDisplayIsBuiltin(did)),
+            })
+        return out
+
+    def windows(self) -> List[dict]:
+        Q = self._q
+        return list(Q.CGWindowListCopyWindowInfo(Q.kCGWindowListOptionAll, Q.kCGNullWindowID))
+
+    def cursor_position(self) -> Tuple[float, float]:
+        loc = self._q.CGEventGetLocation(self._q.CGEventCreate(None))
+        return (loc.x, loc.y)
+
+    def capture_allowed(self) -> bool:
+        return bool(self._q.CGPreflightScreenCaptureAccess())
+
+    def request_access(self) -> None:
+        self._q.CGRequestScreenCaptureAccess()
+
+
+###############################################################################
+# Linux / X11                                                                 #
+###############################################################################
+
+
+class X11Backend(_MssMixin, CaptureBackend):
+    """Linux backend using the EWMH stacking list of an X11 window manager."""
+
+    name = "x11"
+
+    def __init__(self) -> None:
+        from Xlib import X, display
+        self._X = X
+        self._dpy = display.Display()
+        self._root = self._dpy.screen().root
+        self._atoms = {
+            name: self._dpy.intern_atom(name)
+            for name in ("_NET_CLIENT_LIST_STACKING", "_NET_WM_NAME", "_NET_WM_STATE",
+                         "_NET_WM_STATE_HIDDEN", "UTF8_STRING")
+        }
+
+    def displays(self) -> List[dict]:
+        out = []
+        for i, m in enumerate(self._mss().monitors[1:]):
+            out.append({
+                "id": i, "left": m["left"], "top": m["top"], "width": m["width"], "height": m["height"],
+                "is_main": i == 0, "is_builtin": False,
+            })
+        return out
+
+    def _prop(self, win, atom, kind):
+        prop = win.get_full_property(self._atoms[atom], kind)
+        return prop.value if prop is not None else None
+
+    def windows(self) -> List[dict]:
+        X = self._X
+        stacking = self._prop(self._root, "_NET_CLIENT_LIST_STACKING", X.AnyPropertyType)
+        out = []
+        for wid in reversed(list(stacking or [])):   # EWMH lists bottom-to-top
+            win = self._dpy.create_resource_object("window", wid)
+            try:
+                if win.get_attributes().map_state != X.IsViewable:
+                    continue
+                state = self._prop(win, "_NET_WM_STATE", X.AnyPropertyType)
+                if state is not None and self._atoms["_NET_WM_STATE_HIDDEN"] in state:
+                    continue
+                geom = win.get_geometry()
+                pos = win.translate_coords(self._root, 0, 0)
+                name = self._prop(win, "_NET_WM_NAME", self._atoms["UTF8_STRING"])
+                if isinstance(name, bytes):
+                    name = name.decode("utf-8", "replace")
+                wm_class = win.get_wm_class()
+            except Exception:   # window vanished while we were looking at it
+                continue
+            out.append({
+                "kCGWindowNumber": wid,
+                "kCGWindowOwnerName": wm_class[1] if wm_class else "",
+                "kCGWindowName": name or win.get_wm_name() or "",
+                "kCGWindowLayer": 0,
+                "kCGWindowBounds": {"X": -pos.x, "Y": -pos.y, "Width": geom.width, "Height": geom.height},
+            })
+        return out
+
+    def cursor_position(self) -> Tuple[float, float]:
+        p = self._root.query_pointer()
+        return (float(p.root_x), float(p.root_y))
+
+    def close(self) -> None:
+        super().close()
+        self._dpy.close()
+
+
+###############################################################################
+# Synthetic                                                                   #
+###############################################################################
+
+
+class SyntheticFrame:
+    """In-memory stand-in for ``mss.ScreenShot`` (BGRA pixels)."""
+
+    def __init__(self, width: int, height: int, raw: bytearray) -> None:
+        self.width = width
+        self.height = height
+        self.raw = raw
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.width, self.height)
+
+    @property
+    def bgra(self) -> bytes:
+        return bytes(self.raw)
+
+    @property
+    def rgb(self) -> bytes:
+        rgb = bytearray(self.width * self.height * 3)
+        rgb[0::3] = self.raw[2::4]
+        rgb[1::3] = self.raw[1::4]
+        rgb[2::3] = self.raw[0::4]
+        return bytes(rgb)
+
+
+class SyntheticListener:
+    """Input listener whose events are injected through :class:`SyntheticBackend`."""
+
+    def __init__(self, backend: "SyntheticBackend", on_move: MoveFn, on_click: ClickFn, on_scroll: ScrollFn) -> None:
+        self._backend = backend
+        self.on_move, self.on_click, self.on_scroll = on_move, on_click, on_scroll
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        self._backend._listeners.append(self)
+
+    def stop(self) -> None:
+        self.running = False
+        if self in self._backend._listeners:
+            self._backend._listeners.remove(self)
+
+
+class SyntheticBackend(CaptureBackend):
+    """Deterministic backend for tests and benchmarks; no display server needed.
+
+    Args:
+        displays (Sequence[tuple]): ``(left, top, width, height)`` per display.
+            Defaults to one 1920x1080 display.
+        windows (Sequence[dict], optional): Quartz-style window dicts, frontmost first.
+        cursor (tuple, optional): Initial cursor position. Defaults to the origin.
+        frame_fn (Callable, optional): ``(region, n) -> int`` returning the grey
+            level of the *n*-th grab; by default every grab is a new level, so
+            consecutive frames always differ.
+    """
+
+    name = "synthetic"
+
+    def __init__(
+        self,
+        displays: Sequence[Tuple[int, int, int, int]] = ((0, 0, 1920, 1080),),
+        windows: Optional[Sequence[dict]] = None,
+        cursor: Tuple[float, float] = (0.0, 0.0),
+        frame_fn: Optional[Callable[[Region, int], int]] = None,
+    ) -> None:
+        self._displays = [
+            {"id": i, "left": l, "top": t, "width": w, "height": h, "is_main": i == 0, "is_builtin": i == 0}
+            for i, (l, t, w, h) in enumerate(displays)
+        ]
+        self.window_list: List[dict] = list(windows or [])
+        self.cursor = cursor
+        self.frame_fn = frame_fn or (lambda region, n: n % 256)
+        self.grabs = 0
+        self._lock = threading.Lock()
+        self._listeners: List[SyntheticListener] = []
+
+    # ─────────────────────────────── CaptureBackend
+    def displays(self) -> List[dict]:
+        return [dict(d) for d in self._displays]
+
+    def windows(self) -> List[dict]:
+        return list(self.window_list)
+
+    def cursor_position(self) -> Tuple[float, float]:
+        return self.cursor
+
+    def grab(self, region: Region) -> SyntheticFrame:
+        with self._lock:
+            n = self.grabs
+            self.grabs += 1
+        level = self.frame_fn(region, n) & 0xFF
+        w, h = int(region["width"]), int(region["height"])
+        return SyntheticFrame(w, h, bytearray(bytes((level, level, level, 255)) * (w * h)))
+
+    def listen(self, on_move: MoveFn, on_click: ClickFn, on_scroll: ScrollFn) -> SyntheticListener:
+        return SyntheticListener(self, on_move, on_click, on_scroll)
+
+    # ─────────────────────────────── event injection
+    def move(self, x: float, y: float) -> None:
+        """Move the cursor and notify listeners."""
+        self.cursor = (x, y)
+        for lst in list(self._listeners):
+            lst.on_move(x, y)
+
+    def click(self, x: float, y: float, button: object = "left") -> None:
+        """Press and release *button* at ``(x, y)``."""
+        self.cursor = (x, y)
+        for lst in list(self._listeners):
+            lst.on_click(x, y, button, True)
+            lst.on_click(x, y, button, False)
+
+    def scroll(self, x: float, y: float, dx: int = 0, dy: int = -1) -> None:
+        """Scroll at ``(x, y)``."""
+        self.cursor = (x, y)
+        for lst in list(self._listeners):
+            lst.on_scroll(x, y, dx, dy)
+
+
+###############################################################################
+# Selection                                                                   #
+###############################################################################
+
+
+def get_backend(name: Optional[str] = None) -> CaptureBackend:
+    """Create the backend named *name*, ``$RECORDR_CAPTURE_BACKEND``, or the platform default.
+
+    The synthetic backend is only used when asked for by name: a recorder that
+    silently fell back to it would save fake frames instead of failing.
+
+    Raises:
+        RuntimeError: No backend was named and the platform has no usable display
+            (Linux without ``$DISPLAY``, or neither macOS nor Linux).
+    """
+    name = name or os.environ.get("RECORDR_CAPTURE_BACKEND")
+    if name is None:
+        if sys.platform == "darwin":
+            name = "quartz"
+        elif sys.platform.startswith("linux"):
+            if not os.environ.get("DISPLAY"):
+                raise RuntimeError("no X display: $DISPLAY is not set (Wayland-only sessions are not supported)")
+            name = "x11"
+        else:
+            raise RuntimeError(f"screen capture is not supported on platform {sys.platform!r}")
+    if name == "quartz":
+        return QuartzBackend()
+    if name == "x11":
+        return X11Backend()
+    if name == "synthetic":
+        return SyntheticBackend()
+    raise ValueError(f"unknown capture backend {name!r}; expected one of {BACKENDS}")
@@ -0,0 +1,207 @@
+"""Append-only index of the frames ``record.py`` writes.
+
+The index lives inside the screenshots directory (``.capture_index.jsonl``),
+one JSON object per line.  A *frame* record describes one saved frame::
+
+    {"ts": 1718000000.123, "path": "1718000000.12345_before.jpg", "tag": "before",
+     "interaction": "1718000000:17", "mon": 1, "event": "click", "x": 812.0,
+     "y": 440.5, "windows": ["Safari", "Slack"], "dedupe": null,
+     "bounds": [[0.0, 0.0, 0.6, 1.0], [0.5, 0.1, 1.0, 0.9]]}
+
+``ts`` is the wall-clock capture time, ``interaction`` pairs a before-frame
+with its after-frame, ``windows`` lists the visible window owners front to
+back, and ``dedupe`` is ``"drop"``/``"link"`` when the frame reuses an
+earlier file.  ``bounds`` places each visible window on the frame, front to
+back, as ``[left, top, right, bottom]`` fractions of it (null in records
+written before bounds were kept); ``ocr_check --roi`` OCRs the top strip of
+each.  A *delete* record (``{"op": "delete", "path": ...}``) is
+appended when a frame is removed, e.g. by ``ocr_check``.
+
+Every record is a single ``O_APPEND`` write, so concurrent writers never
+interleave and a crash can at worst leave one torn last line, which readers
+skip and writers terminate before appending.  Readers answer time-range and
+session queries from the index alone, without listing or stat-ing the
+directory.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+INDEX_NAME = ".capture_index.jsonl"
+
+
+class IndexEntry(NamedTuple):
+    """A frame record from the capture index."""
+    ts: float
+    path: str                 # file name inside the screenshots directory
+    tag: str                  # "before" / "after"
+    interaction: str
+    mon: int
+    event: str
+    x: float
+    y: float
+    windows: List[str]
+    dedupe: Optional[str]
+    bounds: Optional[List[List[float]]] = None   # window rectangles as fractions of the frame
+
+
+class CaptureIndex:
+    """Writer for a directory's capture index.
+
+    Args:
+        file_dir (str): Screenshots directory the index belongs to.
+    """
+
+    def __init__(self, file_dir: str) -> None:
+        self.path = os.path.join(file_dir, INDEX_NAME)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._terminate_torn_line()
+
+    def _terminate_torn_line(self) -> None:
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            return
+        with open(self.path, "rb") as fh:
+            fh.seek(size - 1)
+            if fh.read(1) != b"\n":
+                os.write(self._fd, b"\n")
+
+    def _write(self, record: dict) -> None:
+        os.write(self._fd, (json.dumps(record, separators=(",", ":")) + "\n").encode())
+
+    def add(self, entry: IndexEntry) -> None:
+        """Append a frame record."""
+        self._write(entry._asdict())
+
+    def forget(self, path: str) -> None:
+        """Append a delete record for the frame stored at *path*."""
+        self._write({"op": "delete", "path": os.path.basename(path)})
+
+    def sync(self) -> None:
+        """Flush appended records to stable storage."""
+        os.fsync(self._fd)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+
+
+def forget_frames(file_dir: str, paths: Iterable[str]) -> None:
+    """Record deletions of *paths* in *file_dir*'s index, if the directory has one."""
+    if not os.path.exists(os.path.join(file_dir, INDEX_NAME)):
+        return
+    index = CaptureIndex(file_dir)
+    try:
+        for path in paths:
+            index.forget(path)
+    finally:
+        index.close()
+
+
+def repath_frames(file_dir: str, moved: Dict[str, str]) -> None:
+    """Record that frames were moved, e.g. into or out of a pack.
+
+    Args:
+        file_dir (str): Screenshots directory.
+        moved (Dict[str, str]): Old file name -> new file name (or pack ref basename).
+    """
+    if not moved or not os.path.exists(os.path.join(file_dir, INDEX_NAME)):
+        return
+    entries = [e for e in CaptureIndexReader(file_dir).entries if e.path in moved]
+    index = CaptureIndex(file_dir)
+    try:
+        for e in entries:
+            index.add(e._replace(path=moved[e.path]))
+        for path in {e.path for e in entries}:
+            index.forget(path)
+    finally:
+        index.close()
+
+
+###############################################################################
+# Reader                                                                     #
+###############################################################################
+
+
+def _records(path: str) -> Iterator[dict]:
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with fh:
+        for line in fh:
+            if not line.endswith(b"\n"):
+                break            # torn last line of a crashed writer
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue         # torn line terminated by a later writer
+
+
+class CaptureIndexReader:
+    """Query a directory's capture index.
+
+    The index is read once, on construction; deleted frames are left out.
+
+    Args:
+        file_dir (str): Screenshots directory.
+    """
+
+    def __init__(self, file_dir: str) -> None:
+        self.file_dir = file_dir
+        live: Dict[str, List[IndexEntry]] = {}
+        for rec in _records(os.path.join(file_dir, INDEX_NAME)):
+            if rec.get("op") == "delete":
+                live.pop(rec["path"], None)
+                continue
+            entry = IndexEntry(**{field: rec.get(field) for field in IndexEntry._fields})
+            live.setdefault(entry.path, []).append(entry)
+        # dedupe can make several frames share one file
+        self.entries: List[IndexEntry] = sorted(
+            (e for group in live.values() for e in group), key=lambda e: e.ts
+        )
+        self._ts = [e.ts for e in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def full_path(self, entry: IndexEntry) -> str:
+        return os.path.join(self.file_dir, entry.path)
+
+    def frames(self, start: Optional[float] = None, end: Optional[float] = None) -> List[IndexEntry]:
+        """Frames with ``start <= ts < end`` (either bound may be None), oldest first."""
+        lo = 0 if start is None else bisect.bisect_left(self._ts, start)
+        hi = len(self._ts) if end is None else bisect.bisect_left(self._ts, end)
+        return self.entries[lo:hi]
+
+    def window_bounds(self) -> Dict[str, List[List[float]]]:
+        """Window bounds recorded for each frame file, merged over the frames sharing it."""
+        out: Dict[str, List[List[float]]] = {}
+        for e in self.entries:
+            if e.bounds:
+                merged = out.setdefault(e.path, [])
+                merged.extend(b for b in e.bounds if b not in merged)
+        return out
+
+    def interactions(self) -> Dict[str, List[IndexEntry]]:
+        """Frames grouped by interaction id (before-frame first)."""
+        out: Dict[str, List[IndexEntry]] = {}
+        for e in self.entries:
+            out.setdefault(e.interaction, []).append(e)
+        return out
+
+    def sessions(self, gap: float, start: Optional[float] = None, end: Optional[float] = None) -> List[List[IndexEntry]]:
+        """Split frames into sessions wherever consecutive frames are more than *gap* seconds apart."""
+        sessions: List[List[IndexEntry]] = []
+        last = None
+        for e in self.frames(start, end):
+            if last is None or e.ts - last > gap:
+                sessions.append([])
+            sessions[-1].append(e)
+            last = e.ts
+        return sessions
@@ -0,0 +1,139 @@
+"""Demand-driven grab schedule for the recorder's before-frame buffers.
+
+The recorder only needs a fresh frame of a monitor when an interaction may be
+about to happen there.  :class:`CaptureScheduler` therefore keeps three rates:
+
+* the monitor under the cursor is grabbed at ``active_fps``;
+* every other monitor is refreshed at ``background_fps``;
+* once no input has arrived for ``idle_after`` seconds, every monitor drops
+  to ``idle_fps`` (0 stops grabbing entirely).
+
+The first input event after an idle period switches the monitor it lands on
+back to ``active_fps`` straight away.  The interaction's before-frame is then
+the last idle refresh, which is what the screen showed while nothing was
+being touched.
+
+The scheduler only decides *when* to grab; the caller does the grabbing and
+reports it with :meth:`CaptureScheduler.mark_grabbed`.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+
+class CaptureScheduler:
+    """Per-monitor grab deadlines driven by cursor location and input activity.
+
+    Monitors are numbered from 1, like ``Screen._mon_for``.
+
+    Args:
+        monitors (int): Number of monitors.
+        active_fps (float, optional): Rate for the monitor under the cursor. Defaults to 10.
+        background_fps (float, optional): Rate for the other monitors. Defaults to 0.5.
+        idle_fps (float, optional): Rate for all monitors while idle. Defaults to 0.1.
+        idle_after (float, optional): Seconds without input before backing off. Defaults to 30.
+        window (float, optional): Seconds of history behind :meth:`effective_fps`. Defaults to 10.
+        clock (Callable[[], float], optional): Monotonic clock. Defaults to ``time.monotonic``.
+    """
+
+    def __init__(
+        self,
+        monitors: int,
+        active_fps: float = 10.0,
+        background_fps: float = 0.5,
+        idle_fps: float = 0.1,
+        idle_after: float = 30.0,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if min(active_fps, background_fps, idle_fps) < 0:
+            raise ValueError("capture rates must be non-negative")
+        self.monitors = monitors
+        self.active_fps = active_fps
+        self.background_fps = background_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.window = window
+        self._clock = clock
+
+        self.active: Optional[int] = 1 if monitors else None
+        self._last_input = clock()
+        self._last_grab: Dict[int, float] = {m: -float("inf") for m in self._mons()}
+        self._history: Dict[int, Deque[float]] = {m: deque() for m in self._mons()}
+
+    def _mons(self) -> range:
+        return range(1, self.monitors + 1)
+
+    # ─────────────────────────────── inputs
+    def note_input(self, mon: Optional[int]) -> bool:
+        """Record an input event on monitor *mon* (None if off-screen).
+
+        Returns:
+            bool: True if this event changed the active monitor or ended an idle
+            period, i.e. the caller should wake up and re-plan.
+        """
+        now = self._clock()
+        was_idle = self.idle(now)
+        self._last_input = now
+        if mon is None or mon == self.active:
+            return was_idle
+        self.active = mon
+        return True
+
+    def mark_grabbed(self, mon: int, when: Optional[float] = None) -> None:
+        """Record that monitor *mon* was grabbed at *when* (default: now)."""
+        when = self._clock() if when is None else when
+        self._last_grab[mon] = when
+        hist = self._history[mon]
+        hist.append(when)
+        while hist and hist[0] <= when - self.window:
+            hist.popleft()
+
+    # ─────────────────────────────── schedule
+    def idle(self, now: Optional[float] = None) -> bool:
+        """True if no input has arrived for ``idle_after`` seconds."""
+        now = self._clock() if now is None else now
+        return now - self._last_input >= self.idle_after
+
+    def target_fps(self, mon: int, now: Optional[float] = None) -> float:
+        """Rate monitor *mon* should currently be grabbed at."""
+        if self.idle(now):
+            return self.idle_fps
+        return self.active_fps if mon == self.active else self.background_fps
+
+    def _deadline(self, mon: int, now: float) -> float:
+        fps = self.target_fps(mon, now)
+        return self._last_grab[mon] + 1.0 / fps if fps > 0 else float("inf")
+
+    def due(self, now: Optional[float] = None) -> List[int]:
+        """Monitors whose next grab is due, the active monitor first."""
+        now = self._clock() if now is None else now
+        mons = sorted(self._mons(), key=lambda m: m != self.active)
+        return [m for m in mons if self._deadline(m, now) <= now]
+
+    def next_wakeup(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the next grab is due, or None if nothing is scheduled.
+
+        While active, the result is capped at the time left before the idle
+        back-off starts, so the caller re-plans when the rates change.
+        """
+        now = self._clock() if now is None else now
+        deadline = min((self._deadline(m, now) for m in self._mons()), default=float("inf"))
+        if not self.idle(now):
+            deadline = min(deadline, self._last_input + self.idle_after)
+        if deadline == float("inf"):
+            return None
+        return max(0.0, deadline - now)
+
+    # ─────────────────────────────── metrics
+    def effective_fps(self, now: Optional[float] = None) -> Dict[int, float]:
+        """Grabs per second over the last ``window`` seconds, per monitor."""
+        now = self._clock() if now is None else now
+        out = {}
+        for mon, hist in self._history.items():
+            while hist and hist[0] <= now - self.window:
+                hist.popleft()
+            out[mon] = len(hist) / self.window
+        return out
@@ -0,0 +1,193 @@
+"""Single-pass sensitive-domain matcher for OCR'd screen text.
+
+The matcher is compiled once from a domain list and then answers "does this
+text mention a sensitive domain?" in one linear scan:
+
+1. one compiled regex walks the lower-cased text and yields every maximal
+   domain-like token (``secure.chase.com``, ``53.com`` …);
+2. each token is normalised for common OCR noise (spaces or commas around
+   dots, ``rn``/``m`` confusion);
+3. every label-aligned window of the token is looked up in a hash set, so
+   ``secure.chase.com`` matches ``chase.com`` while ``chase.community`` and
+   ``53xcom`` do not.  Windows rather than suffixes, because a sentence's
+   punctuation glues the next word on: ``"chase.com, then"`` is tokenised as
+   ``chase.com.then``.
+
+The cost is O(len(text)) plus a handful of set lookups per token (at most
+as many per label as the longest listed domain has labels), independent of
+the number of domains.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import re
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional
+
+###############################################################################
+# Normalisation                                                               #
+###############################################################################
+
+# maximal runs of dot-separated labels, tolerating "chase . com" / "chase,com";
+# the look-behind and possessive quantifiers keep the scan linear
+_TOKEN = re.compile(r"(?<![a-z0-9-])[a-z0-9-]++(?:\s*+[.,]\s*+[a-z0-9-]++)+")
+_SEP = re.compile(r"\s*[.,]\s*")
+
+
+def normalize(token: str) -> str:
+    """Fold OCR noise in a lower-cased *token* into a canonical host name."""
+    if "," in token or " " in token or "\t" in token or "\n" in token:
+        token = _SEP.sub(".", token)
+    return token.replace("rn", "m")
+
+
+###############################################################################
+# Matcher                                                                     #
+###############################################################################
+
+
+class DomainMatcher:
+    """Boundary-aware domain matcher built once from a list of domains.
+
+    Args:
+        domains (Iterable[str]): Registrable domains to flag (``"chase.com"``).
+            Entries are treated as literals, not regular expressions.
+    """
+
+    def __init__(self, domains: Iterable[str]) -> None:
+        self._domains: dict[str, str] = {}
+        for domain in domains:
+            key = normalize(domain.strip().lower())
+            if key:
+                self._domains.setdefault(key, domain)
+        self._max_labels = max((k.count(".") + 1 for k in self._domains), default=0)
+        digest = hashlib.sha1("\n".join(sorted(self._domains)).encode()).hexdigest()
+        self.version: str = digest[:12]
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    # ─────────────────────────────── token helpers
+    @staticmethod
+    def candidates(text: str) -> List[str]:
+        """Return the normalised domain-like tokens found in *text*."""
+        return [normalize(t) for t in _TOKEN.findall(text.lower())]
+
+    def match_token(self, token: str) -> Optional[str]:
+        """Return the listed domain *token* belongs to, if any.
+
+        *token* must already be normalised (as produced by :meth:`candidates`).
+        Every run of whole labels is tried, so both a subdomain (``secure.chase.com``)
+        and words glued on by punctuation (``chase.com.then``) still match.
+        """
+        domains = self._domains
+        labels = token.split(".")
+        for start in range(len(labels)):
+            for end in range(start + 1, min(len(labels), start + self._max_labels) + 1):
+                hit = domains.get(".".join(labels[start:end]))
+                if hit is not None:
+                    return hit
+        return None
+
+    def match_tokens(self, tokens: Iterable[str]) -> Optional[str]:
+        """Return the first listed domain among pre-extracted *tokens*."""
+        for token in tokens:
+            hit = self.match_token(token)
+            if hit is not None:
+                return hit
+        return None
+
+    # ─────────────────────────────── text API
+    def finditer(self, text: str) -> Iterator[str]:
+        """Yield every listed domain mentioned in *text*, in order."""
+        for token in _TOKEN.findall(text.lower()):
+            hit = self.match_token(normalize(token))
+            if hit is not None:
+                yield hit
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first listed domain mentioned in *text*, or None."""
+        return next(self.finditer(text), None)
+
+
+@lru_cache(maxsize=None)
+def get_matcher() -> DomainMatcher:
+    """Return the process-wide matcher for ``SENSITIVE_DOMAINS``."""
+    from sensitive_domains import SENSITIVE_DOMAINS
+    return DomainMatcher(SENSITIVE_DOMAINS)
+
+
+###############################################################################
+# Benchmark                                                                   #
+###############################################################################
+
+_WORDS = (
+    "the quick brown fox file edit view history bookmarks window help inbox "
+    "meeting notes draft slack github pull request review merge main commit "
+    "terminal python import error warning calendar today tomorrow search"
+).split()
+_BENIGN_HOSTS = ("github.com", "google.com", "docs.python.org", "news.ycombinator.com",
+                 "stackoverflow.com", "mail.google.com", "figma.com", "notion.so")
+
+
+def _synthetic_frames(n_frames: int, words_per_frame: int, seed: int = 0) -> List[str]:
+    """Generate OCR-like text for *n_frames* screenshots."""
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(n_frames):
+        words = [rng.choice(_WORDS) for _ in range(words_per_frame)]
+        words.insert(rng.randrange(len(words)), "https://" + rng.choice(_BENIGN_HOSTS) + "/x")
+        frames.append(" ".join(words))
+    return frames
+
+
+def _legacy_check(text: str, domains: List[str]) -> bool:
+    """The original per-domain ``re.search`` loop, kept for comparison."""
+    for domain in domains:
+        if re.search(domain, text):
+            return True
+    return False
+
+
+def benchmark(n_frames: int = 20000, words_per_frame: int = 120) -> None:
+    """Compare the compiled matcher with the per-domain regex loop."""
+    from sensitive_domains import SENSITIVE_DOMAINS
+
+    frames = _synthetic_frames(n_frames, words_per_frame)
+    chars = sum(len(f) for f in frames)
+    print(f"{n_frames} frames, {chars / 1e6:.1f}M chars, {len(SENSITIVE_DOMAINS)} domains")
+
+    re.purge()
+    t0 = time.perf_counter()
+    legacy_hits = sum(_legacy_check(f, SENSITIVE_DOMAINS) for f in frames)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matcher = DomainMatcher(SENSITIVE_DOMAINS)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    hits = sum(matcher.search(f) is not None for f in frames)
+    compiled = time.perf_counter() - t0
+
+    print(f"regex loop : {legacy:8.3f}s  ({legacy_hits} flagged)")
+    print(f"matcher    : {compiled:8.3f}s  ({hits} flagged, built in {build * 1e3:.2f}ms)")
+    print(f"speed-up   : {legacy / compiled:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Sensitive-domain matcher')
+    parser.add_argument('--benchmark', action='store_true', help='Benchmark against the per-domain regex loop')
+    parser.add_argument('--frames', type=int, default=20000, help='Number of synthetic OCR frames')
+    parser.add_argument('--text', type=str, help='Check a single string and print the matched domain')
+    args = parser.parse_args()
+    if args.text is not None:
+        print(get_matcher().search(args.text))
+    if args.benchmark:
+        benchmark(n_frames=args.frames)
+
+
+if __name__ == "__main__":
+    main()
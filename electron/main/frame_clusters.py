@@ -0,0 +1,335 @@
+"""Cluster near-duplicate frames so the nightly LLM pass sees each screen once.
+
+A day's screenshots are full of frames showing the same page at slightly
+different scroll positions.  This tool keeps a 64-bit difference hash
+(``frame_hash.dhash``) of every frame in ``.frame_hashes.jsonl`` inside the
+screenshots directory and, per session, groups frames whose hash lies within
+``radius`` bits of a cluster's first frame, using a BK-tree so each lookup
+only visits nearby hashes.  Each cluster is represented by its latest frame.
+
+The hash file is append-only: a run hashes only frames it has not seen, so
+adding a day costs that day's frames, and records of frames that have since
+been deleted (by ``ocr_check``, say) are dropped and compacted away.  Like the
+OCR manifest, each record keeps the size and mtime of the file it was hashed
+from, so a frame replaced under the same name is hashed again.  Frames come
+from a directory scan, packed frames (``frame_pack``) included, with capture
+times from the capture index where it has them.
+
+Usage::
+
+    python frame_clusters.py DIR [--day 2024-06-10] [--radius 4] [--members]
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from capture_index import INDEX_NAME, CaptureIndexReader
+from frame_hash import dhash, hamming
+from frame_pack import FRAME_EXTENSIONS, open_frame, scan_packs, stat_frame
+from ocr_manifest import FrameFile, scan_images
+
+HASH_INDEX_NAME = ".frame_hashes.jsonl"
+SESSION_GAP = 60 * 60        # seconds; matches SESSION_GAP in consts.ts
+
+
+class HashRecord(NamedTuple):
+    name: str        # file name, or pack ref basename
+    ts: float
+    hash: int
+    size: int = -1       # size and mtime of the file that was hashed
+    mtime_ns: int = -1   # (-1 in records written before they were kept)
+
+
+###############################################################################
+# BK-tree                                                                     #
+###############################################################################
+
+
+class BKTree:
+    """Metric tree over integer hashes under Hamming distance.
+
+    Each node keeps its children keyed by their distance to it, so a search
+    within *radius* of a query at distance *d* from a node only descends into
+    children keyed ``d - radius`` .. ``d + radius``.
+    """
+
+    def __init__(self) -> None:
+        self._root: Optional[list] = None      # [hash, item, {distance: child}]
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: int, item: object) -> None:
+        self._len += 1
+        if self._root is None:
+            self._root = [key, item, {}]
+            return
+        node = self._root
+        while True:
+            d = hamming(key, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, item, {}]
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, object]]:
+        """Return ``(distance, item)`` for every entry within *radius* of *key*."""
+        found: List[Tuple[int, object]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(key, node[0])
+            if d <= radius:
+                found.append((d, node[1]))
+            for dist, child in node[2].items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+        return found
+
+
+###############################################################################
+# Hash index                                                                  #
+###############################################################################
+
+
+def list_frames(file_dir: str, source: str = "auto") -> Iterator[Tuple[FrameFile, float]]:
+    """Yield ``(frame, ts)`` for every frame in *file_dir*.
+
+    Args:
+        file_dir (str): Screenshots directory.
+        source (str, optional): ``"index"`` reads only the capture index, ``"scan"`` lists
+            the directory and its packs (timestamps from mtimes), ``"auto"`` lists them too
+            but takes timestamps from the capture index where it has the frame, so frames
+            saved before the index existed, by ``--no-index`` runs or by ``screenshot.py``
+            are still included. Defaults to "auto".
+    """
+    index_ts: Dict[str, float] = {}
+    if source in ("index", "auto") and os.path.exists(os.path.join(file_dir, INDEX_NAME)):
+        for e in CaptureIndexReader(file_dir).entries:
+            index_ts.setdefault(e.path, e.ts)      # dedupe makes several entries share a file
+    if source == "index":
+        for path, ts in index_ts.items():
+            try:
+                yield stat_frame(os.path.join(file_dir, path)), ts
+            except FileNotFoundError:
+                continue                  # deleted since it was indexed
+        return
+    for f in itertools.chain(scan_images(file_dir, FRAME_EXTENSIONS), scan_packs(file_dir)):
+        yield f, index_ts.get(f.name, f.mtime_ns / 1e9)
+
+
+def _hash_frame(path: str) -> Optional[int]:
+    try:
+        with open_frame(path) as img:
+            img.draft("L", (128, 128))    # JPEGs decode at 1/8 scale, enough for 9x8 pixels
+            return dhash(img)
+    except (OSError, ValueError):
+        return None                       # deleted or unreadable since listing
+
+
+class HashIndex:
+    """Incrementally maintained dhash of every frame in a screenshots directory.
+
+    Args:
+        file_dir (str): Screenshots directory the index belongs to.
+    """
+
+    def __init__(self, file_dir: str) -> None:
+        self.file_dir = file_dir
+        self.path = os.path.join(file_dir, HASH_INDEX_NAME)
+        self.records: Dict[str, HashRecord] = {}
+        self._stored = 0
+        try:
+            fh = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    self._stored += 2 * len(self.records) + 1   # torn tail: force a rewrite
+                    break
+                try:
+                    rec = json.loads(line)
+                    self.records[rec["name"]] = HashRecord(
+                        rec["name"], rec["ts"], int(rec["hash"], 16), rec.get("size", -1), rec.get("mtime_ns", -1),
+                    )
+                except (ValueError, KeyError):
+                    continue              # torn line of an interrupted run
+                self._stored += 1
+
+    def update(self, frames: Iterable[Tuple[FrameFile, float]], workers: int = 0) -> int:
+        """Hash new or changed frames and drop records of frames that are gone.
+
+        Args:
+            frames: ``(frame, ts)`` of every frame currently in the directory.
+            workers (int, optional): Decoder threads; 0 = one per CPU. Defaults to 0.
+
+        Returns:
+            int: Number of frames hashed.
+        """
+        frames = list(frames)
+        live = {f.name for f, _ in frames}
+        for name in set(self.records) - live:
+            del self.records[name]
+        new = [(f, ts) for f, ts in frames if not self._current(f)]
+
+        added = []
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            for (f, ts), h in zip(new, pool.map(_hash_frame, (f.path for f, _ in new))):
+                if h is not None:
+                    added.append(HashRecord(f.name, ts, h, f.size, f.mtime_ns))
+                else:
+                    self.records.pop(f.name, None)   # a stale hash is worse than none
+        for rec in added:
+            self.records[rec.name] = rec
+
+        if self._stored + len(added) > 2 * len(self.records):
+            self._rewrite()
+        elif added:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.writelines(self._line(rec) for rec in added)
+            self._stored += len(added)
+        return len(added)
+
+    def _current(self, frame: FrameFile) -> bool:
+        """Whether the stored record of *frame* was hashed from the file as it is now."""
+        rec = self.records.get(frame.name)
+        return rec is not None and rec.size == frame.size and rec.mtime_ns == frame.mtime_ns
+
+    @staticmethod
+    def _line(rec: HashRecord) -> str:
+        return json.dumps(
+            {"name": rec.name, "ts": rec.ts, "hash": f"{rec.hash:016x}", "size": rec.size, "mtime_ns": rec.mtime_ns},
+            separators=(",", ":"),
+        ) + "\n"
+
+    def _rewrite(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.writelines(self._line(rec) for rec in self.records.values())
+        os.replace(tmp, self.path)
+        self._stored = len(self.records)
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> List[HashRecord]:
+        """Records with ``start <= ts < end``, oldest first."""
+        return sorted(
+            (r for r in self.records.values()
+             if (start is None or r.ts >= start) and (end is None or r.ts < end)),
+            key=lambda r: r.ts,
+        )
+
+
+###############################################################################
+# Clustering                                                                  #
+###############################################################################
+
+
+class Cluster(NamedTuple):
+    representative: HashRecord
+    members: List[HashRecord]
+
+
+def sessions(records: List[HashRecord], gap: float = SESSION_GAP) -> List[List[HashRecord]]:
+    """Split time-ordered records wherever consecutive frames are more than *gap* seconds apart."""
+    out: List[List[HashRecord]] = []
+    last = None
+    for r in records:
+        if last is None or r.ts - last > gap:
+            out.append([])
+        out[-1].append(r)
+        last = r.ts
+    return out
+
+
+def cluster_session(records: List[HashRecord], radius: int = 4) -> List[Cluster]:
+    """Group a session's time-ordered frames into near-duplicate clusters.
+
+    A frame joins the cluster whose first frame is nearest, if that is within
+    *radius* bits; otherwise it starts a new cluster.  Comparing against the
+    first frame keeps a slow scroll from chaining unrelated pages together.
+    """
+    tree = BKTree()
+    members: List[List[HashRecord]] = []
+    for r in records:
+        hits = tree.search(r.hash, radius)
+        if hits:
+            members[min(hits)[1]].append(r)
+        else:
+            tree.add(r.hash, len(members))
+            members.append([r])
+    clusters = [Cluster(group[-1], group) for group in members]
+    return sorted(clusters, key=lambda c: c.representative.ts)
+
+
+def cluster_directory(
+    file_dir: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    radius: int = 4,
+    gap: float = SESSION_GAP,
+    source: str = "auto",
+    workers: int = 0,
+) -> List[List[Cluster]]:
+    """Bring *file_dir*'s hash index up to date and cluster each session in ``[start, end)``."""
+    index = HashIndex(file_dir)
+    hashed = index.update(list_frames(file_dir, source), workers)
+    print(f"hashed {hashed} new frame(s), {len(index.records)} indexed", file=sys.stderr)
+    return [cluster_session(s, radius) for s in sessions(index.between(start, end), gap)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate screenshots and list one representative per cluster')
+    parser.add_argument('file_dir', type=str, help='Screenshots directory')
+    parser.add_argument('--day', type=str, default=None, help='Only frames from this local date (YYYY-MM-DD)')
+    parser.add_argument('--radius', type=int, default=4, help='Most differing hash bits (of 64) within a cluster')
+    parser.add_argument('--gap', type=float, default=SESSION_GAP, help='Seconds between frames that start a new session')
+    parser.add_argument('--source', choices=("auto", "index", "scan"), default="auto", help='Frames from a directory scan timed by the capture index (auto), the index only, or the scan only')
+    parser.add_argument('--workers', type=int, default=0, help='Decoder threads (0 = one per CPU)')
+    parser.add_argument('--members', action='store_true', help='Include every cluster member in the output')
+    parser.add_argument('--output', type=str, default=None, help='Write the JSON here instead of stdout')
+    args = parser.parse_args()
+
+    start = end = None
+    if args.day:
+        start = time.mktime(time.strptime(args.day, "%Y-%m-%d"))
+        end = start + 24 * 3600
+    t0 = time.perf_counter()
+    result = cluster_directory(os.path.expanduser(args.file_dir), start, end, args.radius, args.gap, args.source, args.workers)
+
+    frames = sum(len(c.members) for s in result for c in s)
+    out = {
+        "frames": frames,
+        "representatives": sum(len(s) for s in result),
+        "sessions": [
+            {
+                "start": min(c.members[0].ts for c in s),
+                "end": max(c.members[-1].ts for c in s),
+                "clusters": [
+                    {"representative": c.representative.name, "size": len(c.members),
+                     **({"members": [m.name for m in c.members]} if args.members else {})}
+                    for c in s
+                ],
+            }
+            for s in result
+        ],
+    }
+    text = json.dumps(out, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        print(text)
+    print(f"{frames} frame(s) -> {out['representatives']} representative(s) in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Bounded pool that encodes captured frames to image files.
+
+:meth:`FrameEncoder.encode` queues a ``(frame, target)`` job and waits for it;
+the target is a file path or a writable binary file object (``record``'s pack
+storage encodes into memory and appends the bytes to a pack).
+A fixed number of worker threads drain the queue; PIL releases the GIL while
+encoding, so they run in parallel with each other and with the capture loop.
+
+The queue is bounded.  When it is full, ``policy`` decides what happens:
+
+* ``"block"`` (default) – the caller waits for a free place, so no captured
+  frame is lost and back-pressure slows the capture loop instead;
+* ``"drop_oldest"`` – the oldest waiting job is discarded (its ``encode``
+  call returns None) and the new one is queued; an opt-in for machines
+  short on CPU or memory.
+
+Every job records how long it waited in the queue and how long the encode
+took, so bursts show up in :meth:`FrameEncoder.latency` rather than as a
+growing pile of threads.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Deque, Dict, List, Optional, Tuple, Union
+
+from frame_image import to_image
+
+FORMATS: Dict[str, str] = {"jpeg": ".jpg", "webp": ".webp"}
+QUEUE_POLICIES = ("block", "drop_oldest")
+SUBSAMPLING = ("4:4:4", "4:2:2", "4:2:0")
+
+_LATENCY_SAMPLES = 512
+
+log = logging.getLogger("Screen")
+
+
+class _Job:
+    __slots__ = ("frame", "path", "future", "queued_at")
+
+    def __init__(self, frame, path: Union[str, BinaryIO], future: asyncio.Future) -> None:
+        self.frame = frame
+        self.path = path
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class FrameEncoder:
+    """Fixed-size encoder pool fed through a bounded queue.
+
+    Args:
+        workers (int, optional): Encoder threads. Defaults to 2.
+        queue_size (int, optional): Maximum jobs waiting for a worker. Defaults to 8.
+        policy (str, optional): ``"block"`` or ``"drop_oldest"`` when the queue is full.
+            Defaults to ``"block"``.
+        fmt (str, optional): ``"jpeg"`` or ``"webp"``. Defaults to ``"jpeg"``.
+        quality (int, optional): Encoder quality, 1–100. Defaults to 70.
+        subsampling (Optional[str], optional): JPEG chroma subsampling (``"4:4:4"``,
+            ``"4:2:2"`` or ``"4:2:0"``); None keeps the encoder default. WebP
+            always uses 4:2:0 in lossy mode, so it is rejected for WebP.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 8,
+        policy: str = "block",
+        fmt: str = "jpeg",
+        quality: int = 70,
+        subsampling: Optional[str] = None,
+    ) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"policy must be one of {QUEUE_POLICIES}, got {policy!r}")
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {tuple(FORMATS)}, got {fmt!r}")
+        if not 1 <= quality <= 100:
+            raise ValueError(f"quality must be in 1..100, got {quality}")
+        if subsampling is not None:
+            if subsampling not in SUBSAMPLING:
+                raise ValueError(f"subsampling must be one of {SUBSAMPLING}, got {subsampling!r}")
+            if fmt != "jpeg":
+                raise ValueError("subsampling is only configurable for JPEG")
+
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.policy = policy
+        self.fmt = fmt
+        self.quality = quality
+        self.subsampling = subsampling
+
+        self.stats: Dict[str, int] = dict.fromkeys(("submitted", "encoded", "dropped", "errors"), 0)
+        # (queue wait, encode time) in seconds, most recent jobs
+        self._latency: Deque[Tuple[float, float]] = deque(maxlen=_LATENCY_SAMPLES)
+        self._queue: Optional[asyncio.Queue[_Job]] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def extension(self) -> str:
+        """File extension for the configured format, including the dot."""
+        return FORMATS[self.fmt]
+
+    def _save_options(self) -> dict:
+        if self.fmt == "webp":
+            return {"format": "WEBP", "quality": self.quality}
+        opts = {"format": "JPEG", "quality": self.quality}
+        if self.subsampling is not None:
+            opts["subsampling"] = self.subsampling
+        return opts
+
+    # ─────────────────────────────── lifecycle
+    def start(self) -> None:
+        """Start the worker threads and consumer tasks on the running loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="encoder")
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the consumers; jobs still queued resolve to None."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            self._drop(self._queue.get_nowait())
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ─────────────────────────────── producer side
+    async def encode(self, frame, path: Union[str, BinaryIO]) -> Optional[Union[str, BinaryIO]]:
+        """Encode *frame* to *path* (a file path or writable binary file) on the pool.
+
+        The caller must keep *frame*'s buffer unchanged until this returns.
+
+        Returns:
+            Optional[Union[str, BinaryIO]]: *path*, or None if the job was dropped or failed.
+        """
+        if self._queue is None:
+            raise RuntimeError("FrameEncoder.start() has not been called")
+        job = _Job(frame, path, asyncio.get_running_loop().create_future())
+        self.stats["submitted"] += 1
+        if self.policy == "drop_oldest":
+            if self._queue.full():
+                self._drop(self._queue.get_nowait())
+            self._queue.put_nowait(job)
+        else:
+            await self._queue.put(job)
+        return await job.future
+
+    def _drop(self, job: _Job) -> None:
+        self.stats["dropped"] += 1
+        if not job.future.done():
+            job.future.set_result(None)
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ─────────────────────────────── consumer side
+    def _encode(self, job: _Job) -> float:
+        t0 = time.monotonic()
+        to_image(job.frame).save(job.path, **self._save_options())
+        return time.monotonic() - t0
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            wait = time.monotonic() - job.queued_at
+            try:
+                took = await loop.run_in_executor(self._pool, self._encode, job)
+            except asyncio.CancelledError:
+                self._drop(job)
+                raise
+            except Exception as e:  # keep the pool alive on disk errors
+                self.stats["errors"] += 1
+                log.info(f"encode failed for {job.path}: {e}")
+                if not job.future.done():
+                    job.future.set_result(None)
+                continue
+            self.stats["encoded"] += 1
+            self._latency.append((wait, took))
+            if not job.future.done():
+                job.future.set_result(job.path)
+
+    # ─────────────────────────────── metrics
+    def latency(self) -> Dict[str, float]:
+        """Queue-wait, encode and total latency of recent jobs in milliseconds (p50/p95/max)."""
+        if not self._latency:
+            return {}
+        out: Dict[str, float] = {}
+        series = {
+            "wait": [w for w, _ in self._latency],
+            "encode": [e for _, e in self._latency],
+            "total": [w + e for w, e in self._latency],
+        }
+        for name, values in series.items():
+            values.sort()
+            n = len(values)
+            out[f"{name}_p50_ms"] = values[n // 2] * 1e3
+            out[f"{name}_p95_ms"] = values[min(n - 1, int(n * 0.95))] * 1e3
+            out[f"{name}_max_ms"] = values[-1] * 1e3
+        return out
@@ -0,0 +1,65 @@
+"""Cheap perceptual signatures for detecting near-duplicate screen frames.
+
+:func:`thumbnail` produces a small grayscale image where each pixel is the
+mean of a screen tile, and :func:`tile_distance` counts tiles whose brightness
+changed by more than a tolerance.  Counting tiles rather than comparing one
+global hash catches localised edits (a typed word, a new chat message).
+
+:func:`dhash` is the coarser, whole-frame signature used to cluster a day's
+frames offline (see ``frame_clusters``): a 64-bit difference hash compared
+by :func:`hamming` distance.
+
+Signatures work on ``mss`` screenshots (raw BGRA) or PIL images and only ever
+touch a downscaled copy of the pixels.
+"""
+from __future__ import annotations
+
+from typing import Tuple, Union
+
+from PIL import Image, ImageChops
+
+THUMB_SIZE: Tuple[int, int] = (128, 80)  # tiles across × down
+TILE_TOLERANCE: int = 2                  # grey levels a tile may drift (cursor, antialiasing)
+
+
+def _as_image(src: Union[Image.Image, object]) -> Image.Image:
+    if isinstance(src, Image.Image):
+        return src
+    # Zero-copy view of the BGRA buffer.  Red and blue are swapped, which only
+    # changes the luma weights and does not matter for change detection.
+    return Image.frombuffer("RGBX", (src.width, src.height), src.raw, "raw", "RGBX", 0, 1)
+
+
+def thumbnail(src, size: Tuple[int, int] = THUMB_SIZE) -> Image.Image:
+    """Return a grayscale *size* thumbnail whose pixels are tile means."""
+    img = _as_image(src)
+    # integer box reduction first keeps the final resample cheap on 5K frames
+    factor = max(1, min(img.width // (size[0] * 4), img.height // (size[1] * 4)))
+    if factor > 1:
+        img = img.reduce(factor)
+    return img.convert("L").resize(size, Image.BOX)
+
+
+def tile_distance(a: Image.Image, b: Image.Image, tolerance: int = TILE_TOLERANCE) -> int:
+    """Count tiles whose brightness differs by more than *tolerance* between two thumbnails."""
+    if a.size != b.size:
+        return a.width * a.height
+    diff = ImageChops.difference(a, b)
+    return sum(diff.histogram()[tolerance + 1:])
+
+
+def dhash(src, size: int = 8) -> int:
+    """Return a ``size * size``-bit difference hash (left/right brightness gradients)."""
+    img = _as_image(src).convert("L").resize((size + 1, size), Image.BOX)
+    px = img.tobytes()
+    bits = 0
+    for row in range(size):
+        line = px[row * (size + 1):(row + 1) * (size + 1)]
+        for col in range(size):
+            bits = (bits << 1) | (line[col] > line[col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
@@ -0,0 +1,150 @@
+"""Turn raw BGRA screen grabs into PIL images with as few pixel copies as possible.
+
+``Image.frombytes("RGB", size, frame.rgb)`` first builds a packed RGB copy of
+the frame in Python (``mss`` slices the BGRA buffer channel by channel) and
+PIL then unpacks that copy again.  :func:`to_image` instead decodes straight
+from the grab's buffer with PIL's ``BGRX`` raw mode: one pass, no Python
+intermediates.  Cropping is done by pointing the decoder at a slice of the
+buffer, and downscaling runs on a zero-copy view of the buffer before the
+(now small) channel swap.
+
+Frames are anything with ``width``, ``height`` and a BGRA ``raw`` buffer:
+``mss`` screenshots, :class:`frame_ring.FrameSlot`, synthetic frames.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import time
+import tracemalloc
+from typing import Optional, Tuple
+
+from PIL import Image
+
+Box = Tuple[int, int, int, int]   # (left, top, right, bottom), like PIL
+
+
+def _clamp(box: Box, width: int, height: int) -> Box:
+    l, t, r, b = box
+    l, t = max(0, min(l, width)), max(0, min(t, height))
+    r, b = max(l, min(r, width)), max(t, min(b, height))
+    if r == l or b == t:
+        raise ValueError(f"crop box {box} is empty inside a {width}x{height} frame")
+    return (l, t, r, b)
+
+
+def scaled_size(size: Tuple[int, int], max_dim: Optional[int]) -> Tuple[int, int]:
+    """Return *size* shrunk so its longest side is at most *max_dim* (never enlarged)."""
+    w, h = size
+    if not max_dim or max(w, h) <= max_dim:
+        return size
+    scale = max_dim / max(w, h)
+    return (max(1, round(w * scale)), max(1, round(h * scale)))
+
+
+def to_image(frame, crop: Optional[Box] = None, max_dim: Optional[int] = None) -> Image.Image:
+    """Decode a BGRA frame into an RGB image, optionally cropped and downscaled.
+
+    Args:
+        frame: Object with ``width``, ``height`` and a BGRA ``raw`` buffer.
+        crop (Optional[Box]): ``(left, top, right, bottom)`` in frame pixels.
+        max_dim (Optional[int]): Longest side of the result; smaller frames are
+            not enlarged.
+
+    Returns:
+        Image.Image: An ``RGB`` image that no longer references ``frame.raw``.
+    """
+    width, height = frame.width, frame.height
+    stride = width * 4
+    box = _clamp(crop, width, height) if crop is not None else (0, 0, width, height)
+    l, t, r, b = box
+    target = scaled_size((r - l, b - t), max_dim)
+
+    if target == (r - l, b - t):
+        # single decode pass over just the requested rows/columns
+        buf = memoryview(frame.raw)[t * stride + l * 4:]
+        return Image.frombuffer("RGB", target, buf, "raw", "BGRX", stride, 1)
+
+    # Shrink a zero-copy view first (channels stay B,G,R,X; averaging does not
+    # care), then swap channels on the small result.
+    view = Image.frombuffer("RGBX", (width, height), frame.raw, "raw", "RGBX", 0, 1)
+    factor = max(1, min((r - l) // target[0], (b - t) // target[1]))
+    small = view.reduce(factor, box=box) if factor > 1 else view.crop(box)
+    if small.size != target:
+        small = small.resize(target, Image.BOX)
+    return Image.frombuffer("RGB", target, small.tobytes(), "raw", "BGRX", 0, 1)
+
+
+###############################################################################
+# Benchmark                                                                   #
+###############################################################################
+
+
+class _Frame:
+    def __init__(self, width: int, height: int) -> None:
+        self.width, self.height = width, height
+        self.raw = bytearray(os.urandom(width * height * 4))
+
+    @property
+    def rgb(self) -> bytes:
+        # mss.ScreenShot.rgb, verbatim
+        rgb = bytearray(self.height * self.width * 3)
+        raw = self.raw
+        rgb[::3] = raw[2::4]
+        rgb[1::3] = raw[1::4]
+        rgb[2::3] = raw[::4]
+        return bytes(rgb)
+
+
+def _pixel_bytes(img: Image.Image) -> int:
+    # PIL stores 3- and 4-band images with 4 bytes per pixel
+    return img.width * img.height * (1 if img.mode in ("1", "L", "P") else 4)
+
+
+def benchmark(size: Tuple[int, int] = (5120, 2880), repeat: int = 5, max_dim: int = 1920) -> None:
+    """Print time and bytes copied per frame for the old and new decode paths.
+
+    Bytes copied are the Python buffers allocated while decoding (traced with
+    ``tracemalloc``) plus the pixel storage of the resulting PIL image; the
+    small intermediate images of the downscaled path are not counted.
+    """
+    frame = _Frame(*size)
+    w, h = size
+    paths = {
+        "frombytes(frame.rgb)": lambda: Image.frombytes("RGB", size, frame.rgb),
+        "to_image": lambda: to_image(frame),
+        "to_image crop ½": lambda: to_image(frame, crop=(0, 0, w // 2, h)),
+        f"to_image max_dim={max_dim}": lambda: to_image(frame, max_dim=max_dim),
+    }
+    print(f"{w}x{h} BGRA frame ({w * h * 4 / 2**20:.1f} MiB), {repeat} runs")
+    for name, fn in paths.items():
+        tracemalloc.start()
+        img = fn()
+        py_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        copied = py_bytes + _pixel_bytes(img)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        decode = (time.perf_counter() - t0) / repeat
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn().save(io.BytesIO(), "JPEG", quality=70)
+        total = (time.perf_counter() - t0) / repeat
+        print(f"{name:>28}: {copied / 2**20:7.1f} MiB copied  decode {decode * 1e3:6.1f}ms"
+              f"  decode+JPEG {total * 1e3:6.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Frame decode microbenchmark')
+    parser.add_argument('--size', type=int, nargs=2, default=[5120, 2880], metavar=('W', 'H'), help='Frame size')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per path')
+    parser.add_argument('--max-dim', type=int, default=1920, help='Longest side for the downscaled path')
+    args = parser.parse_args()
+    benchmark(tuple(args.size), args.repeat, args.max_dim)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""Daily packfiles: many encoded frames in one append-only file.
+
+With ``--storage pack`` the recorder appends each encoded frame to
+``frames-YYYY-MM-DD.pack`` (local date of the capture) instead of writing a
+loose ``{ts}_{tag}.jpg`` file.  Layout::
+
+    b"RCPACK1\\n"
+    record*      header <4sBHId> (b"FRM1", flags, name_len, data_len, ts), name, data
+    table        <Qd> (record offset, ts) per record      ┐ written when the
+    footer       <QI4s> (table offset, count, b"PIDX")    ┘ pack is sealed
+
+Each record is written with a single ``write`` call, so a crash can only
+leave a torn record at the end.  A pack without a footer (still being
+written, or its writer crashed) is read by walking the record headers, and
+reopening it for appending cuts off the footer or torn tail first.
+
+A directory's packs have a single writer: the recorder's :class:`PackWriter`,
+or the ``pack`` CLI while the recorder is stopped.  Readers may run alongside
+it, in any process.  The writer only removes bytes when it cuts off the footer
+(and a torn tail) or writes a new footer, and holds an exclusive ``flock`` on
+the pack while it does; readers hold a shared one while they locate the
+records, and afterwards only touch record bytes, which are never cut off.
+
+Deleting a frame zero-fills its bytes in place and sets the deleted flag, so
+sensitive pixels really leave the disk without rewriting the pack.
+
+Frames in packs are addressed by *refs*, ``"<pack path>#<frame name>"``;
+:func:`read_frame`, :func:`frame_exists` and :func:`remove_frame` accept refs
+and plain paths alike.  The module doubles as a CLI to convert a directory
+between loose files and packs (``python frame_pack.py pack|unpack|ls DIR``).
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import fcntl
+import io
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from ocr_manifest import FrameFile
+
+MAGIC = b"RCPACK1\n"
+RECORD_MAGIC = b"FRM1"
+TABLE_MAGIC = b"PIDX"
+HEADER = struct.Struct("<4sBHId")    # magic, flags, name_len, data_len, ts
+TABLE_ENTRY = struct.Struct("<Qd")   # record offset, ts
+FOOTER = struct.Struct("<QI4s")      # table offset, count, magic
+FLAG_DELETED = 0x01
+
+PACK_PREFIX = "frames-"
+PACK_SUFFIX = ".pack"
+REF_SEP = "#"
+FRAME_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+class PackEntry(NamedTuple):
+    """A frame stored in a pack."""
+    name: str
+    ts: float
+    offset: int       # record header offset
+    data_offset: int
+    size: int
+    deleted: bool
+
+
+def pack_name(ts: float) -> str:
+    """File name of the pack holding frames captured at *ts* (local date)."""
+    return f"{PACK_PREFIX}{time.strftime('%Y-%m-%d', time.localtime(ts))}{PACK_SUFFIX}"
+
+
+def list_packs(file_dir: str) -> List[str]:
+    """Paths of all packs in *file_dir*, oldest day first."""
+    return sorted(
+        os.path.join(file_dir, n) for n in os.listdir(file_dir)
+        if n.startswith(PACK_PREFIX) and n.endswith(PACK_SUFFIX)
+    )
+
+
+def make_ref(pack_path: str, name: str) -> str:
+    return f"{pack_path}{REF_SEP}{name}"
+
+
+def split_ref(ref: str) -> Tuple[str, Optional[str]]:
+    """Return ``(pack_path, name)`` for a ref, or ``(path, None)`` for a plain path."""
+    pack, sep, name = ref.rpartition(REF_SEP)
+    if sep and pack.endswith(PACK_SUFFIX):
+        return pack, name
+    return ref, None
+
+
+def _scan(buf, size: int, start: int = len(MAGIC)) -> Tuple[List[int], int]:
+    """Return offsets of the records at or after *start* and the end of the last intact record."""
+    if size >= len(MAGIC) + FOOTER.size and buf[size - 4:size] == TABLE_MAGIC:
+        table_offset, count, _ = FOOTER.unpack_from(buf, size - FOOTER.size)
+        offsets = [TABLE_ENTRY.unpack_from(buf, table_offset + i * TABLE_ENTRY.size)[0] for i in range(count)]
+        return [off for off in offsets if off >= start], table_offset
+    offsets = []
+    pos = start
+    while pos + HEADER.size <= size:
+        magic, _, name_len, data_len, _ = HEADER.unpack_from(buf, pos)
+        end = pos + HEADER.size + name_len + data_len
+        if magic != RECORD_MAGIC or end > size:
+            break           # torn tail
+        offsets.append(pos)
+        pos = end
+    return offsets, pos
+
+
+###############################################################################
+# Reader                                                                      #
+###############################################################################
+
+
+class PackReader:
+    """Memory-mapped, read-only view of one pack.
+
+    Deleted frames are listed (with ``deleted=True``) but never returned by
+    :meth:`frames`.  Returned memoryviews are valid until :meth:`close`.
+    :meth:`refresh` picks up records appended since the pack was opened.
+
+    Args:
+        path (str): Pack file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._end = len(MAGIC)               # end of the last indexed record
+        self.entries: List[PackEntry] = []
+        self._by_name: Dict[str, int] = {}
+        self._order: Optional[List[int]] = None
+        self._ts: List[float] = []
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Map the pack again and index the records appended since the last scan.
+
+        Only the new records are read, so following a pack that is still being
+        written costs O(new records) per call.
+
+        Returns:
+            int: Number of records added to :attr:`entries`.
+        """
+        with open(self.path, "rb") as fh:
+            fcntl.flock(fh, fcntl.LOCK_SH)      # the writer may be cutting the footer off
+            try:
+                size = os.fstat(fh.fileno()).st_size
+                if size < len(MAGIC):
+                    raise ValueError(f"{self.path} is not a frame pack")
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                if mm[:len(MAGIC)] != MAGIC:
+                    mm.close()
+                    raise ValueError(f"{self.path} is not a frame pack")
+                if size < self._end:            # replaced by a shorter pack: index it afresh
+                    self._end, self.entries, self._by_name, self._order = len(MAGIC), [], {}, None
+                offsets, end = _scan(mm, size, self._end)
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+        # the old map is not closed here: another thread may still be copying a
+        # frame out of it; it is unmapped once the last reference goes
+        self._mm = mm
+        for off in offsets:
+            _, flags, name_len, data_len, ts = HEADER.unpack_from(mm, off)
+            name = bytes(mm[off + HEADER.size:off + HEADER.size + name_len]).decode()
+            data_offset = off + HEADER.size + name_len
+            self._by_name[name] = len(self.entries)
+            self.entries.append(PackEntry(name, ts, off, data_offset, data_len, bool(flags & FLAG_DELETED)))
+        self._end = max(self._end, end)
+        if offsets:
+            self._order = None                  # rebuilt by the next frames() call
+        return len(offsets)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "PackReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+
+    def index_of(self, name: str) -> Optional[int]:
+        return self._by_name.get(name)
+
+    def is_deleted(self, i: int) -> bool:
+        # read the live flag: another process may have deleted it since we opened
+        return bool(self._mm[self.entries[i].offset + 4] & FLAG_DELETED)
+
+    def frames(self, start: Optional[float] = None, end: Optional[float] = None) -> List[int]:
+        """Indices of live frames with ``start <= ts < end``, oldest first."""
+        if self._order is None:
+            self._order = sorted(range(len(self.entries)), key=lambda i: self.entries[i].ts)
+            self._ts = [self.entries[i].ts for i in self._order]
+        lo = 0 if start is None else bisect.bisect_left(self._ts, start)
+        hi = len(self._ts) if end is None else bisect.bisect_left(self._ts, end)
+        return [i for i in self._order[lo:hi] if not self.is_deleted(i)]
+
+    def frame_bytes(self, i: int) -> memoryview:
+        """Encoded bytes of frame *i*, without copying."""
+        e = self.entries[i]
+        if self.is_deleted(i):
+            raise KeyError(f"{e.name} was deleted from {self.path}")
+        return memoryview(self._mm)[e.data_offset:e.data_offset + e.size]
+
+    def image(self, i: int) -> Image.Image:
+        """Decode frame *i* into a loaded PIL image."""
+        with Image.open(io.BytesIO(self.frame_bytes(i))) as img:
+            img.load()
+            return img
+
+
+_readers: Dict[str, PackReader] = {}
+_readers_lock = threading.Lock()
+
+
+def _reader_for(pack: str, name: str) -> Tuple[PackReader, int]:
+    """Cached reader for *pack* that knows *name* (extended if the pack has grown)."""
+    with _readers_lock:
+        reader = _readers.get(pack)
+        if reader is None:
+            reader = _readers[pack] = PackReader(pack)
+        i = reader.index_of(name)
+        if i is None and reader.refresh():
+            i = reader.index_of(name)
+        if i is None:
+            raise FileNotFoundError(f"{name} not found in {pack}")
+        return reader, i
+
+
+def read_frame(ref: str) -> bytes:
+    """Encoded bytes of a frame given by ref or path."""
+    pack, name = split_ref(ref)
+    if name is None:
+        with open(ref, "rb") as fh:
+            return fh.read()
+    reader, i = _reader_for(pack, name)
+    return bytes(reader.frame_bytes(i))
+
+
+def open_frame(ref: str) -> Image.Image:
+    """Open a frame given by ref or path as a PIL image."""
+    pack, name = split_ref(ref)
+    if name is None:
+        return Image.open(ref)
+    return Image.open(io.BytesIO(read_frame(ref)))
+
+
+def scan_packs(file_dir: str) -> Iterator[FrameFile]:
+    """Yield every live packed frame in *file_dir* as a :class:`FrameFile`.
+
+    *path* is the frame's ref and *name* the ref's basename; packed frames are
+    never rewritten, so the capture time stands in for the mtime.
+    """
+    for pack in list_packs(file_dir):
+        try:
+            reader = PackReader(pack)
+        except ValueError as e:
+            print(f"Skipping {pack}: {e}")
+            continue
+        with reader:
+            for i in reader.frames():
+                e = reader.entries[i]
+                ref = make_ref(pack, e.name)
+                yield FrameFile(os.path.basename(ref), ref, e.size, int(e.ts * 1e9))
+
+
+def frame_exists(ref: str) -> bool:
+    pack, name = split_ref(ref)
+    if name is None:
+        return os.path.exists(ref)
+    try:
+        reader, i = _reader_for(pack, name)
+    except (FileNotFoundError, ValueError):
+        return False
+    return not reader.is_deleted(i)
+
+
+def stat_frame(ref: str) -> FrameFile:
+    """:class:`FrameFile` for a frame given by ref or path, as the scans report it.
+
+    Raises:
+        FileNotFoundError: If the file or packed frame no longer exists.
+    """
+    pack, name = split_ref(ref)
+    if name is None:
+        st = os.stat(ref)
+        return FrameFile(os.path.basename(ref), ref, st.st_size, st.st_mtime_ns)
+    try:
+        reader, i = _reader_for(pack, name)
+    except ValueError as e:
+        raise FileNotFoundError(f"{ref}: {e}") from e
+    if reader.is_deleted(i):
+        raise FileNotFoundError(f"{name} was deleted from {pack}")
+    e = reader.entries[i]
+    return FrameFile(os.path.basename(ref), ref, e.size, int(e.ts * 1e9))
+
+
+def remove_frame(ref: str) -> None:
+    """Delete a loose file, or zero-fill and flag a packed frame, and its LLM variant."""
+    from llm_variant import remove_variant
+
+    remove_variant(ref)
+    pack, name = split_ref(ref)
+    if name is None:
+        os.remove(ref)
+        return
+    reader, i = _reader_for(pack, name)
+    e = reader.entries[i]
+    fd = os.open(pack, os.O_WRONLY)
+    try:
+        os.pwrite(fd, bytes(e.size), e.data_offset)
+        os.pwrite(fd, bytes((FLAG_DELETED,)), e.offset + 4)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+###############################################################################
+# Writer                                                                      #
+###############################################################################
+
+
+class PackWriter:
+    """Append frames to the day's pack in *file_dir*; thread-safe.
+
+    Only one writer may append to a directory's packs at a time (see the
+    module docstring); readers are safe alongside it.
+
+    Args:
+        file_dir (str): Directory holding the packs.
+    """
+
+    def __init__(self, file_dir: str) -> None:
+        self.file_dir = file_dir
+        self._lock = threading.Lock()
+        self._fd = -1
+        self._path: Optional[str] = None
+        self._table: List[Tuple[int, float]] = []
+        self._end = 0
+
+    def _open(self, path: str) -> None:
+        self._seal()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            size = os.fstat(fd).st_size
+            table: List[Tuple[int, float]] = []
+            if size == 0:
+                os.write(fd, MAGIC)
+                end = len(MAGIC)
+            else:
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                    if mm[:len(MAGIC)] != MAGIC:
+                        raise ValueError(f"{path} is not a frame pack")
+                    offsets, end = _scan(mm, size)
+                    table = [(off, HEADER.unpack_from(mm, off)[4]) for off in offsets]
+                os.ftruncate(fd, end)       # drop the footer or a torn tail
+        except BaseException:
+            os.close(fd)
+            raise
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd, self._path, self._table, self._end = fd, path, table, end
+
+    def _seal(self) -> None:
+        if self._fd < 0:
+            return
+        table = b"".join(TABLE_ENTRY.pack(off, ts) for off, ts in self._table)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        os.pwrite(self._fd, table + FOOTER.pack(self._end, len(self._table), TABLE_MAGIC), self._end)
+        os.fsync(self._fd)
+        os.close(self._fd)          # releases the lock
+        self._fd, self._path = -1, None
+
+    def append(self, name: str, ts: float, data: bytes) -> str:
+        """Append an encoded frame and return its ref."""
+        path = os.path.join(self.file_dir, pack_name(ts))
+        encoded = name.encode()
+        record = HEADER.pack(RECORD_MAGIC, 0, len(encoded), len(data), ts) + encoded + data
+        with self._lock:
+            if path != self._path:
+                self._open(path)
+            os.pwrite(self._fd, record, self._end)
+            self._table.append((self._end, ts))
+            self._end += len(record)
+        return make_ref(path, name)
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._fd >= 0:
+                os.fsync(self._fd)
+
+    def close(self) -> None:
+        """Write the offset table and close the current pack."""
+        with self._lock:
+            self._seal()
+
+
+###############################################################################
+# Conversion tools                                                            #
+###############################################################################
+
+
+def _frame_ts(name: str, path: str) -> float:
+    try:
+        return float(name.split("_", 1)[0])
+    except ValueError:
+        return os.path.getmtime(path)
+
+
+def pack_directory(file_dir: str, remove: bool = True) -> int:
+    """Move every loose frame in *file_dir* into daily packs; returns frames packed."""
+    from capture_index import repath_frames
+
+    loose = []
+    with os.scandir(file_dir) as it:
+        for entry in it:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in FRAME_EXTENSIONS:
+                loose.append((_frame_ts(entry.name, entry.path), entry.name, entry.path))
+    loose.sort()
+    writer = PackWriter(file_dir)
+    moved: Dict[str, str] = {}
+    try:
+        for ts, name, path in loose:
+            with open(path, "rb") as fh:
+                ref = writer.append(name, ts, fh.read())
+            moved[name] = os.path.basename(ref)
+    finally:
+        writer.close()
+    repath_frames(file_dir, moved)
+    if remove:
+        for _, _, path in loose:
+            os.remove(path)
+    return len(loose)
+
+
+def unpack_directory(file_dir: str, remove: bool = True) -> int:
+    """Write every live frame in *file_dir*'s packs back as a loose file; returns frames written."""
+    from capture_index import repath_frames
+
+    written = 0
+    for pack in list_packs(file_dir):
+        moved: Dict[str, str] = {}
+        with PackReader(pack) as reader:
+            for i in reader.frames():
+                e = reader.entries[i]
+                path = os.path.join(file_dir, e.name)
+                if not os.path.exists(path):
+                    with open(path, "wb") as fh:
+                        fh.write(reader.frame_bytes(i))
+                    os.utime(path, (e.ts, e.ts))   # nightly jobs sort by mtime
+                    written += 1
+                moved[os.path.basename(make_ref(pack, e.name))] = e.name
+        repath_frames(file_dir, moved)
+        if remove:
+            with _readers_lock:
+                cached = _readers.pop(pack, None)
+            if cached is not None:
+                cached.close()
+            os.remove(pack)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Convert screenshot directories between loose frames and daily packs')
+    parser.add_argument('command', choices=('pack', 'unpack', 'ls'), help='pack loose frames, unpack packs, or list packs')
+    parser.add_argument('file_dir', type=str, help='Screenshots directory')
+    parser.add_argument('--keep', action='store_true', help='Keep the source files after converting')
+    args = parser.parse_args()
+    file_dir = os.path.expanduser(args.file_dir)
+    if args.command == 'pack':
+        print(f"packed {pack_directory(file_dir, remove=not args.keep)} frame(s)")
+    elif args.command == 'unpack':
+        print(f"unpacked {unpack_directory(file_dir, remove=not args.keep)} frame(s)")
+    else:
+        for pack in list_packs(file_dir):
+            with PackReader(pack) as reader:
+                live = reader.frames()
+                size = sum(reader.entries[i].size for i in live)
+                print(f"{os.path.basename(pack)}: {len(live)} live / {len(reader)} frames, {size / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Fixed-memory history of recent frames per monitor.
+
+Each monitor gets a ring of preallocated BGRA slots, sized on its first grab
+so the whole ring stays within a byte budget shared evenly between monitors.
+Grabs are copied into the oldest free slot instead of being kept as fresh
+full-resolution objects, and every slot carries the monotonic time its grab
+finished.
+
+A slot handed out by :meth:`FrameRing.before` is *pinned*: the ring will not
+overwrite it until :meth:`FrameRing.release` is called, so the saver can
+encode it while capture continues.  If every slot of a monitor is pinned the
+grab is dropped (counted in ``stats["overruns"]``).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+MIN_SLOTS = 2   # one pinned before-frame plus one being refreshed
+
+log = logging.getLogger("Screen")
+
+
+class FrameSlot:
+    """A reusable frame buffer with the ``mss.ScreenShot`` attributes the pipeline uses."""
+
+    __slots__ = ("width", "height", "raw", "timestamp", "seq", "pins")
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.raw = bytearray(width * height * 4)
+        self.timestamp = -float("inf")
+        self.seq = -1
+        self.pins = 0
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.width, self.height)
+
+    @property
+    def filled(self) -> bool:
+        return self.seq >= 0
+
+    @property
+    def rgb(self) -> bytes:
+        return Image.frombuffer("RGB", self.size, self.raw, "raw", "BGRX", 0, 1).tobytes()
+
+
+class FrameRing:
+    """Per-monitor rings of :class:`FrameSlot` within *budget* bytes.
+
+    Args:
+        monitors (int): Number of monitors (numbered from 1).
+        budget (int): Total bytes for all slots. Each monitor always keeps at
+            least ``MIN_SLOTS`` slots, even if that exceeds the budget.
+    """
+
+    def __init__(self, monitors: int, budget: int) -> None:
+        self.monitors = monitors
+        self.budget = budget
+        self._rings: Dict[int, List[FrameSlot]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = dict.fromkeys(("stored", "overruns", "late_before", "reallocs"), 0)
+
+    # ─────────────────────────────── allocation
+    def _allocate(self, mon: int, width: int, height: int) -> List[FrameSlot]:
+        per_mon = self.budget // max(1, self.monitors)
+        n = max(MIN_SLOTS, per_mon // (width * height * 4))
+        if n * width * height * 4 > per_mon:
+            log.warning(f"frame ring: monitor {mon} needs {n} slots of {width}x{height}, over its "
+                        f"{per_mon / 2**20:.0f} MB share of the budget")
+        ring = [FrameSlot(width, height) for _ in range(n)]
+        self._rings[mon] = ring
+        return ring
+
+    @property
+    def allocated(self) -> int:
+        """Bytes currently held by slots."""
+        return sum(len(s.raw) for ring in self._rings.values() for s in ring)
+
+    def slots(self, mon: int) -> int:
+        """Number of slots allocated for monitor *mon* (0 before its first grab)."""
+        return len(self._rings.get(mon, ()))
+
+    # ─────────────────────────────── writer
+    def store(self, mon: int, frame, timestamp: float) -> Optional[FrameSlot]:
+        """Copy *frame* (BGRA ``raw``) into the oldest unpinned slot of monitor *mon*.
+
+        Returns:
+            Optional[FrameSlot]: The slot written, or None if every slot was pinned.
+        """
+        with self._lock:
+            ring = self._rings.get(mon)
+            if ring is None or ring[0].size != (frame.width, frame.height):
+                if ring is not None:
+                    self.stats["reallocs"] += 1   # display mode changed
+                ring = self._allocate(mon, frame.width, frame.height)
+            free = [s for s in ring if s.pins == 0]
+            if not free:
+                self.stats["overruns"] += 1
+                return None
+            slot = min(free, key=lambda s: s.seq)
+            slot.seq = -1   # not selectable while being overwritten
+        # copy outside the lock; the slot is unpinned and unfilled, so nobody reads it
+        slot.raw[:] = frame.raw
+        with self._lock:
+            slot.timestamp = timestamp
+            slot.seq = self._seq
+            self._seq += 1
+            self.stats["stored"] += 1
+        return slot
+
+    # ─────────────────────────────── readers
+    def before(self, mon: int, when: float) -> Optional[FrameSlot]:
+        """Pin and return the newest frame of monitor *mon* taken before *when*.
+
+        Falls back to the oldest frame held if all of them are newer (counted in
+        ``stats["late_before"]``), and returns None if the monitor has no frames.
+        """
+        with self._lock:
+            filled = [s for s in self._rings.get(mon, ()) if s.filled]
+            if not filled:
+                return None
+            older = [s for s in filled if s.timestamp < when]
+            if older:
+                slot = max(older, key=lambda s: s.timestamp)
+            else:
+                self.stats["late_before"] += 1
+                slot = min(filled, key=lambda s: s.timestamp)
+            slot.pins += 1
+            return slot
+
+    def latest(self, mon: int) -> Optional[FrameSlot]:
+        """Newest frame of monitor *mon* (not pinned)."""
+        with self._lock:
+            filled = [s for s in self._rings.get(mon, ()) if s.filled]
+            return max(filled, key=lambda s: s.seq) if filled else None
+
+    def release(self, slot: FrameSlot) -> None:
+        """Unpin a slot returned by :meth:`before`."""
+        with self._lock:
+            slot.pins = max(0, slot.pins - 1)
@@ -0,0 +1,89 @@
+"""Switchable report of the time an entry point spends importing modules.
+
+Set ``RECORDR_IMPORT_REPORT=1`` in the environment of ``record.py``,
+``screenshot.py`` or ``ocr_check.py`` and, when the process exits, stderr gets
+one line per module that took at least a millisecond to import: its
+cumulative import time (including the modules it imported) and when, after
+startup, it was first imported::
+
+    import report (pid 4242): 38 module(s), 151.3 ms
+      cumul ms    at ms  module
+         47.6      2.1  asyncio
+         26.5     55.0  PIL.Image
+         ...
+
+Unlike ``python -X importtime`` this also works in the packaged app, where
+the interpreter ignores ``-X`` flags, and it keeps timing after startup, so
+dependencies that are only imported on first use (EasyOCR and torch, say)
+show up with the time they were pulled in.
+"""
+from __future__ import annotations
+
+import atexit
+import builtins
+import os
+import sys
+import time
+from typing import Dict, Optional, TextIO, Tuple
+
+ENV_VAR = "RECORDR_IMPORT_REPORT"
+
+_original_import = builtins.__import__
+_t0: Optional[float] = None
+_times: Dict[str, Tuple[float, float]] = {}      # module -> (started at, cumulative seconds)
+_outermost = 0.0                                 # seconds spent in imports not nested in another
+_depth = 0
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    global _depth, _outermost
+    # ``from pkg import mod`` loads pkg.mod without another __import__ call
+    new = [] if level else [m for m in (name, *(f"{name}.{item}" for item in fromlist or ())) if m not in sys.modules]
+    if not new:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _depth -= 1
+        elapsed = time.perf_counter() - start
+        if _depth == 0:
+            _outermost += elapsed
+        for m in new:
+            if m in sys.modules and m not in _times:
+                _times[m] = (start - _t0, elapsed)
+
+
+def install() -> None:
+    """Start timing imports and print the report to stderr at exit."""
+    global _t0
+    if _t0 is not None:
+        return
+    _t0 = time.perf_counter()
+    builtins.__import__ = _timed_import
+    atexit.register(report)
+
+
+def install_from_env() -> None:
+    """:func:`install` if ``RECORDR_IMPORT_REPORT`` is set to anything but ``0``."""
+    if os.environ.get(ENV_VAR, "0") not in ("", "0"):
+        install()
+
+
+def report(file: Optional[TextIO] = None, min_ms: float = 1.0) -> None:
+    """Print modules imported so far, slowest first.
+
+    Args:
+        file (Optional[TextIO], optional): Destination. Defaults to stderr.
+        min_ms (float, optional): Leave out modules faster than this. Defaults to 1.0.
+    """
+    file = file or sys.stderr
+    rows = sorted(_times.items(), key=lambda kv: kv[1][1], reverse=True)
+    print(f"import report (pid {os.getpid()}): {len(rows)} module(s), {_outermost * 1000:.1f} ms", file=file)
+    print("  cumul ms    at ms  module", file=file)
+    for name, (at, cumul) in rows:
+        if cumul * 1000 >= min_ms:
+            print(f"  {cumul * 1000:8.1f} {at * 1000:8.1f}  {name}", file=file)
+    file.flush()
+
@@ -10,7 +10,7 @@ import { initDatabase } from './db/db'
 import './ipc/ipc'
 import './ipc/db'
 import './ipc/insights'
-import { inferActions } from './services/inferActions'
+import { inferActions, stopScreenshotServer } from './services/inferActions'
 
 
 
@@ -255,6 +255,7 @@ function cleanup() {
   stopMonitoring()
   stopPreprocess()
   stopAgent()
+  stopScreenshotServer()
   
   // Close all windows
   const allWindows = BrowserWindow.getAllWindows()
@@ -0,0 +1,129 @@
+"""Listener-side coalescing of mouse callbacks before they reach the event loop.
+
+pynput calls ``on_move`` hundreds of times a second from its own thread.
+Handing each call to asyncio costs a coroutine, a future and a cross-thread
+wakeup, yet the recorder only needs to know *that* the cursor moved and
+roughly where.  :class:`EventCoalescer` sits between the two:
+
+* moves are collapsed into the latest position per monitor and delivered
+  at most once per ``interval``;
+* clicks and scrolls are delivered immediately, after any moves still
+  pending, so ordering is preserved;
+* each delivery is a single ``call_soon_threadsafe`` carrying a batch.
+
+A coalesced move carries the position of the *last* raw move but the time
+of the *first* one, so a before-frame picked for it predates the whole run.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (x, y, type, monotonic time)
+Event = Tuple[float, float, str, float]
+Deliver = Callable[[float, float, str, float], None]
+MonFor = Callable[[float, float], Optional[int]]
+
+EVENT_TYPES = ("move", "click", "scroll")
+
+
+class EventCoalescer:
+    """Collapse raw mouse callbacks into batches delivered on *loop*.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): Loop that runs *deliver*.
+        deliver (Deliver): ``(x, y, typ, when)`` callback, called on *loop*.
+        mon_for (MonFor): Maps a position to a monitor key (None if off-screen);
+            moves are coalesced per key.
+        interval (float, optional): Minimum seconds between move deliveries.
+            Defaults to 0.05.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, deliver: Deliver, mon_for: MonFor, interval: float = 0.05) -> None:
+        self.loop = loop
+        self.deliver = deliver
+        self.mon_for = mon_for
+        self.interval = interval
+
+        self.raw: Dict[str, int] = dict.fromkeys(EVENT_TYPES, 0)
+        self.delivered: Dict[str, int] = dict.fromkeys(EVENT_TYPES, 0)
+        self.wakeups = 0
+
+        self._lock = threading.Lock()
+        self._moves: Dict[Optional[int], Event] = {}   # monitor -> coalesced move
+        self._scheduled = False
+        self._last_wake = -float("inf")
+
+    # ─────────────────────────────── listener thread
+    def on_move(self, x: float, y: float) -> None:
+        now = time.monotonic()
+        mon = self.mon_for(x, y)
+        with self._lock:
+            self.raw["move"] += 1
+            prev = self._moves.get(mon)
+            self._moves[mon] = (x, y, "move", prev[3] if prev else now)
+            if self._scheduled:
+                return
+            self._scheduled = True
+            delay = max(0.0, self._last_wake + self.interval - now)
+        self._wake(self._drain_after, delay)
+
+    def on_click(self, x: float, y: float, button: object, pressed: bool) -> None:
+        if pressed:
+            self._urgent((x, y, "click", time.monotonic()))
+
+    def on_scroll(self, x: float, y: float, dx: int, dy: int) -> None:
+        self._urgent((x, y, "scroll", time.monotonic()))
+
+    def _urgent(self, event: Event) -> None:
+        with self._lock:
+            self.raw[event[2]] += 1
+            batch = self._take_moves()
+        batch.append(event)
+        self._wake(self._deliver, batch)
+
+    def _take_moves(self) -> List[Event]:
+        batch = sorted(self._moves.values(), key=lambda e: e[3])
+        self._moves.clear()
+        return batch
+
+    def _wake(self, fn, arg) -> None:
+        try:
+            self.loop.call_soon_threadsafe(fn, arg)
+        except RuntimeError:   # loop closed during shutdown
+            return
+        with self._lock:
+            self.wakeups += 1
+
+    # ─────────────────────────────── event loop
+    def _drain_after(self, delay: float) -> None:
+        if delay > 0:
+            self.loop.call_later(delay, self._drain)
+        else:
+            self._drain()
+
+    def _drain(self) -> None:
+        with self._lock:
+            self._scheduled = False
+            self._last_wake = time.monotonic()
+            batch = self._take_moves()
+        self._deliver(batch)
+
+    def _deliver(self, batch: List[Event]) -> None:
+        for x, y, typ, when in batch:
+            self.delivered[typ] += 1
+            self.deliver(x, y, typ, when)
+
+    def raw_total(self) -> int:
+        """Raw callbacks seen so far, all types, read under the listener lock."""
+        with self._lock:
+            return sum(self.raw.values())
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        """Raw vs delivered counts per event type and loop wakeups."""
+        with self._lock:
+            raw, wakeups = dict(self.raw), self.wakeups
+        return {"raw": raw, "delivered": dict(self.delivered), "wakeups": wakeups}
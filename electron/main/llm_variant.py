@@ -0,0 +1,192 @@
+"""Capture-time, LLM-ready copies of saved frames.
+
+The nightly insight job sends every frame to a vision model as base64.
+Screens are far larger than the model looks at: OpenAI's high-detail mode
+fits an image into 2048×2048, shrinks its short side to 768 px and bills
+85 + 170 tokens per 512 px tile.  :class:`LlmVariants` downscales each frame
+while it is still in memory, to the largest size that fits ``token_budget``
+under that rule, and caches the JPEG and its base64 text next to the
+original::
+
+    screens_dir/.llm/{ts}_{tag}.jpg     downscaled variant
+    screens_dir/.llm/{ts}_{tag}.b64     its base64 payload (data-URL body)
+
+Both are written atomically.  Removing a frame with
+``frame_pack.remove_frame`` removes its variant too, and ``ocr_check``
+sweeps variants whose frame is gone, so a frame deleted for privacy does not
+survive as a thumbnail.  Frames without a variant (dropped, or recorded
+without the stage) are simply sent at full size.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from frame_image import scaled_size, to_image
+from frame_pack import split_ref
+
+VARIANT_DIR = ".llm"
+
+log = logging.getLogger("Screen")
+
+
+def image_tokens(width: int, height: int) -> int:
+    """Tokens a high-detail image of this size costs (OpenAI tiling rule)."""
+    w, h = scaled_size((width, height), 2048)
+    if min(w, h) > 768:
+        scale = 768 / min(w, h)
+        w, h = round(w * scale), round(h * scale)
+    return 85 + 170 * math.ceil(w / 512) * math.ceil(h / 512)
+
+
+def budget_size(size: Tuple[int, int], token_budget: int, max_dim: Optional[int] = None) -> Tuple[int, int]:
+    """Largest size no bigger than *size* (and *max_dim*) that costs at most *token_budget* tokens.
+
+    Pixels the model would discard anyway (beyond 2048 px, or a short side
+    beyond 768 px) are never kept.
+    """
+    w, h = scaled_size(size, min(max_dim or 2048, 2048))
+    if min(w, h) > 768:
+        scale = 768 / min(w, h)
+        w, h = round(w * scale), round(h * scale)
+    if image_tokens(w, h) <= token_budget:
+        return w, h
+    # tokens only grow with size: binary-search the longest side that fits
+    lo, hi = 1, max(w, h)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if image_tokens(*scaled_size((w, h), mid)) <= token_budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return scaled_size((w, h), lo)
+
+
+def variant_paths(path: str) -> Tuple[str, str]:
+    """``(image, base64)`` cache paths of the frame at *path* (file path or pack ref)."""
+    pack, name = split_ref(path)
+    file_dir = os.path.dirname(pack)
+    stem = os.path.splitext(name if name is not None else os.path.basename(path))[0]
+    base = os.path.join(file_dir, VARIANT_DIR, stem)
+    return base + ".jpg", base + ".b64"
+
+
+def remove_variant(path: str) -> None:
+    """Delete the cached variant of the frame at *path*, if any."""
+    for p in variant_paths(path):
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+
+
+def link_variant(src: str, dst: str) -> None:
+    """Give the frame at *dst* (a hard link of *src*) the variant of *src*, if it has one."""
+    for s, d in zip(variant_paths(src), variant_paths(dst)):
+        try:
+            os.link(s, d)
+        except OSError:
+            return
+
+
+def prune_variants(file_dir: str, live: Iterable[str], grace: float = 60.0) -> int:
+    """Delete variants in *file_dir* whose frame is not among *live* paths; returns files removed.
+
+    Variants younger than *grace* seconds are kept: the recorder writes a
+    variant alongside its frame, so the frame may not exist yet.
+    """
+    keep = {os.path.basename(p) for path in live for p in variant_paths(path)}
+    cutoff = time.time() - grace
+    removed = 0
+    try:
+        it = os.scandir(os.path.join(file_dir, VARIANT_DIR))
+    except FileNotFoundError:
+        return 0
+    with it:
+        for entry in it:
+            if entry.name not in keep and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+    return removed
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+class LlmVariants:
+    """Thread pool that writes downscaled, base64-encoded copies of frames.
+
+    Args:
+        token_budget (int, optional): Most tokens a variant may cost at high detail.
+            Defaults to 765 (four tiles, e.g. 1024×640 for a 16:10 screen).
+        max_dim (Optional[int], optional): Extra cap on the longest side. Defaults to None.
+        quality (int, optional): JPEG quality of the variant. Defaults to 80.
+        workers (int, optional): Threads. Defaults to 1.
+    """
+
+    def __init__(self, token_budget: int = 765, max_dim: Optional[int] = None, quality: int = 80, workers: int = 1) -> None:
+        if token_budget < image_tokens(1, 1):
+            raise ValueError(f"token_budget must be at least {image_tokens(1, 1)}, got {token_budget}")
+        self.token_budget = token_budget
+        self.max_dim = max_dim
+        self.quality = quality
+        self.workers = max(1, workers)
+        self.stats: Dict[str, int] = dict.fromkeys(("made", "failed", "frame_px", "variant_px", "b64_bytes"), 0)
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # ─────────────────────────────── lifecycle
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="llm-variant")
+
+    async def stop(self) -> None:
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.shutdown)
+            self._pool = None
+
+    # ─────────────────────────────── work
+    async def make(self, frame, path: str) -> Optional[str]:
+        """Write the variant of *frame*, which is (or will be) saved at *path*.
+
+        The caller must keep *frame*'s buffer unchanged until this returns.
+
+        Returns:
+            Optional[str]: Path of the base64 payload, or None on failure.
+        """
+        if self._pool is None:
+            raise RuntimeError("LlmVariants.start() has not been called")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, self._make, frame, path)
+        except Exception as e:   # a missing variant only costs upload size
+            self.stats["failed"] += 1
+            log.info(f"LLM variant failed for {os.path.basename(path)}: {e}")
+            return None
+
+    def _make(self, frame, path: str) -> str:
+        size = budget_size((frame.width, frame.height), self.token_budget, self.max_dim)
+        img = to_image(frame, max_dim=max(size))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=self.quality)
+        data = buf.getvalue()
+        encoded = base64.b64encode(data)
+
+        img_path, b64_path = variant_paths(path)
+        os.makedirs(os.path.dirname(img_path), exist_ok=True)
+        _write_atomic(img_path, data)
+        _write_atomic(b64_path, encoded)
+        self.stats["made"] += 1
+        self.stats["frame_px"] += frame.width * frame.height
+        self.stats["variant_px"] += img.width * img.height
+        self.stats["b64_bytes"] += len(encoded)
+        return b64_path
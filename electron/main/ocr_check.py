@@ -1,34 +1,56 @@
-print("ocr_check.py loaded")
+import import_report
+import_report.install_from_env()
+
 import os
-from pathlib import Path
-import certifi
-import ssl
-import re
+import gc
+import itertools
+import json
+import multiprocessing
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 import warnings
-from sensitive_domains import SENSITIVE_DOMAINS
+from domain_matcher import get_matcher
+from capture_index import CaptureIndexReader, forget_frames
+from ocr_manifest import OcrManifest, scan_images
+from frame_pack import open_frame, remove_frame, scan_packs, split_ref
 import argparse
+from PIL import Image
+
+# EasyOCR (and with it torch and numpy) is imported on first use, in
+# _get_reader(), so --help and runs with nothing to OCR start quickly.
+
 # Suppress PyTorch pin_memory warning on MPS (Apple Silicon)
 warnings.filterwarnings('ignore', message='.*pin_memory.*MPS.*', category=UserWarning)
 
-# Configure SSL to use certifi's certificate bundle
-# This fixes SSL certificate verification errors on macOS
-os.environ['SSL_CERT_FILE'] = certifi.where()
-os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
+def _configure_ssl() -> None:
+    """Use certifi's certificate bundle for EasyOCR's model downloads.
 
-# Create SSL context with certifi certificates for urllib
-def create_ssl_context():
-    """Create SSL context using certifi's certificate bundle."""
-    context = ssl.create_default_context()
-    context.load_verify_locations(certifi.where())
-    return context
+    This fixes SSL certificate verification errors on macOS.  It patches the
+    process-wide defaults, so it only runs once the OCR reader is needed.
+    """
+    import certifi
+    import ssl
+    os.environ['SSL_CERT_FILE'] = certifi.where()
+    os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
 
-ssl._create_default_https_context = create_ssl_context
+    # Create SSL context with certifi certificates for urllib
+    def create_ssl_context():
+        """Create SSL context using certifi's certificate bundle."""
+        context = ssl.create_default_context()
+        context.load_verify_locations(certifi.where())
+        return context
 
-import easyocr
+    ssl._create_default_https_context = create_ssl_context
 
 # Common image extensions
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp'}
 
+# Persist manifest progress every N OCR'd frames so an interrupted run keeps it
+_MANIFEST_SAVE_EVERY = 200
+
 # Initialize EasyOCR reader (lazy initialization - models downloaded on first use)
 _reader = None
 
@@ -37,80 +59,438 @@ def _get_reader():
     global _reader
     if _reader is None:
         print("Initializing EasyOCR reader (this may take a moment on first run)...")
+        _configure_ssl()
+        import easyocr
         _reader = easyocr.Reader(['en'])  # Support English by default
     return _reader
 
+def _unload_reader() -> None:
+    """Drop the EasyOCR reader and release the memory its models hold."""
+    global _reader
+    if _reader is None:
+        return
+    print("Unloading idle EasyOCR reader")
+    _reader = None
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+
 def regex_check(text: str) -> bool:
-    for domain in SENSITIVE_DOMAINS:
-        if re.search(domain, text):
-            return True
-    return False
+    """Return True if *text* mentions any domain in ``SENSITIVE_DOMAINS``."""
+    return get_matcher().search(text) is not None
+
+class RoiConfig(NamedTuple):
+    """Region-of-interest OCR settings.
+
+    Sensitive domains almost always appear in a browser address bar or a window
+    title, so only a strip across the top of each window the capture index
+    recorded for the frame is OCR'd (across the top of the frame when it has no
+    window bounds).  A frame the strips do not flag is only "roi-unverified" in
+    the OCR manifest, so a later full-frame run still checks it; set
+    ``fallback`` to run that full-frame pass right away.
+    """
+    strip_frac: float = 0.12   # strip height as a fraction of the frame height
+    fallback: bool = False     # full-frame pass when the strips match nothing
+
+Box = Tuple[int, int, int, int]   # (left, top, right, bottom) in image pixels
+Bounds = List[List[float]]        # window rectangles as fractions of the frame (see capture_index)
+
+def _roi_boxes(width: int, height: int, roi: RoiConfig, windows: Optional[Bounds] = None) -> List[Box]:
+    """Return the strips to OCR in a *width* x *height* frame.
+
+    With *windows* (the frame's window bounds from the capture index) the top
+    strip of each window is used; otherwise a single strip across the top of
+    the frame.
+    """
+    strip = max(1, int(height * roi.strip_frac))
+    frame_strip = [(0, 0, width, min(strip, height))]
+    if not windows:
+        return frame_strip
+    boxes = set()
+    for left, top, right, bottom in windows:
+        left, top = max(0, int(left * width)), max(0, int(top * height))
+        right, bottom = min(width, round(right * width)), min(height, round(bottom * height), top + strip)
+        if right > left and bottom > top:
+            boxes.add((left, top, right, bottom))
+    return sorted(boxes) or frame_strip
+
+def _index_bounds(paths: List[str]) -> Dict[str, Bounds]:
+    """Window bounds the capture index recorded for *paths*, by path; frames without any are left out."""
+    by_dir: Dict[str, List[str]] = {}
+    for path in paths:
+        by_dir.setdefault(os.path.dirname(path), []).append(path)
+    out: Dict[str, Bounds] = {}
+    for file_dir, dir_paths in by_dir.items():
+        recorded = CaptureIndexReader(file_dir).window_bounds()
+        for path in dir_paths:
+            bounds = recorded.get(os.path.basename(path))
+            if bounds:
+                out[path] = bounds
+    return out
+
+def _read_text(reader, image) -> str:
+    """OCR an image path or array and return all detected text joined by spaces."""
+    # EasyOCR returns a list of tuples: (bbox, text, confidence)
+    results = reader.readtext(image)
+    return " ".join(text for (_, text, _) in results)
+
+def _ocr_source(img_path, img: Image.Image):
+    """What to hand EasyOCR for a full frame: the file path, or a packed frame's pixels."""
+    import numpy as np
+    return str(img_path) if split_ref(str(img_path))[1] is None else np.asarray(img.convert("RGB"))
+
+def _check_image(
+    reader, img_path, roi: Optional[RoiConfig] = None, windows: Optional[Bounds] = None
+) -> Tuple[str, List[str], Optional[str], int]:
+    """Return ``(path, domain_tokens, error, pixels_ocrd)`` for a single image file or pack ref.
 
-def ocr_check(file_dir: str) -> bool:
+    With *roi*, only the strips :func:`_roi_boxes` picks from *windows* are OCR'd.
     """
-    Process all images in a directory using OCR.
+    matcher = get_matcher()
+    try:
+        with open_frame(str(img_path)) as img:
+            width, height = img.size
+            if roi is None:
+                return str(img_path), matcher.candidates(_read_text(reader, _ocr_source(img_path, img))), None, width * height
+            import numpy as np
+            img = img.convert("RGB")
+            tokens: List[str] = []
+            pixels = 0
+            for box in _roi_boxes(width, height, roi, windows):
+                tokens += matcher.candidates(_read_text(reader, np.asarray(img.crop(box))))
+                pixels += (box[2] - box[0]) * (box[3] - box[1])
+        if roi.fallback and matcher.match_tokens(tokens) is None:
+            tokens = matcher.candidates(_read_text(reader, _ocr_source(img_path, img)))
+            pixels += width * height
+        return str(img_path), tokens, None, pixels
+    except Exception as e:
+        return str(img_path), [], str(e), 0
+
+###############################################################################
+# Worker processes                                                            #
+###############################################################################
+
+def _init_worker(torch_threads: int) -> None:
+    """Pool initializer: cap torch threads and load the reader once per worker."""
+    import torch
+    torch.set_num_threads(max(1, torch_threads))
+    _get_reader()
+
+def _check_batch(
+    paths: List[str], roi: Optional[RoiConfig] = None, bounds: Optional[Dict[str, Bounds]] = None
+) -> List[Tuple[str, List[str], Optional[str], int]]:
+    """Check a batch of images inside a worker process; *bounds* maps paths to their window bounds."""
+    reader = _get_reader()
+    bounds = bounds or {}
+    return [_check_image(reader, p, roi, bounds.get(p)) for p in paths]
+
+def _iter_verdicts(
+    image_files: List[str],
+    workers: int = 1,
+    batch_size: int = 16,
+    torch_threads: int = 1,
+    roi: Optional[RoiConfig] = None,
+    bounds: Optional[Dict[str, Bounds]] = None,
+) -> Iterator[Tuple[str, List[str], Optional[str], int]]:
+    """Yield ``(path, domain_tokens, error, pixels_ocrd)`` for every image as soon as it is known.
+
+    *bounds* maps image paths to the window bounds their ROI strips come from.
+
+    With ``workers <= 1`` images are checked serially in this process.  Otherwise
+    images are split into batches and fanned out to a pool of *workers* processes,
+    each loading its own reader once and running torch with *torch_threads*
+    threads; batch results are yielded in completion order.
+    """
+    if not image_files:
+        return
+    bounds = bounds or {}
+    if workers <= 1:
+        reader = _get_reader()
+        for img_path in image_files:
+            yield _check_image(reader, img_path, roi, bounds.get(img_path))
+        return
+
+    paths = list(image_files)
+    batch_size = max(1, batch_size)
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    # "spawn" avoids forking a process that may already hold torch/MPS state
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(batches)),
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(torch_threads,),
+    ) as pool:
+        futures = [
+            pool.submit(_check_batch, batch, roi, {p: bounds[p] for p in batch if p in bounds})
+            for batch in batches
+        ]
+        for fut in as_completed(futures):
+            yield from fut.result()
+
+###############################################################################
+# Directory check                                                             #
+###############################################################################
+
+Verdict = Callable[[str, Optional[str], Optional[str], int], None]
+
+def ocr_check(
+    file_dir: str,
+    workers: int = 1,
+    batch_size: int = 16,
+    torch_threads: int = 1,
+    on_verdict: Optional[Verdict] = None,
+    roi: Optional[RoiConfig] = None,
+) -> int:
+    """
+    Process all images in a directory using OCR and delete sensitive ones.
+    
+    Verdicts are cached in the directory's OCR manifest, so frames cleared on a
+    previous run are not OCR'd again unless their size or mtime changed.
+    Frames stored in daily packs (see ``frame_pack``) are checked as well;
+    flagged ones are zero-filled inside the pack.  Frames that only passed a
+    region-of-interest check are kept as "roi-unverified", so the next
+    full-frame run OCRs them again.
     
     Args:
         file_dir: Directory path containing images to process
+        workers: Number of OCR worker processes (1 = run serially in-process,
+            0 = one worker per ``torch_threads`` CPU cores)
+        batch_size: Number of images handed to a worker at a time
+        torch_threads: Torch intra-op threads per worker process
+        on_verdict: Optional ``(path, matched_domain, error, pixels_ocrd)``
+            callback invoked for every image as soon as its verdict is known
+        roi: OCR only candidate strips (see :class:`RoiConfig`) instead of the
+            full frame; None runs full-frame OCR
         
     Returns:
-        bool: True if at least one image was successfully processed, False otherwise
+        int: Number of images deleted (0 if nothing was processed)
     """
     if not os.path.exists(file_dir):
         print(f"Directory does not exist: {file_dir}")
-        return False
+        return 0
     
     if not os.path.isdir(file_dir):
         print(f"Path is not a directory: {file_dir}")
-        return False
+        return 0
     
-    # Find all image files in the directory
-    image_files = []
-    for ext in IMAGE_EXTENSIONS:
-        image_files.extend(Path(file_dir).glob(f"*{ext}"))
-        image_files.extend(Path(file_dir).glob(f"*{ext.upper()}"))
+    # Find all image files (single scandir pass) and packed frames in the directory
+    frames = {f.path: f for f in itertools.chain(scan_images(file_dir, IMAGE_EXTENSIONS), scan_packs(file_dir))}
     
-    if not image_files:
+    if not frames:
         print(f"No image files found in directory: {file_dir}")
-        return False
+        return 0
     
-    print(f"Found {len(image_files)} image file(s) to process")
-    
-    # Initialize EasyOCR reader
-    reader = _get_reader()
+    matcher = get_matcher()
+    mode = "full" if roi is None or roi.fallback else "roi-unverified"
+    manifest = OcrManifest(file_dir)
+    manifest.prune({f.name for f in frames.values()})
+    from llm_variant import prune_variants   # pulls in asyncio, which the checker never needs
+    prune_variants(file_dir, frames)
     
-    # Process each image with OCR
+    # Frames OCR'd on a previous run only need their stored tokens re-matched
+    # when the domain list changed; everything else must be OCR'd.
     del_files = []
-    for img_path in image_files:
-        try:
-            # Perform OCR using EasyOCR
-            # EasyOCR returns a list of tuples: (bbox, text, confidence)
-            results = reader.readtext(str(img_path))
-            
-            if results:
-                # Combine all detected text
-                all_text = []
-                for (_, text, _) in results:
-                    all_text.append(text)
-                
-                combined_text = " ".join(all_text)
-                if regex_check(combined_text):
-                    del_files.append(img_path.name)
-            
-        except Exception as e:
-            print(f"Error processing {img_path.name}: {e}")
+    to_ocr = []
+    for frame in frames.values():
+        tokens = manifest.tokens_for(frame, mode)
+        if tokens is None:
+            to_ocr.append(frame.path)
             continue
+        domain = None
+        if manifest.cleared_by(frame) != matcher.version:
+            domain = matcher.match_tokens(tokens)
+            if domain is not None:
+                del_files.append(frame.name)
+                remove_frame(frame.path)
+                manifest.forget(frame.name)
+            else:
+                manifest.mark_cleared(frame, tokens, matcher.version, manifest.mode_of(frame))
+        if on_verdict:
+            on_verdict(frame.path, domain, None, 0)
+    
+    print(f"Found {len(frames)} image file(s), {len(to_ocr)} to process")
+    
+    if workers <= 0:
+        workers = max(1, (os.cpu_count() or 1) // max(1, torch_threads))
+    
+    bounds = _index_bounds(to_ocr) if roi is not None and to_ocr else None
+    
+    # Delete flagged images as verdicts stream in
+    pixels_total = 0
+    try:
+        verdicts = _iter_verdicts(to_ocr, workers, batch_size, torch_threads, roi, bounds)
+        for n, (path, tokens, error, pixels) in enumerate(verdicts, 1):
+            pixels_total += pixels
+            frame = frames[path]
+            domain = None if error is not None else matcher.match_tokens(tokens)
+            if error is not None:
+                print(f"Error processing {frame.name}: {error}")
+            elif domain is not None:
+                del_files.append(frame.name)
+                remove_frame(path)
+                manifest.forget(frame.name)
+            else:
+                manifest.mark_cleared(frame, tokens, matcher.version, mode)
+            if on_verdict:
+                on_verdict(path, domain, error, pixels)
+            if n % _MANIFEST_SAVE_EVERY == 0:
+                manifest.save()
+    finally:
+        manifest.save()
+        forget_frames(file_dir, del_files)
+    if to_ocr:
+        print(f"OCR'd {pixels_total / len(to_ocr) / 1e6:.2f} MP per frame ({mode} mode)")
     print(f"del_files: {del_files}")
-    for file in del_files:
-        os.remove(os.path.join(file_dir, file))
     
     return len(del_files)
 
+def check_files(
+    paths: List[str],
+    delete: bool = True,
+    on_verdict: Optional[Verdict] = None,
+    roi: Optional[RoiConfig] = None,
+) -> int:
+    """
+    OCR an explicit list of images in-process, bypassing the directory manifest.
+    
+    Args:
+        paths: Image files or pack refs (``pack#name``) to check
+        delete: Remove images that mention a sensitive domain
+        on_verdict: Optional ``(path, matched_domain, error, pixels_ocrd)`` callback
+        roi: Region-of-interest settings, or None for full-frame OCR
+        
+    Returns:
+        int: Number of images flagged
+    """
+    matcher = get_matcher()
+    flagged = 0
+    paths = [os.path.expanduser(p) for p in paths]
+    bounds = _index_bounds(paths) if roi is not None else None
+    removed: Dict[str, List[str]] = {}   # directory -> deleted frames, recorded in its index at the end
+    try:
+        for path, tokens, error, pixels in _iter_verdicts(paths, roi=roi, bounds=bounds):
+            domain = None if error is not None else matcher.match_tokens(tokens)
+            if domain is not None:
+                flagged += 1
+                if delete:
+                    remove_frame(path)
+                    removed.setdefault(os.path.dirname(path), []).append(path)
+            if on_verdict:
+                on_verdict(path, domain, error, pixels)
+    finally:
+        for file_dir, deleted in removed.items():
+            forget_frames(file_dir, deleted)
+    return flagged
+
+###############################################################################
+# Service mode                                                                #
+###############################################################################
+
+def serve(idle_timeout: float = 300.0, roi: Optional[RoiConfig] = None) -> None:
+    """
+    Run as a resident JSON-lines service on stdin/stdout.
+    
+    Each input line is a request object, answered with one ``verdict`` line per
+    image followed by a ``done`` line (or a single ``error`` line):
+    
+        {"id": 1, "dir": "~/.cache/recordr/screenshots"}
+        {"id": 2, "files": ["/path/a.jpg", "/path/b.jpg"], "delete": false}
+        {"id": 3, "op": "ping"}
+        {"op": "shutdown"}
+    
+    A ``{"event": "ready"}`` line marks the start of the protocol; anything
+    printed before it is not JSON. The EasyOCR reader stays loaded between requests and is unloaded after
+    *idle_timeout* seconds without one (<= 0 keeps it loaded forever).
+    
+    Args:
+        idle_timeout: Seconds of inactivity before the reader is unloaded
+        roi: Region-of-interest settings applied to every request
+    """
+    # Protocol lines own stdout; route every diagnostic print to stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    
+    def emit(msg: dict) -> None:
+        out.write(json.dumps(msg) + "\n")
+        out.flush()
+    
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    
+    def pump() -> None:
+        for line in sys.stdin:
+            lines.put(line)
+        lines.put(None)  # EOF
+    
+    threading.Thread(target=pump, name="ocr-stdin", daemon=True).start()
+    emit({"event": "ready", "pid": os.getpid()})
+    
+    while True:
+        try:
+            line = lines.get(timeout=idle_timeout if idle_timeout > 0 and _reader is not None else None)
+        except queue.Empty:
+            _unload_reader()
+            continue
+        if line is None:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get("id")
+            op = req.get("op", "check")
+            if op == "shutdown":
+                emit({"id": req_id, "event": "done"})
+                break
+            if op == "ping":
+                emit({"id": req_id, "event": "pong", "reader_loaded": _reader is not None})
+                continue
+            if op != "check":
+                raise ValueError(f"unknown op: {op}")
+            
+            def on_verdict(path: str, domain: Optional[str], error: Optional[str], pixels: int) -> None:
+                emit({"id": req_id, "event": "verdict", "path": path, "sensitive": domain is not None,
+                      "domain": domain, "error": error, "pixels": pixels})
+            
+            if "dir" in req:
+                deleted = ocr_check(os.path.expanduser(req["dir"]), on_verdict=on_verdict, roi=roi)
+            elif "files" in req:
+                deleted = check_files(req["files"], delete=req.get("delete", True), on_verdict=on_verdict, roi=roi)
+            else:
+                raise ValueError("request needs 'dir' or 'files'")
+            emit({"id": req_id, "event": "done", "flagged": deleted})
+        except Exception as e:
+            emit({"id": req_id, "event": "error", "message": str(e)})
+
 def main():
     parser = argparse.ArgumentParser(description='Check for sensitive domains in images')
-    parser.add_argument('--file-dir', type=str, required=True, help='Directory to store screenshots', default="~/.cache/recordr/screenshots")
+    parser.add_argument('--file-dir', type=str, help='Directory to store screenshots', default="~/.cache/recordr/screenshots")
+    parser.add_argument('--serve', action='store_true', help='Run as a resident JSON-lines service on stdin/stdout')
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='Service mode: seconds before an idle reader is unloaded (<= 0: never)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of OCR worker processes (default: 1, serial; 0: one per core)')
+    parser.add_argument('--batch-size', type=int, default=16, help='Images per worker batch')
+    parser.add_argument('--torch-threads', type=int, default=1, help='Torch threads per worker process')
+    parser.add_argument('--roi', action='store_true', help='OCR only a strip across the top of each window the capture index recorded; frames it clears stay unverified until a full-frame run')
+    parser.add_argument('--roi-strip', type=float, default=RoiConfig().strip_frac, help='ROI strip height as a fraction of the frame height')
+    parser.add_argument('--roi-fallback', action='store_true', help='Run a full-frame pass when the ROI strips match nothing')
     args = parser.parse_args()
-    ocr_check(args.file_dir)
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    roi = RoiConfig(strip_frac=args.roi_strip, fallback=args.roi_fallback) if args.roi else None
+    if args.serve:
+        serve(idle_timeout=args.idle_timeout, roi=roi)
+        return
+    ocr_check(os.path.expanduser(args.file_dir), workers=args.workers, batch_size=args.batch_size,
+              torch_threads=args.torch_threads, roi=roi)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # required for the worker pool in PyInstaller builds
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,133 @@
+"""Persistent record of which screenshots ``ocr_check`` has already cleared.
+
+The manifest lives inside the screenshots directory (``.ocr_manifest.json``)
+and maps each frame's file name to its identity (size + mtime) and the
+domain-like tokens OCR found in it.  A frame whose identity is unchanged never
+needs to be OCR'd again: when ``SENSITIVE_DOMAINS`` changes, the stored tokens
+are simply re-matched against the new list, so only frames that mention a
+newly-listed domain are affected.
+
+Each entry also records how much of the frame was OCR'd: ``"full"``, or
+``"roi-unverified"`` when only region-of-interest strips were read.  An
+unverified frame is never taken as cleared by a full-frame run, which OCRs it
+again.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+MANIFEST_NAME = ".ocr_manifest.json"
+_FORMAT = 1
+
+
+class FrameFile(NamedTuple):
+    """A screenshot found by :func:`scan_images`."""
+    name: str
+    path: str
+    size: int
+    mtime_ns: int
+
+
+def scan_images(file_dir: str, extensions: set[str]) -> Iterator[FrameFile]:
+    """Yield every regular file in *file_dir* whose extension is in *extensions*.
+
+    One ``os.scandir`` pass; extensions are compared case-insensitively.
+    """
+    with os.scandir(file_dir) as it:
+        for entry in it:
+            if os.path.splitext(entry.name)[1].lower() not in extensions:
+                continue
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+            yield FrameFile(entry.name, entry.path, st.st_size, st.st_mtime_ns)
+
+
+class OcrManifest:
+    """Cleared-frame verdicts for a single screenshots directory.
+
+    Args:
+        file_dir (str): Screenshots directory the manifest belongs to.
+    """
+
+    def __init__(self, file_dir: str) -> None:
+        self.path = os.path.join(file_dir, MANIFEST_NAME)
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable OCR manifest {self.path}: {e}")
+            return
+        if data.get("format") == _FORMAT:
+            self._entries = data.get("entries", {})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ─────────────────────────────── lookups
+    def tokens_for(self, frame: FrameFile, mode: str = "full") -> Optional[List[str]]:
+        """Return stored OCR tokens for *frame*, or None if it must be OCR'd.
+
+        Tokens from a region-of-interest pass (``"roi-unverified"``) do not satisfy a
+        ``"full"`` lookup.
+        """
+        entry = self._entries.get(frame.name)
+        if entry is None or entry["size"] != frame.size or entry["mtime_ns"] != frame.mtime_ns:
+            return None
+        if mode == "full" and entry.get("mode", "full") != "full":
+            return None
+        return entry["tokens"]
+
+    def cleared_by(self, frame: FrameFile) -> Optional[str]:
+        """Return the domain-list version that last cleared *frame*, if any."""
+        entry = self._entries.get(frame.name)
+        return entry.get("domains") if entry else None
+
+    def mode_of(self, frame: FrameFile) -> str:
+        """Return the OCR mode (``"full"`` or ``"roi-unverified"``) recorded for *frame*."""
+        entry = self._entries.get(frame.name)
+        return entry.get("mode", "full") if entry else "full"
+
+    # ─────────────────────────────── updates
+    def mark_cleared(self, frame: FrameFile, tokens: List[str], domains_version: str, mode: str = "full") -> None:
+        """Record that *frame* (with OCR *tokens*) passed the *domains_version* list."""
+        self._entries[frame.name] = {
+            "size": frame.size,
+            "mtime_ns": frame.mtime_ns,
+            "domains": domains_version,
+            "mode": mode,
+            "tokens": tokens,
+        }
+        self._dirty = True
+
+    def forget(self, name: str) -> None:
+        """Drop the entry for *name* (e.g. after the frame was deleted)."""
+        if self._entries.pop(name, None) is not None:
+            self._dirty = True
+
+    def prune(self, present: set[str]) -> None:
+        """Drop entries for frames that are no longer in the directory."""
+        for name in [n for n in self._entries if n not in present]:
+            del self._entries[name]
+            self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the manifest if it changed."""
+        if not self._dirty:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"format": _FORMAT, "entries": self._entries}, fh, separators=(",", ":"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,115 @@
+"""Adaptive capture rate and debounce for the recorder.
+
+:class:`RateGovernor` turns three measurements, taken once per tick, into a
+capture FPS for the active monitor and an interaction debounce:
+
+* **change** – fraction of thumbnail tiles (see ``frame_hash``) that changed
+  on the active monitor since the previous tick;
+* **input rate** – raw mouse events per second;
+* **CPU** – the recorder's own CPU time per wall-clock second (1.0 = one
+  core; OCR worker processes are not included).
+
+Screen or input activity pushes the FPS towards ``max_fps`` and the debounce
+towards ``min_debounce``, so fast-changing content such as scrolling or a
+video call is sampled densely and split into short interactions.  A static
+screen decays towards ``min_fps`` and ``max_debounce``.  Whenever CPU use is
+over ``cpu_budget`` the FPS is cut proportionally at once, whatever the
+activity.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Deque, NamedTuple
+
+log = logging.getLogger("Screen")
+
+
+class Decision(NamedTuple):
+    fps: float
+    debounce: float
+    change: float        # fraction of tiles changed
+    input_rate: float    # raw events per second
+    cpu: float           # cores used
+    throttled: bool      # CPU budget capped the FPS
+
+
+class RateGovernor:
+    """Pick capture FPS and debounce from activity and CPU use.
+
+    Args:
+        min_fps (float, optional): Lowest active-monitor FPS. Defaults to 2.
+        max_fps (float, optional): Highest active-monitor FPS. Defaults to 15.
+        min_debounce (float, optional): Shortest debounce in seconds. Defaults to 0.5.
+        max_debounce (float, optional): Longest debounce in seconds. Defaults to 3.
+        cpu_budget (float, optional): Target CPU use in cores. Defaults to 0.5.
+        interval (float, optional): Seconds between ticks. Defaults to 1.
+        change_full (float, optional): Tile-change fraction per tick treated as
+            full activity. Defaults to 0.05.
+        input_full (float, optional): Input events per second treated as full
+            activity. Defaults to 20.
+        smoothing (float, optional): Weight of each new FPS and debounce target,
+            0–1; CPU cuts are not smoothed. Defaults to 0.5.
+    """
+
+    def __init__(
+        self,
+        min_fps: float = 2.0,
+        max_fps: float = 15.0,
+        min_debounce: float = 0.5,
+        max_debounce: float = 3.0,
+        cpu_budget: float = 0.5,
+        interval: float = 1.0,
+        change_full: float = 0.05,
+        input_full: float = 20.0,
+        smoothing: float = 0.5,
+    ) -> None:
+        if not 0 < min_fps <= max_fps:
+            raise ValueError(f"need 0 < min_fps <= max_fps, got {min_fps}, {max_fps}")
+        if not 0 <= min_debounce <= max_debounce:
+            raise ValueError(f"need 0 <= min_debounce <= max_debounce, got {min_debounce}, {max_debounce}")
+        if cpu_budget <= 0:
+            raise ValueError(f"cpu_budget must be positive, got {cpu_budget}")
+        self.min_fps, self.max_fps = min_fps, max_fps
+        self.min_debounce, self.max_debounce = min_debounce, max_debounce
+        self.cpu_budget = cpu_budget
+        self.interval = interval
+        self.change_full = change_full
+        self.input_full = input_full
+        self.smoothing = smoothing
+
+        self.fps = min_fps
+        self.debounce = max_debounce
+        self.decisions: Deque[Decision] = deque(maxlen=600)
+
+    def reset(self, fps: float, debounce: float) -> None:
+        """Start from *fps* and *debounce* (clamped to the bounds) and forget past decisions."""
+        self.fps = max(self.min_fps, min(self.max_fps, fps))
+        self.debounce = max(self.min_debounce, min(self.max_debounce, debounce))
+        self.decisions.clear()
+
+    def update(self, change: float, input_rate: float, cpu: float) -> Decision:
+        """Feed one tick of measurements and return the new decision."""
+        activity = max(min(1.0, change / self.change_full), min(1.0, input_rate / self.input_full))
+        target = self.min_fps + (self.max_fps - self.min_fps) * activity
+        throttled = cpu > self.cpu_budget
+        if throttled:
+            # multiplicative decrease, applied immediately
+            fps = min(target, self.fps * self.cpu_budget / cpu)
+        else:
+            fps = self.fps + self.smoothing * (target - self.fps)
+        self.fps = max(self.min_fps, min(self.max_fps, fps))
+
+        target_debounce = self.max_debounce - (self.max_debounce - self.min_debounce) * activity
+        self.debounce += self.smoothing * (target_debounce - self.debounce)
+
+        decision = Decision(self.fps, self.debounce, change, input_rate, cpu, throttled)
+        prev = self.decisions[-1] if self.decisions else None
+        self.decisions.append(decision)
+        if prev is None or throttled != prev.throttled or abs(self.fps - prev.fps) > 0.1 * prev.fps \
+                or abs(self.debounce - prev.debounce) > 0.1:
+            log.info(
+                f"governor fps={self.fps:.1f} debounce={self.debounce:.2f}s change={change:.3f} "
+                f"input={input_rate:.1f}/s cpu={cpu:.2f}{' throttled' if throttled else ''}"
+            )
+        return decision
@@ -3,11 +3,18 @@ from __future__ import annotations
 # Imports                                                                     #
 ###############################################################################
 
+# — Startup profiling (before anything it should time) —
+import import_report
+import_report.install_from_env()
+
 # — Standard library —
 import argparse
 import base64
+import io
 import logging
+import multiprocessing
 import os
+import threading
 import time
 from collections import deque
 from typing import Any, Dict, Iterable, List, Optional
@@ -15,104 +22,181 @@ from typing import Any, Dict, Iterable, List, Optional
 import asyncio
 
 # — Third-party —
-import mss
-import Quartz
 from PIL import Image
-from pynput import mouse           # still synchronous
-from shapely.geometry import box
-from shapely.ops import unary_union
 
-print("record.py loaded")
+# — Local —
+from capture_backend import BACKENDS, CaptureBackend, get_backend
+from capture_index import CaptureIndex, IndexEntry
+from capture_scheduler import CaptureScheduler
+import frame_hash
+from frame_ring import FrameRing
+from input_coalescer import EventCoalescer
+from rate_governor import RateGovernor
+from frame_hash import tile_distance
+from frame_pack import PackWriter
+from llm_variant import LlmVariants, link_variant, remove_variant, variant_paths
+from frame_encoder import FORMATS, QUEUE_POLICIES, SUBSAMPLING, FrameEncoder
+from sensitivity_stage import ACTIONS, DROP_POLICIES, SensitivityStage
+from title_filter import SCOPES, TitleFilter
+from visibility import visible_ratios
+
+log = logging.getLogger("Screen")
 
 ###############################################################################
 # Window‑geometry helpers                                                     #
 ###############################################################################
 
 
-
-    
-
-def _get_global_bounds() -> tuple[float, float, float, float]:
-    """Return a bounding box enclosing **all** physical displays.
-
-    Returns
-    -------
-    (min_x, min_y, max_x, max_y) tuple in Quartz global coordinates.
-    """
-    err, ids, cnt = Quartz.CGGetActiveDisplayList(16, None, None)
-    if err != Quartz.kCGErrorSuccess:  # pragma: no cover (defensive)
-        raise OSError(f"CGGetActiveDisplayList failed: {err}")
-
-    min_x = min_y = float("inf")
-    max_x = max_y = -float("inf")
-    for did in ids[:cnt]:
-        r = Quartz.CGDisplayBounds(did)
-        x0, y0 = r.origin.x, r.origin.y
-        x1, y1 = x0 + r.size.width, y0 + r.size.height
-        min_x, min_y = min(min_x, x0), min(min_y, y0)
-        max_x, max_y = max(max_x, x1), max(max_y, y1)
-    return min_x, min_y, max_x, max_y
-
-
-def _get_visible_windows() -> List[tuple[dict, float]]:
+def _get_visible_windows(backend: CaptureBackend) -> List[tuple[dict, float]]:
     """List *onscreen* windows with their visible‑area ratio.
 
     Each tuple is ``(window_info_dict, visible_ratio)`` where *visible_ratio*
-    is in ``[0.0, 1.0]``.  Internal system windows (Dock, WindowServer, …) are
-    ignored.
-    """
-    _, _, _, gmax_y = _get_global_bounds()
+    is in ``(0.0, 1.0]``.  Internal system windows (Dock, WindowServer, …) are
+    ignored, as are fully occluded ones.
 
-    # opts = (
-    #     Quartz.kCGWindowListOptionOnScreenOnly
-    #     | Quartz.kCGWindowListOptionIncludingWindow
-    # )
-    opts = Quartz.kCGWindowListOptionAll
-    wins = Quartz.CGWindowListCopyWindowInfo(opts, Quartz.kCGNullWindowID)
-
-    occupied = None  # running union of opaque regions above the current window
-    result: list[tuple[dict, float]] = []
+    Args:
+        backend (CaptureBackend): Source of the front-to-back window list.
+    """
+    wins = backend.windows()
 
+    infos: list[dict] = []
+    rects: list[tuple[int, int, int, int]] = []
     for info in wins:
         owner = info.get("kCGWindowOwnerName", "")
         if owner in ("Dock", "WindowServer", "Window Server"):
             continue
 
         bounds = info.get("kCGWindowBounds", {})
-        x, y, w, h = (
-            bounds.get("X", 0),
-            bounds.get("Y", 0),
-            bounds.get("Width", 0),
-            bounds.get("Height", 0),
-        )
+        w, h = int(bounds.get("Width", 0)), int(bounds.get("Height", 0))
         if w <= 0 or h <= 0:
             continue  # hidden or minimised
+        infos.append(info)
+        rects.append((int(bounds.get("X", 0)), int(bounds.get("Y", 0)), w, h))
+
+    result = [(info, ratio) for info, ratio in zip(infos, visible_ratios(rects)) if ratio > 0]
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("visible windows: %s", [
+            (info.get("kCGWindowOwnerName", ""), info.get("kCGWindowName", "Unknown"), f"{ratio:.2%}")
+            for info, ratio in result
+        ])
+    return result
 
-        inv_y = gmax_y - y - h  # Quartz→Shapely Y‑flip
-        poly = box(x, inv_y, x + w, inv_y + h)
-        if poly.is_empty:
-            continue
 
-        visible = poly if occupied is None else poly.difference(occupied)
-        if not visible.is_empty:
-            ratio = visible.area / poly.area
-            result.append((info, ratio))
-            occupied = poly if occupied is None else unary_union([occupied, poly])
-            window_name = info.get("kCGWindowName", "Unknown")
-            print(f"  - Owner: {owner}, Window: {window_name}, Visible: {ratio:.2%}", f"Bounds: {x}, {y}, {w}, {h}")
-        print("--------------------------------")
+def _window_owners(windows: List[tuple[dict, float]]) -> List[str]:
+    """Owner names of *windows* (a :func:`_get_visible_windows` result), front to back, without repeats."""
+    return list(dict.fromkeys(info.get("kCGWindowOwnerName", "") for info, _ in windows))
 
-    return result
 
+def _window_bounds(windows: List[tuple[dict, float]], mon: dict) -> List[List[float]]:
+    """Where *windows* lie on display *mon*, front to back, as fractions of it.
+
+    Each item is ``[left, top, right, bottom]`` clipped to the display, so a
+    reader can map it onto a frame of any pixel density.  Windows off the
+    display and outside the normal layer (menu bar, overlays) are left out.
+    """
+    out = []
+    for info, _ in windows:
+        if info.get("kCGWindowLayer", 0) != 0:
+            continue
+        b = info.get("kCGWindowBounds", {})
+        x, y = float(b.get("X", 0)) - mon["left"], float(b.get("Y", 0)) - mon["top"]
+        left, top = max(0.0, x / mon["width"]), max(0.0, y / mon["height"])
+        right = min(1.0, (x + float(b.get("Width", 0))) / mon["width"])
+        bottom = min(1.0, (y + float(b.get("Height", 0))) / mon["height"])
+        if right > left and bottom > top:
+            out.append([round(v, 4) for v in (left, top, right, bottom)])
+    return out
 
-def _is_app_visible(names: Iterable[str]) -> bool:
-    """Return *True* if **any** window from *names* is at least partially visible."""
+
+def _visible_app(names: Iterable[str], windows: List[tuple[dict, float]]) -> Optional[str]:
+    """Return the first app from *names* with a window at least partially visible, or None.
+
+    *windows* is a result of :func:`_get_visible_windows`.
+    """
     targets = set(names)
-    print("Visible windows:", _get_visible_windows())
-    return any(
-        info.get("kCGWindowOwnerName", "") in targets and ratio > 0
-        for info, ratio in _get_visible_windows()
-    )
+    for info, ratio in windows:
+        owner = info.get("kCGWindowOwnerName", "")
+        if owner in targets and ratio > 0:
+            return owner
+    return None
+
+
+class WindowSnapshot:
+    """Share one :func:`_get_visible_windows` result among callers for *ttl* seconds.
+
+    A single mouse event asks for the window list several times (skip checks,
+    flush, saves); each miss costs a ``CGWindowListCopyWindowInfo`` round-trip
+    plus the occlusion pass.  Concurrent callers that miss together wait for
+    one refresh instead of each doing their own.
+
+    Args:
+        backend (CaptureBackend): Source of the window list.
+        ttl (float, optional): Maximum age of a snapshot in seconds. Defaults to 0.25.
+    """
+
+    def __init__(self, backend: CaptureBackend, ttl: float = 0.25) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._taken_at = -float("inf")
+        self._windows: List[tuple[dict, float]] = []
+
+    def get(self) -> List[tuple[dict, float]]:
+        """Return the current snapshot, refreshing it if it is older than ``ttl``."""
+        with self._lock:
+            if time.monotonic() - self._taken_at < self.ttl:
+                self.hits += 1
+                return self._windows
+            self.misses += 1
+            self._windows = _get_visible_windows(self.backend)
+            self._taken_at = time.monotonic()
+            return self._windows
+
+    def invalidate(self) -> None:
+        """Force the next :meth:`get` to refresh."""
+        with self._lock:
+            self._taken_at = -float("inf")
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and hit rate."""
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+_DEDUPE_MODES = (None, "drop", "link")
+STORAGE_MODES = ("loose", "pack")
+
+
+class Interaction:
+    """One debounced burst of input on a single monitor.
+
+    Created by the interaction actor on the first event of a burst, then
+    handed as a whole to a flush task; nothing else mutates it.
+    """
+
+    __slots__ = ("seq", "mon", "type", "x", "y", "before", "started", "last_input", "events", "after", "after_ts",
+                 "before_windows", "after_windows", "before_bounds", "after_bounds")
+
+    def __init__(self, seq: int, mon: int, typ: str, x: float, y: float, before, started: float) -> None:
+        self.seq = seq
+        self.mon = mon
+        self.type = typ
+        self.x = x                      # position of the first event
+        self.y = y
+        self.before = before            # pinned FrameSlot from the ring
+        self.started = started          # monotonic time of the first event
+        self.last_input = time.monotonic()
+        self.events = 1
+        self.after = None
+        self.after_ts: Optional[float] = None   # wall-clock time of the after-frame
+        # visible window owners, front to back, when each frame was taken
+        self.before_windows: List[str] = []
+        self.after_windows: List[str] = []
+        # and where their windows were on the monitor (see _window_bounds)
+        self.before_bounds: Optional[List[List[float]]] = None
+        self.after_bounds: Optional[List[List[float]]] = None
 
 ###############################################################################
 # Screen observer                                                             #
@@ -138,14 +222,14 @@ class Screen():
         debug (bool, optional): Enable debug logging. Defaults to False.
 
     Attributes:
-        _CAPTURE_FPS (int): Frames per second for screen capture.
-        _DEBOUNCE_SEC (int): Seconds to wait before processing an interaction.
-        _MON_START (int): Index of first real display in mss.
+        _CAPTURE_FPS (int): Frames per second for the monitor under the cursor
+            (the starting point when a governor is used).
+        _DEBOUNCE_SEC (int): Seconds to wait before processing an interaction
+            (likewise).
     """
 
     _CAPTURE_FPS: int = 10
     _DEBOUNCE_SEC: int = 2
-    _MON_START: int = 1     # first real display in mss
 
     # ─────────────────────────────── construction
     def __init__(
@@ -153,6 +237,23 @@ class Screen():
         screenshots_dir: str = "~/.cache/recordr/screenshots",
         skip_when_visible: Optional[str | list[str]] = None,
         debug: bool = False,
+        sensitivity: Optional[SensitivityStage] = None,
+        dedupe: Optional[str] = None,
+        dedupe_tiles: int = 2,
+        window_ttl: float = 0.25,
+        backend: Optional[CaptureBackend] = None,
+        background_fps: float = 0.5,
+        idle_fps: float = 0.1,
+        idle_after: float = 30.0,
+        frame_budget: int = 256 * 2**20,
+        encoder: Optional[FrameEncoder] = None,
+        input_interval: float = 0.05,
+        max_in_flight: int = 4,
+        governor: Optional[RateGovernor] = None,
+        capture_index: bool = True,
+        storage: str = "loose",
+        llm_variants: Optional[LlmVariants] = None,
+        title_filter: Optional[TitleFilter] = None,
     ) -> None:
         """Initialize the Screen observer.
         
@@ -167,21 +268,100 @@ class Screen():
             model_name (str, optional): GPT model to use for vision analysis. Defaults to "gpt-4o-mini".
             history_k (int, optional): Number of recent screenshots to keep in history. Defaults to 10.
             debug (bool, optional): Enable debug logging. Defaults to False.
+            sensitivity (Optional[SensitivityStage], optional): Inline OCR stage that checks
+                every saved frame in the background. Defaults to None (nightly check only).
+            dedupe (Optional[str], optional): What to do with a frame that is a near-duplicate of
+                its reference (the before-frame, or the last frame saved on that monitor):
+                ``"drop"`` skips it, ``"link"`` hard-links the reference file, None saves every
+                frame. With ``"drop"`` the frame's index entry points at the reference, which may
+                belong to an earlier interaction, so before/after pairs are no longer each
+                interaction's own frames. Defaults to None.
+            dedupe_tiles (int, optional): Number of changed tiles (see ``frame_hash``) a frame
+                may differ by and still count as a duplicate. Defaults to 2.
+            window_ttl (float, optional): Seconds a window-list snapshot is shared between
+                skip checks before it is refreshed. Defaults to 0.25.
+            backend (Optional[CaptureBackend], optional): Display/window/input backend. The
+                observer closes it when it stops. Defaults to the platform backend.
+            background_fps (float, optional): Refresh rate of monitors the cursor is not on.
+                Defaults to 0.5.
+            idle_fps (float, optional): Refresh rate of every monitor after *idle_after*
+                seconds without input; 0 stops grabbing until the next event. Defaults to 0.1.
+            idle_after (float, optional): Seconds without input before backing off to
+                *idle_fps*. Defaults to 30.
+            frame_budget (int, optional): Bytes of recent frames kept across all monitors to
+                pick before-frames from. Defaults to 256 MiB.
+            encoder (Optional[FrameEncoder], optional): Pool that writes frames to disk
+                (format, quality, queue bound). Defaults to ``FrameEncoder()``: JPEG at
+                quality 70 on two threads, blocking when its queue is full.
+            input_interval (float, optional): Minimum seconds between deliveries of
+                coalesced mouse moves to the event loop. Defaults to 0.05.
+            max_in_flight (int, optional): Interactions that may be flushing (after-frame
+                grab, encode, write) at once before new ones wait; on the same monitor the
+                after-grabs and dedupe decisions run one at a time, in interaction order,
+                while the encodes and writes overlap. Defaults to 4.
+            governor (Optional[RateGovernor], optional): Adjusts the capture FPS and debounce
+                at runtime from screen change, input rate and CPU use. Defaults to None
+                (fixed ``_CAPTURE_FPS`` and ``_DEBOUNCE_SEC``).
+            capture_index (bool, optional): Append every saved frame (time, before/after
+                pairing, monitor, event, visible windows and their bounds) to
+                ``capture_index.INDEX_NAME`` in *screenshots_dir*. Defaults to True.
+            storage (str, optional): ``"loose"`` writes one file per frame; ``"pack"``
+                appends frames to a daily packfile (see ``frame_pack``), where ``"link"``
+                dedupe falls back to ``"drop"``. Defaults to "loose".
+            llm_variants (Optional[LlmVariants], optional): Also cache a token-budgeted,
+                base64-encoded copy of every saved frame for the nightly LLM pass.
+                Defaults to None.
+            title_filter (Optional[TitleFilter], optional): Skip grabs while a visible window's
+                title names a sensitive site, before any pixels are captured. Skips are
+                counted per rule in ``skip_stats``. Defaults to None.
         """
+        if dedupe not in _DEDUPE_MODES:
+            raise ValueError(f"dedupe must be one of {_DEDUPE_MODES}, got {dedupe!r}")
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"storage must be one of {STORAGE_MODES}, got {storage!r}")
         self.screens_dir = os.path.abspath(os.path.expanduser(screenshots_dir))
         os.makedirs(self.screens_dir, exist_ok=True)
 
         self._guard = {skip_when_visible} if isinstance(skip_when_visible, str) else set(skip_when_visible or [])
+        self._title_filter = title_filter
+        # captures skipped, keyed by the rule that matched ("app:…", "domain:…", "title:…")
+        self.skip_stats: Dict[str, int] = {}
 
 
         self.debug = debug
+        self._backend = backend if backend is not None else get_backend()
+        self._windows = WindowSnapshot(self._backend, ttl=window_ttl)
+        self._sensitivity = sensitivity
+        self._encoder = encoder if encoder is not None else FrameEncoder()
+        self._pack = PackWriter(self.screens_dir) if storage == "pack" else None
+        self._variants = llm_variants
+        self._dedupe = dedupe
+        self._dedupe_tiles = dedupe_tiles
+        # per monitor: (thumbnail, path) of the last frame written to disk
+        self._last_saved: Dict[int, tuple[Image.Image, asyncio.Task]] = {}   # mon -> (thumbnail, write)
+        self.dedupe_stats: Dict[str, int] = dict.fromkeys(("saved", "dropped", "linked"), 0)
+        self._background_fps = background_fps
+        self._idle_fps = idle_fps
+        self._idle_after = idle_after
+        self.scheduler: Optional[CaptureScheduler] = None
 
         # state shared with worker
-        self._frames: Dict[int, Any] = {}
-        self._frame_lock = asyncio.Lock()
-
-        self._pending_event: Optional[dict] = None
-        self._debounce_handle: Optional[asyncio.TimerHandle] = None
+        self._frame_budget = frame_budget
+        self._ring: Optional[FrameRing] = None
+        self._mons: List[dict] = []
+        self._input_interval = input_interval
+        self._coalescer: Optional[EventCoalescer] = None
+
+        # interaction pipeline
+        self._debounce = float(self._DEBOUNCE_SEC)
+        self._governor = governor
+        self._capture_index = capture_index
+        self._index: Optional[CaptureIndex] = None
+        self._run_id = int(time.time())
+        self._max_in_flight = max(1, max_in_flight)
+        self._in_flight: set[asyncio.Task] = set()
+        self._mon_locks: Dict[int, asyncio.Lock] = {}
+        self.interaction_stats: Dict[str, int] = dict.fromkeys(("opened", "flushed", "skipped", "failed"), 0)
         self._running: bool = False
         self._worker_task: Optional[asyncio.Task] = None
 
@@ -205,7 +385,7 @@ class Screen():
 
     @staticmethod
     def _encode_image(img_path: str) -> str:
-        """Encode an image file as base64.
+        """Encode an image file as base64, preferring its cached LLM variant.
         
         Args:
             img_path (str): Path to the image file.
@@ -213,40 +393,155 @@ class Screen():
         Returns:
             str: Base64 encoded image data.
         """
+        try:
+            with open(variant_paths(img_path)[1], "rb") as fh:
+                return fh.read().decode()
+        except FileNotFoundError:
+            pass
         with open(img_path, "rb") as fh:
             return base64.b64encode(fh.read()).decode()
 
     # ─────────────────────────────── I/O helpers
-    async def _save_frame(self, frame, tag: str) -> str:
-        """Save a frame as a JPEG image.
+    async def _save_frame(
+        self, frame, tag: str, bounds: Optional[List[List[float]]] = None, stamp: Optional[float] = None
+    ) -> Optional[str]:
+        """Save a frame through the encoder pool.
         
         Args:
             frame: Frame data to save.
             tag (str): Tag to include in the filename.
+            bounds (Optional[List[List[float]]], optional): Window bounds when the frame was
+                taken (see :func:`_window_bounds`), for the inline OCR stage. Defaults to None.
+            stamp (Optional[float], optional): Time that names the file. Defaults to now.
             
         Returns:
-            str: Path to the saved image.
+            Optional[str]: Path to the saved image (a pack ref in pack storage), or None if
+            the encoder dropped it.
         """
-        _get_visible_windows()
-        ts   = f"{time.time():.5f}"
-        path = os.path.join(self.screens_dir, f"{ts}_{tag}.jpg")
-        await asyncio.to_thread(
-            Image.frombytes("RGB", (frame.width, frame.height), frame.rgb).save,
-            path,
-            "JPEG",
-            quality=70,
-        )
+        ts   = f"{time.time() if stamp is None else stamp:.5f}"
+        name = f"{ts}_{tag}{self._encoder.extension}"
+        if self._variants is None:
+            path = await self._store_frame(frame, name, float(ts))
+        else:
+            # the variant is cut from the in-memory frame while the encoder runs
+            loose = os.path.join(self.screens_dir, name)
+            path, _ = await asyncio.gather(self._store_frame(frame, name, float(ts)), self._variants.make(frame, loose))
+            if path is None:
+                remove_variant(loose)
+        if path is None:
+            return None
+        if self._sensitivity is not None:
+            self._sensitivity.submit(path, bounds)
         return path
 
+    async def _store_frame(self, frame, name: str, ts: float) -> Optional[str]:
+        """Encode *frame* as *name*, loose or into the day's pack; returns its path or ref."""
+        if self._pack is not None:
+            buf = io.BytesIO()
+            if await self._encoder.encode(frame, buf) is None:
+                return None
+            return await asyncio.to_thread(self._pack.append, name, ts, buf.getvalue())
+        path = os.path.join(self.screens_dir, name)
+        return await self._encoder.encode(frame, path)
+
+    async def _start_save(
+        self, frame, tag: str, mon: int, ref: Optional[tuple[Image.Image, asyncio.Task]],
+        bounds: Optional[List[List[float]]] = None,
+    ) -> tuple[Optional[Image.Image], asyncio.Task]:
+        """Decide how *frame* is stored and start storing it.
+
+        Called under the monitor's flush lock, in interaction order: it stamps the
+        frame's file name, compares the frame with *ref* and, when the frame is kept,
+        makes it the monitor's dedupe reference.  The returned task encodes and
+        writes the frame (or waits for the reference's write) while later flushes go
+        ahead.
+
+        Args:
+            frame: Frame data to save.
+            tag (str): Tag to include in the filename.
+            mon (int): Monitor the frame was grabbed from.
+            ref: ``(thumbnail, task)`` of the frame to compare against, as an earlier call
+                returned them, or None.
+            bounds: Window bounds when the frame was taken, or None.
+
+        Returns:
+            tuple: ``(thumbnail, task)``; *thumbnail* is None without dedupe. The task
+            yields ``(path, dedupe)`` describing what now represents this frame on disk:
+            *path* is the reference's path when the frame was dropped as a duplicate, and
+            None when the encoder dropped it. *dedupe* is ``"drop"`` or ``"link"`` when the
+            frame reuses the reference's file, else None.
+        """
+        stamp = time.time()
+        if self._dedupe is None:
+            return None, asyncio.create_task(self._store_unique(frame, tag, bounds, stamp))
+
+        thumb = await asyncio.to_thread(frame_hash.thumbnail, frame)
+        if ref is not None and tile_distance(thumb, ref[0]) <= self._dedupe_tiles:
+            return thumb, asyncio.create_task(self._reuse(frame, tag, bounds, stamp, ref[1]))
+        task = asyncio.create_task(self._store_unique(frame, tag, bounds, stamp))
+        self._last_saved[mon] = (thumb, task)
+        return thumb, task
+
+    async def _store_unique(
+        self, frame, tag: str, bounds: Optional[List[List[float]]], stamp: float
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Save a frame that is not a duplicate; see :meth:`_start_save`."""
+        path = await self._save_frame(frame, tag, bounds, stamp)
+        if path is not None and self._dedupe is not None:
+            self.dedupe_stats["saved"] += 1
+        return path, None
+
+    async def _reuse(
+        self, frame, tag: str, bounds: Optional[List[List[float]]], stamp: float, ref: asyncio.Task
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Represent a near-duplicate frame by the file its reference is written to.
+
+        Waits for the reference's write; if the encoder dropped the reference, the
+        frame is saved after all.
+        """
+        ref_path, _ = await ref
+        if ref_path is None:
+            return await self._store_unique(frame, tag, bounds, stamp)
+        if self._dedupe == "link" and os.path.exists(ref_path):
+            ext = os.path.splitext(ref_path)[1]
+            path = os.path.join(self.screens_dir, f"{stamp:.5f}_{tag}{ext}")
+            try:
+                os.link(ref_path, path)
+            except OSError:
+                return await self._store_unique(frame, tag, bounds, stamp)
+            self.dedupe_stats["linked"] += 1
+            if self._variants is not None:
+                link_variant(ref_path, path)
+            if self._sensitivity is not None:
+                self._sensitivity.submit(path, bounds)
+            return path, "link"
+        self.dedupe_stats["dropped"] += 1
+        return ref_path, "drop"
+
+
+    @property
+    def effective_fps(self) -> Dict[int, float]:
+        """Measured grab rate per monitor (empty until the worker has started)."""
+        return self.scheduler.effective_fps() if self.scheduler is not None else {}
 
     # ─────────────────────────────── skip guard
-    def _skip(self) -> bool:
-        """Check if capture should be skipped based on visible applications.
+    def _skip(self) -> Optional[str]:
+        """Check if capture should be skipped based on visible applications and window titles.
         
         Returns:
-            bool: True if capture should be skipped, False otherwise.
+            Optional[str]: The rule that matched (``"app:<owner>"``, or a
+            :class:`TitleFilter` rule), or None if capture may go ahead.
         """
-        return _is_app_visible(self._guard) if self._guard else False
+        if not self._guard and self._title_filter is None:
+            return None
+        windows = self._windows.get()
+        app = _visible_app(self._guard, windows) if self._guard else None
+        if app is not None:
+            return f"app:{app}"
+        return self._title_filter.check(windows) if self._title_filter is not None else None
+
+    def _count_skip(self, rule: str) -> None:
+        self.skip_stats[rule] = self.skip_stats.get(rule, 0) + 1
 
     # ─────────────────────────────── start/stop methods
     def start(self) -> None:
@@ -288,98 +583,285 @@ class Screen():
             log.propagate = False
 
         CAP_FPS  = self._CAPTURE_FPS
-        DEBOUNCE = self._DEBOUNCE_SEC
 
         loop = asyncio.get_running_loop()
 
         # ------------------------------------------------------------------
-        # All calls to mss / Quartz are wrapped in `to_thread`
+        # All grabs and window-server calls are wrapped in `to_thread`
         # ------------------------------------------------------------------
-        with mss.mss() as sct:
-            mons = sct.monitors[self._MON_START:]
-
-            # ---- mouse callbacks (pynput is sync → schedule into loop) ----
-            def schedule_event(x: float, y: float, typ: str):
-                asyncio.run_coroutine_threadsafe(mouse_event(x, y, typ), loop)
-
-            listener = mouse.Listener(
-                on_move=lambda x, y: schedule_event(x, y, "move"),
-                on_click=lambda x, y, btn, prs: schedule_event(x, y, "click") if prs else None,
-                on_scroll=lambda x, y, dx, dy: schedule_event(x, y, "scroll"),
+        with self._backend as backend:
+            mons = self._mons = backend.displays()
+            scheduler = self.scheduler = CaptureScheduler(
+                len(mons),
+                active_fps=CAP_FPS,
+                background_fps=self._background_fps,
+                idle_fps=self._idle_fps,
+                idle_after=self._idle_after,
             )
-            listener.start()
-
-            # ---- nested helper inside the async context ----
-            async def flush():
-                """Process pending event and emit update."""
-                if self._pending_event is None:
-                    return
-                if self._skip():
-                    self._pending_event = None
-                    return
+            scheduler.note_input(self._mon_for(*backend.cursor_position(), mons))
+            wake = asyncio.Event()
+            ring = self._ring = FrameRing(len(mons), self._frame_budget)
 
-                ev = self._pending_event
-                aft = await asyncio.to_thread(sct.grab, mons[ev["mon"] - 1])
+            def grab_into_ring(idx: int) -> None:
+                frame = backend.grab(mons[idx - 1])
+                ring.store(idx, frame, time.monotonic())
 
-                await self._save_frame(ev["before"], "before")
-                await self._save_frame(aft, "after")
+            events: asyncio.Queue = asyncio.Queue()
 
-                # log.info(f"{ev['type']} captured on monitor {ev['mon']}")
-                self._pending_event = None
-
-            def debounce_flush():
-                """Schedule flush as a task."""
-                asyncio.create_task(flush())
+            def grab_after(idx: int):
+                return backend.grab(mons[idx - 1])
 
             # ---- mouse event reception ----
-            async def mouse_event(x: float, y: float, typ: str):
-                """Handle mouse events.
+            def mouse_event(x: float, y: float, typ: str, when: float):
+                """Handle mouse events delivered by the coalescer.
                 
                 Args:
                     x (float): X coordinate.
                     y (float): Y coordinate.
                     typ (str): Event type ("move", "click", or "scroll").
+                    when (float): ``time.monotonic()`` at which the event was received.
                 """
                 idx = self._mon_for(x, y, mons)
-                # log.info(
-                #     f"{typ:<6} @({x:7.1f},{y:7.1f}) → mon={idx}   {'(guarded)' if self._skip() else ''}"
-                # )
+                if scheduler.note_input(idx):
+                    wake.set()          # ramp the new active monitor up now
                 if self._skip() or idx is None:
                     return
+                events.put_nowait((idx, typ, when, x, y))
 
-                # lazily grab before-frame
-                if self._pending_event is None:
-                    async with self._frame_lock:
-                        bf = self._frames.get(idx)
-                    if bf is None:
-                        return
-                    self._pending_event = {"type": typ, "mon": idx, "before": bf}
-
-                # reset debounce timer
-                if self._debounce_handle:
-                    self._debounce_handle.cancel()
-                self._debounce_handle = loop.call_later(DEBOUNCE, debounce_flush)
+            # ---- mouse callbacks (listener thread → coalesced batches on the loop) ----
+            coalescer = self._coalescer = EventCoalescer(
+                loop, mouse_event, lambda x, y: self._mon_for(x, y, mons), interval=self._input_interval
+            )
+            listener = backend.listen(
+                on_move=coalescer.on_move,
+                on_click=coalescer.on_click,
+                on_scroll=coalescer.on_scroll,
+            )
+            listener.start()
 
             # ---- main capture loop ----
             log.info(f"Screen observer started — guarding {self._guard or '∅'}")
+            self._encoder.start()
+            if self._variants is not None:
+                self._variants.start()
+            if self._sensitivity is not None:
+                self._sensitivity.start()
+            if self._capture_index:
+                self._index = CaptureIndex(self.screens_dir)
+            tasks = [asyncio.create_task(self._interaction_actor(events, ring, grab_after))]
+            if self._governor is not None:
+                self._governor.reset(CAP_FPS, self._debounce)
+                scheduler.active_fps = self._governor.fps
+                self._debounce = self._governor.debounce
+                tasks.append(asyncio.create_task(self._govern(self._governor, scheduler, ring, coalescer)))
 
-            while self._running:                         # flag from base class
-                t0 = time.time()
-
-                # refresh 'before' buffers
-                for idx, m in enumerate(mons, 1):
-                    frame = await asyncio.to_thread(sct.grab, m)
-                    async with self._frame_lock:
-                        self._frames[idx] = frame
-
-                # fps throttle
-                dt = time.time() - t0
-                await asyncio.sleep(max(0, (1 / CAP_FPS) - dt))
-
-            # shutdown
-            listener.stop()
-            if self._debounce_handle:
-                self._debounce_handle.cancel()
+            try:
+                while self._running:                         # flag from base class
+                    # refresh the 'before' buffers that are due
+                    for idx in scheduler.due():
+                        rule = self._skip()
+                        if rule is None:
+                            await asyncio.to_thread(grab_into_ring, idx)
+                        else:
+                            self._count_skip(rule)
+                        scheduler.mark_grabbed(idx)
+
+                    # sleep until the next grab is due or input changes the plan
+                    wake.clear()
+                    try:
+                        await asyncio.wait_for(wake.wait(), scheduler.next_wakeup())
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                await self._shutdown(listener, tasks, scheduler, ring, coalescer)
+
+    # ─────────────────────────────── interaction pipeline
+    async def _interaction_actor(self, events: asyncio.Queue, ring: FrameRing, grab_after) -> None:
+        """Group input events into interactions and hand each finished one to a flush task.
+
+        This coroutine is the only owner of the open interaction.  An interaction
+        ends when no event arrives for the debounce period or the next event lands on
+        another monitor.  At most ``max_in_flight`` flushes run at once; while they
+        are all busy, new events wait in *events*.
+        """
+        slots = asyncio.Semaphore(self._max_in_flight)
+        current: Optional[Interaction] = None
+        seq = 0
+
+        async def dispatch(ix: Interaction) -> None:
+            await slots.acquire()
+            task = asyncio.create_task(self._flush_interaction(ix, ring, grab_after))
+            self._in_flight.add(task)
+
+            def done(t: asyncio.Task) -> None:
+                self._in_flight.discard(t)
+                slots.release()
+            task.add_done_callback(done)
+
+        try:
+            while True:
+                timeout = None
+                if current is not None:
+                    timeout = max(0.0, current.last_input + self._debounce - time.monotonic())
+                try:
+                    mon, typ, when, x, y = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    ix, current = current, None
+                    await dispatch(ix)
+                    continue
+
+                if current is not None and current.mon != mon:
+                    ix, current = current, None
+                    await dispatch(ix)
+                if current is None:
+                    # newest frame grabbed before the event (pinned until flushed)
+                    before = ring.before(mon, when)
+                    if before is None:
+                        continue
+                    seq += 1
+                    current = Interaction(seq, mon, typ, x, y, before, when)
+                    if self._index is not None:
+                        windows = self._windows.get()
+                        current.before_windows = _window_owners(windows)
+                        current.before_bounds = _window_bounds(windows, self._mons[mon - 1])
+                    self.interaction_stats["opened"] += 1
+                else:
+                    current.last_input = time.monotonic()
+                    current.events += 1
+        finally:
+            if current is not None:     # stopped mid-burst: nothing to flush
+                ring.release(current.before)
+
+    async def _flush_interaction(self, ix: Interaction, ring: FrameRing, grab_after) -> None:
+        """Grab the after-frame of *ix*, then encode and write both frames."""
+        try:
+            # the after-grab and the naming and dedupe of both frames run one flush
+            # per monitor at a time, in interaction order (tasks are created in
+            # ``seq`` order and the lock wakes waiters FIFO), so each dedupe
+            # reference is the previous interaction's result; the encodes and
+            # writes they start finish outside the lock, in any order
+            lock = self._mon_locks.setdefault(ix.mon, asyncio.Lock())
+            async with lock:
+                rule = self._skip()
+                if rule is not None:
+                    self.interaction_stats["skipped"] += 1
+                    self._count_skip(rule)
+                    return
+                ix.after = await asyncio.to_thread(grab_after, ix.mon)
+                ix.after_ts = time.time()
+                if self._index is not None:
+                    self._windows.invalidate()      # the snapshot may predate the debounce
+                    windows = self._windows.get()
+                    ix.after_windows = _window_owners(windows)
+                    ix.after_bounds = _window_bounds(windows, self._mons[ix.mon - 1])
+
+                # before vs. last saved frame, after vs. before
+                thumb, before = await self._start_save(
+                    ix.before, "before", ix.mon, self._last_saved.get(ix.mon), ix.before_bounds
+                )
+                _, after = await self._start_save(
+                    ix.after, "after", ix.mon, (thumb, before) if thumb is not None else None, ix.after_bounds
+                )
+            results = await asyncio.gather(before, after, return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            before, after = results
+            self.interaction_stats["flushed"] += 1
+            if self._index is not None:
+                await self._index_interaction(ix, before, after)
+        except Exception as e:  # one bad flush must not stop the pipeline
+            self.interaction_stats["failed"] += 1
+            log.info(f"flush of interaction {ix.seq} on monitor {ix.mon} failed: {e}")
+        finally:
+            ring.release(ix.before)
+
+    # ─────────────────────────────── rate governor
+    async def _govern(self, governor: RateGovernor, scheduler: CaptureScheduler, ring: FrameRing, coalescer: EventCoalescer) -> None:
+        """Once per ``governor.interval``, measure activity and CPU and apply the governor's decision."""
+        prev_thumb, prev_key = None, None
+        change = 0.0
+        last_wall, last_cpu = time.monotonic(), time.process_time()
+        last_raw = coalescer.raw_total()
+        while True:
+            await asyncio.sleep(governor.interval)
+            wall, cpu_time, raw = time.monotonic(), time.process_time(), coalescer.raw_total()
+            dt = max(wall - last_wall, 1e-6)
+            cpu, input_rate = (cpu_time - last_cpu) / dt, (raw - last_raw) / dt
+            last_wall, last_cpu, last_raw = wall, cpu_time, raw
+
+            # change magnitude: tiles changed on the active monitor since the last
+            # tick; without a new frame since then, the previous value stands
+            mon = scheduler.active
+            slot = ring.before(mon, float("inf")) if mon is not None else None
+            if slot is not None:
+                key = (mon, slot.seq)
+                try:
+                    thumb = await asyncio.to_thread(frame_hash.thumbnail, slot) if key != prev_key else None
+                finally:
+                    ring.release(slot)
+                if thumb is not None:
+                    if prev_thumb is not None and prev_key[0] == mon:
+                        change = tile_distance(thumb, prev_thumb) / (thumb.width * thumb.height)
+                    else:
+                        change = 0.0
+                    prev_thumb, prev_key = thumb, key
+
+            decision = governor.update(change, input_rate, cpu)
+            scheduler.active_fps = decision.fps
+            self._debounce = decision.debounce
+
+    async def _index_interaction(self, ix: Interaction, before: tuple, after: tuple) -> None:
+        """Append the frames of a flushed interaction to the capture index."""
+        interaction = f"{self._run_id}:{ix.seq}"
+        # the before-frame's monotonic stamp, on the wall clock
+        before_ts = time.time() - (time.monotonic() - ix.before.timestamp)
+        for tag, ts, windows, bounds, (path, dedupe) in (
+            ("before", before_ts, ix.before_windows, ix.before_bounds, before),
+            ("after", ix.after_ts, ix.after_windows, ix.after_bounds, after),
+        ):
+            if path is None:
+                continue
+            self._index.add(IndexEntry(
+                ts=round(ts, 5), path=os.path.basename(path), tag=tag, interaction=interaction,
+                mon=ix.mon, event=ix.type, x=ix.x, y=ix.y, windows=windows, dedupe=dedupe, bounds=bounds,
+            ))
+        await asyncio.to_thread(self._index.sync)
+
+    async def _shutdown(self, listener, tasks: List[asyncio.Task], scheduler, ring, coalescer) -> None:
+        """Stop input, let in-flight flushes finish, then stop the stages and log their stats."""
+        listener.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._in_flight:
+            await asyncio.wait(self._in_flight, timeout=10)
+        log.info(f"interactions: {self.interaction_stats}")
+        if self._governor is not None and self._governor.decisions:
+            fps = [d.fps for d in self._governor.decisions]
+            log.info(f"governor fps min/mean/max: {min(fps):.1f}/{sum(fps) / len(fps):.1f}/{max(fps):.1f}, "
+                     f"throttled ticks: {sum(d.throttled for d in self._governor.decisions)}")
+        log.info(f"capture fps per monitor: {scheduler.effective_fps()}")
+        log.info(f"frame ring stats: {ring.stats} ({ring.allocated / 2**20:.0f} MiB)")
+        log.info(f"encoder stats: {self._encoder.stats} latency: {self._encoder.latency()}")
+        await self._encoder.stop()
+        if self._pack is not None:
+            self._pack.close()
+        if self._variants is not None:
+            log.info(f"LLM variant stats: {self._variants.stats}")
+            await self._variants.stop()
+        log.info(f"input events: {coalescer.stats}")
+        log.info(f"window snapshot stats: {self._windows.stats}")
+        if self.skip_stats:
+            log.info(f"skipped captures by rule: {self.skip_stats}")
+        if self._dedupe is not None:
+            log.info(f"dedupe stats: {self.dedupe_stats}")
+        if self._sensitivity is not None:
+            log.info(f"inline OCR stats: {self._sensitivity.stats}")
+            await self._sensitivity.stop()
+        if self._index is not None:
+            self._index.close()
+            self._index = None
 
 ###############################################################################
 # Main function                                                               #
@@ -390,6 +872,7 @@ async def run_screen_observer(
     screenshots_dir: str = "~/.cache/recordr/screenshots",
     skip_when_visible: Optional[str | list[str]] = None,
     debug: bool = False,
+    **screen_options: Any,
 ) -> None:
     """Run the screen observer continuously.
     
@@ -398,11 +881,14 @@ async def run_screen_observer(
         skip_when_visible (Optional[str | list[str]], optional): Application names to skip when visible.
             Defaults to None.
         debug (bool, optional): Enable debug logging. Defaults to False.
+        **screen_options: Further keyword arguments for :class:`Screen` (inline OCR
+            stage, dedupe and window-snapshot settings, …).
     """
     screen = Screen(
         screenshots_dir=screenshots_dir,
         skip_when_visible=skip_when_visible,
         debug=debug,
+        **screen_options,
     )
     
     screen.start()
@@ -416,7 +902,7 @@ async def run_screen_observer(
         print("Screen observer stopped.")
 
 
-def main(file_dir: str) -> None:
+def main(file_dir: str, **screen_options: Any) -> None:
     """Main entry point for running the screen observer."""
     import signal
     
@@ -438,7 +924,7 @@ def main(file_dir: str) -> None:
     
     try:
         # Run the screen observer
-        task = loop.create_task(run_screen_observer(debug=True, screenshots_dir=file_dir))
+        task = loop.create_task(run_screen_observer(debug=True, screenshots_dir=file_dir, **screen_options))
         loop.run_until_complete(task)
     except (KeyboardInterrupt, asyncio.CancelledError):
         print("\nShutting down screen observer...")
@@ -454,12 +940,93 @@ def main(file_dir: str) -> None:
 
 
 if __name__ == "__main__":
+    # must run first: frozen OCR worker processes re-enter this entry point
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description='Record screen activity')
     parser.add_argument('--file-dir', type=str, required=True, help='Directory to store screenshots', default="~/.cache/recordr/screenshots")
+    parser.add_argument('--dedupe', choices=("off", "drop", "link"), default="off", help='Handling of near-duplicate frames (drop/link break before/after pairs in the index)')
+    parser.add_argument('--dedupe-tiles', type=int, default=2, help='Changed tiles tolerated between near-duplicate frames')
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help='Capture backend (default: platform)')
+    parser.add_argument('--background-fps', type=float, default=0.5, help='Refresh rate of monitors without the cursor')
+    parser.add_argument('--idle-fps', type=float, default=0.1, help='Refresh rate of all monitors while idle (0 = none)')
+    parser.add_argument('--idle-after', type=float, default=30.0, help='Seconds without input before backing off to --idle-fps')
+    parser.add_argument('--frame-budget-mb', type=int, default=256, help='Memory for recent frames across all monitors (MiB)')
+    parser.add_argument('--input-interval', type=float, default=0.05, help='Minimum seconds between coalesced mouse-move deliveries')
+    parser.add_argument('--adaptive', action='store_true', help='Adapt capture FPS and debounce to activity and CPU use')
+    parser.add_argument('--min-fps', type=float, default=2.0, help='Lowest adaptive capture FPS')
+    parser.add_argument('--max-fps', type=float, default=15.0, help='Highest adaptive capture FPS')
+    parser.add_argument('--min-debounce', type=float, default=0.5, help='Shortest adaptive debounce (s)')
+    parser.add_argument('--max-debounce', type=float, default=3.0, help='Longest adaptive debounce (s)')
+    parser.add_argument('--cpu-budget', type=float, default=0.5, help='Target recorder CPU use in cores')
+    parser.add_argument('--window-ttl', type=float, default=0.25, help='Seconds a window-list snapshot is reused')
+    parser.add_argument('--format', choices=tuple(FORMATS), default="jpeg", help='Image format for saved frames')
+    parser.add_argument('--quality', type=int, default=70, help='Encoder quality (1-100)')
+    parser.add_argument('--subsampling', choices=SUBSAMPLING, default=None, help='JPEG chroma subsampling (default: encoder default)')
+    parser.add_argument('--encode-workers', type=int, default=2, help='Encoder threads')
+    parser.add_argument('--encode-queue-size', type=int, default=8, help='Maximum frames waiting for an encoder')
+    parser.add_argument('--encode-policy', choices=QUEUE_POLICIES, default="block", help='What to do when the encoder queue is full (drop_oldest loses frames under load)')
+    parser.add_argument('--storage', choices=STORAGE_MODES, default="loose", help='One file per frame, or daily packfiles (see frame_pack.py)')
+    parser.add_argument('--llm-variants', action='store_true', help='Cache a downscaled base64 copy of each frame for the LLM pass')
+    parser.add_argument('--llm-token-budget', type=int, default=765, help='Most image tokens per LLM variant')
+    parser.add_argument('--llm-quality', type=int, default=80, help='JPEG quality of LLM variants')
+    parser.add_argument('--no-index', action='store_true', help='Do not maintain the capture index')
+    parser.add_argument('--title-filter', action='store_true', help='Skip grabs while a window title names a sensitive site')
+    parser.add_argument('--title-scope', choices=SCOPES, default="visible", help='Check the frontmost window only, or every visible one')
+    parser.add_argument('--inline-ocr', action='store_true', help='Check saved frames for sensitive domains in the background')
+    parser.add_argument('--ocr-workers', type=int, default=1, help='Inline OCR worker processes')
+    parser.add_argument('--ocr-queue-size', type=int, default=64, help='Maximum frames waiting for inline OCR')
+    parser.add_argument('--ocr-drop-policy', choices=DROP_POLICIES, default="drop_newest", help='What to do when the inline OCR queue is full')
+    parser.add_argument('--ocr-action', choices=ACTIONS, default="delete", help='Delete or quarantine flagged frames')
+    parser.add_argument('--ocr-roi', action='store_true', help='Inline OCR only checks the top strip of each visible window (of the frame with --no-index)')
     args = parser.parse_args()
-    if Quartz.CGPreflightScreenCaptureAccess():
+    sensitivity = None
+    if args.inline_ocr:
+        sensitivity = SensitivityStage(
+            workers=args.ocr_workers,
+            queue_size=args.ocr_queue_size,
+            drop_policy=args.ocr_drop_policy,
+            action=args.ocr_action,
+            quarantine_dir=os.path.join(os.path.expanduser(args.file_dir), ".quarantine"),
+            roi=args.ocr_roi,
+        )
+    backend = get_backend(args.backend)
+    if backend.capture_allowed():
         print("Screen capture allowed for this process.")
-        main(file_dir=args.file_dir)
+        main(
+            file_dir=args.file_dir,
+            backend=backend,
+            sensitivity=sensitivity,
+            dedupe=None if args.dedupe == "off" else args.dedupe,
+            dedupe_tiles=args.dedupe_tiles,
+            window_ttl=args.window_ttl,
+            background_fps=args.background_fps,
+            idle_fps=args.idle_fps,
+            idle_after=args.idle_after,
+            frame_budget=args.frame_budget_mb * 2**20,
+            input_interval=args.input_interval,
+            capture_index=not args.no_index,
+            storage=args.storage,
+            title_filter=TitleFilter(scope=args.title_scope) if args.title_filter else None,
+            llm_variants=LlmVariants(
+                token_budget=args.llm_token_budget,
+                quality=args.llm_quality,
+            ) if args.llm_variants else None,
+            governor=RateGovernor(
+                min_fps=args.min_fps,
+                max_fps=args.max_fps,
+                min_debounce=args.min_debounce,
+                max_debounce=args.max_debounce,
+                cpu_budget=args.cpu_budget,
+            ) if args.adaptive else None,
+            encoder=FrameEncoder(
+                workers=args.encode_workers,
+                queue_size=args.encode_queue_size,
+                policy=args.encode_policy,
+                fmt=args.format,
+                quality=args.quality,
+                subsampling=args.subsampling,
+            ),
+        )
     else:
         print("Screen capture NOT allowed; requesting it…")
         raise PermissionError("Screen capture not allowed")
@@ -3,102 +3,97 @@ from __future__ import annotations
 # Imports                                                                     #
 ###############################################################################
 
+# — Startup profiling (before anything it should time) —
+import import_report
+import_report.install_from_env()
+
 # — Standard library —
 import argparse
+import base64
+import io
+import json
 import os
+import socketserver
+import stat
+import sys
 import time
-from typing import Optional, Tuple
+from typing import Callable, List, NamedTuple, Optional, TextIO, Tuple, Union
 
-# — Third-party —
-import mss
-import Quartz
-from PIL import Image
-from AppKit import NSScreen
+# — Local —
+from capture_backend import BACKENDS, CaptureBackend, get_backend
+from frame_image import to_image
 
-print("active_screen_capture.py loaded")
+# Image formats by name: (PIL format, file extensions, MIME type)
+FORMATS = {
+    "jpeg": ("JPEG", (".jpg", ".jpeg"), "image/jpeg"),
+    "png": ("PNG", (".png",), "image/png"),
+    "webp": ("WEBP", (".webp",), "image/webp"),
+}
 
 ###############################################################################
 # Screen-geometry helpers                                                     #
 ###############################################################################
 
 
-def _get_mouse_position() -> Tuple[float, float]:
+def _get_mouse_position(backend: CaptureBackend) -> Tuple[float, float]:
     """Get the current mouse cursor position.
     
     Returns
     -------
     (x, y) tuple in screen coordinates.
     """
-    mouse_location = Quartz.CGEventGetLocation(Quartz.CGEventCreate(None))
-    return (mouse_location.x, mouse_location.y)
+    return backend.cursor_position()
+
+
+def _get_active_display(backend: CaptureBackend, mouse: Optional[Tuple[float, float]] = None) -> Optional[dict]:
+    """Return the display containing the mouse cursor (or *mouse*), or None if not found."""
+    mouse_x, mouse_y = mouse if mouse is not None else _get_mouse_position(backend)
+    for d in backend.displays():
+        if d["left"] <= mouse_x < d["left"] + d["width"] and d["top"] <= mouse_y < d["top"] + d["height"]:
+            return d
+    return None
 
 
-def _get_active_screen_bounds() -> Optional[Tuple[int, int, int, int]]:
+def _get_active_screen_bounds(backend: CaptureBackend) -> Optional[Tuple[int, int, int, int]]:
     """Get the bounds of the screen containing the mouse cursor.
     
     Returns
     -------
     (x, y, width, height) tuple in screen coordinates, or None if not found.
     """
-    mouse_x, mouse_y = _get_mouse_position()
-    
-    # Get all active displays
-    err, display_ids, count = Quartz.CGGetActiveDisplayList(16, None, None)
-    if err != Quartz.kCGErrorSuccess:
-        print(f"Failed to get display list: {err}")
+    d = _get_active_display(backend)
+    if d is None:
         return None
-    
-    # Find which display contains the mouse cursor
-    for display_id in display_ids[:count]:
-        bounds = Quartz.CGDisplayBounds(display_id)
-        x = int(bounds.origin.x)
-        y = int(bounds.origin.y)
-        w = int(bounds.size.width)
-        h = int(bounds.size.height)
-        
-        # Check if mouse is within this display
-        if x <= mouse_x < x + w and y <= mouse_y < y + h:
-            print(f"Active screen found at: x={x}, y={y}, w={w}, h={h}")
-            print(f"Mouse position: ({mouse_x:.0f}, {mouse_y:.0f})")
-            return (x, y, w, h)
-    
-    return None
+    x, y, w, h = _display_bounds(d)
+    print(f"Active screen found at: x={x}, y={y}, w={w}, h={h}")
+    return (x, y, w, h)
 
 
-def _get_active_screen_info() -> Optional[dict]:
+def _display_bounds(d: dict) -> Tuple[int, int, int, int]:
+    return int(d["left"]), int(d["top"]), int(d["width"]), int(d["height"])
+
+
+def _display_info(d: dict, mouse: Tuple[float, float]) -> dict:
+    """Describe display *d*, found under the cursor at *mouse*."""
+    return {
+        'display_id': d['id'],
+        'bounds': {'x': int(d['left']), 'y': int(d['top']), 'width': int(d['width']), 'height': int(d['height'])},
+        'is_main': bool(d['is_main']),
+        'is_builtin': bool(d['is_builtin']),
+        'mouse_position': mouse,
+    }
+
+
+def _get_active_screen_info(backend: CaptureBackend) -> Optional[dict]:
     """Get detailed information about the screen containing the mouse cursor.
     
     Returns
     -------
     Dictionary with screen information, or None if not found.
     """
-    mouse_x, mouse_y = _get_mouse_position()
-    
-    err, display_ids, count = Quartz.CGGetActiveDisplayList(16, None, None)
-    if err != Quartz.kCGErrorSuccess:
-        return None
-    
-    for display_id in display_ids[:count]:
-        bounds = Quartz.CGDisplayBounds(display_id)
-        x = bounds.origin.x
-        y = bounds.origin.y
-        w = bounds.size.width
-        h = bounds.size.height
-        
-        if x <= mouse_x < x + w and y <= mouse_y < y + h:
-            # Get additional display info
-            is_main = Quartz.CGDisplayIsMain(display_id)
-            is_builtin = Quartz.CGDisplayIsBuiltin(display_id)
-            
-            return {
-                'display_id': display_id,
-                'bounds': {'x': int(x), 'y': int(y), 'width': int(w), 'height': int(h)},
-                'is_main': bool(is_main),
-                'is_builtin': bool(is_builtin),
-                'mouse_position': (mouse_x, mouse_y),
-            }
-    
-    return None
+    mouse = _get_mouse_position(backend)
+    d = _get_active_display(backend, mouse)
+    return _display_info(d, mouse) if d is not None else None
 
 
 ###############################################################################
@@ -106,80 +101,188 @@ def _get_active_screen_info() -> Optional[dict]:
 ###############################################################################
 
 
-def capture_active_screen(output_dir: str = "~/Desktop", filename: Optional[str] = None) -> Optional[str]:
+def format_for(filename: str) -> str:
+    """Return the :data:`FORMATS` name matching *filename*'s extension."""
+    ext = os.path.splitext(filename)[1].lower()
+    for fmt, (_, extensions, _) in FORMATS.items():
+        if ext in extensions:
+            return fmt
+    raise ValueError(f"unsupported screenshot extension {ext!r} (use one of "
+                     f"{', '.join(e for _, exts, _ in FORMATS.values() for e in exts)})")
+
+
+def _save_options(fmt: str, quality: int) -> dict:
+    pil_format = FORMATS[fmt][0]
+    if fmt == "png":
+        # lossless either way; level 1 is much faster than the default 6 on screen content
+        return {"format": pil_format, "compress_level": 1}
+    return {"format": pil_format, "quality": quality}
+
+
+class EncodedScreenshot(NamedTuple):
+    """An in-memory screenshot of the active screen."""
+    data: Union[bytes, str]      # encoded image, or its base64 text
+    mime: str
+    size: Tuple[int, int]        # pixels after any downscale
+
+
+def _grab_active_screen(backend: CaptureBackend, max_dim: Optional[int] = None, display: Optional[dict] = None):
+    """Grab the screen containing the mouse cursor (or *display*) as a PIL image, or None if not found.
+
+    The optional *max_dim* downscale happens while decoding the raw frame.
+    """
+    # Get active screen bounds
+    bounds = _get_active_screen_bounds(backend) if display is None else _display_bounds(display)
+
+    if bounds is None:
+        print("No active screen found")
+        return None
+
+    x, y, w, h = bounds
+
+    # Define the monitor region to capture
+    monitor = {
+        "left": x,
+        "top": y,
+        "width": w,
+        "height": h,
+    }
+
+    # Grab the screenshot and decode straight from the BGRA buffer
+    return to_image(backend.grab(monitor), max_dim=max_dim)
+
+
+def encode_active_screen(
+    fmt: str = "jpeg",
+    quality: int = 80,
+    max_dim: Optional[int] = None,
+    as_base64: bool = False,
+    backend: Optional[CaptureBackend] = None,
+    display: Optional[dict] = None,
+) -> Optional[EncodedScreenshot]:
+    """Capture the screen containing the mouse cursor and encode it in memory.
+
+    Args:
+        fmt (str): ``"jpeg"``, ``"png"`` or ``"webp"``. Defaults to "jpeg".
+        quality (int): JPEG/WebP quality, 1-100. Defaults to 80.
+        max_dim (Optional[int]): Longest side of the result; None keeps full size.
+        as_base64 (bool): Return the base64 text instead of raw bytes. Defaults to False.
+        backend (Optional[CaptureBackend]): Backend to capture with. If None, a platform
+            backend is created for this call and closed afterwards.
+        display (Optional[dict]): Display to capture, as returned by the backend; None
+            looks up the one under the cursor.
+
+    Returns:
+        Optional[EncodedScreenshot]: The encoded image, or None if capture failed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {tuple(FORMATS)}, got {fmt!r}")
+    if backend is None:
+        with get_backend() as backend:
+            return encode_active_screen(fmt, quality, max_dim, as_base64, backend, display)
+
+    img = _grab_active_screen(backend, max_dim, display)
+    if img is None:
+        return None
+    buf = io.BytesIO()
+    img.save(buf, **_save_options(fmt, quality))
+    data = buf.getvalue()
+    return EncodedScreenshot(base64.b64encode(data).decode() if as_base64 else data, FORMATS[fmt][2], img.size)
+
+
+def capture_active_screen(
+    output_dir: str = "~/Desktop",
+    filename: Optional[str] = None,
+    backend: Optional[CaptureBackend] = None,
+    quality: int = 80,
+    max_dim: Optional[int] = None,
+    display: Optional[dict] = None,
+) -> Optional[str]:
     """Capture a screenshot of the screen containing the mouse cursor.
     
+    The image is encoded in the format its extension names (``.jpg``, ``.png``, ``.webp``).
+    
     Args:
         output_dir (str): Directory to save the screenshot. Defaults to "~/Desktop".
         filename (Optional[str]): Custom filename. If None, generates timestamp-based name.
+        backend (Optional[CaptureBackend]): Backend to capture with. If None, a platform
+            backend is created for this call and closed afterwards.
+        quality (int): JPEG/WebP quality, 1-100. Defaults to 80.
+        max_dim (Optional[int]): Longest side of the saved image; None keeps full size.
+        display (Optional[dict]): Display to capture, as returned by the backend; None
+            looks up the one under the cursor.
     
     Returns:
         Optional[str]: Path to the saved screenshot, or None if capture failed.
     """
-    # Get active screen bounds
-    bounds = _get_active_screen_bounds()
+    if filename is None:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"active_screen_{timestamp}.png"
+    fmt = format_for(filename)
+
+    if backend is None:
+        with get_backend() as backend:
+            return capture_active_screen(output_dir, filename, backend, quality, max_dim, display)
     
-    if bounds is None:
-        print("No active screen found")
+    img = _grab_active_screen(backend, max_dim, display)
+    if img is None:
         return None
+
+    # Prepare output path
+    output_dir = os.path.abspath(os.path.expanduser(output_dir))
+    os.makedirs(output_dir, exist_ok=True)
     
-    x, y, w, h = bounds
+    output_path = os.path.join(output_dir, filename)
     
-    # Capture the screen region using mss
-    with mss.mss() as sct:
-        # Define the monitor region to capture
-        monitor = {
-            "left": x,
-            "top": y,
-            "width": w,
-            "height": h,
-        }
-        
-        # Grab the screenshot
-        screenshot = sct.grab(monitor)
-        
-        # Convert to PIL Image
-        img = Image.frombytes("RGB", (screenshot.width, screenshot.height), screenshot.rgb)
-        
-        # Prepare output path
-        output_dir = os.path.abspath(os.path.expanduser(output_dir))
-        os.makedirs(output_dir, exist_ok=True)
-        
-        if filename is None:
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"active_screen_{timestamp}.png"
-        
-        output_path = os.path.join(output_dir, filename)
-        
-        # Save the image
-        img.save(output_path, "PNG", overwrite=True)
-        print(f"Screenshot saved to: {output_path}")
-        
-        return output_path
-
-
-def capture_active_screen_with_info(output_dir: str = "~/.cache", filename: str = "recordr_screenshot.jpg") -> Optional[Tuple[str, dict]]:
+    # Save the image
+    img.save(output_path, **_save_options(fmt, quality))
+    print(f"Screenshot saved to: {output_path}")
+    
+    return output_path
+
+
+def capture_active_screen_with_info(
+    output_dir: str = "~/.cache",
+    filename: str = "recordr_screenshot.jpg",
+    backend: Optional[CaptureBackend] = None,
+    quality: int = 80,
+    max_dim: Optional[int] = None,
+) -> Optional[Tuple[str, dict]]:
     """Capture a screenshot of the active screen and return screen information.
     
     Args:
         output_dir (str): Directory to save the screenshot. Defaults to "~/Desktop".
+        filename (str): Its extension picks the image format; the file itself is named
+            after the display type and time.
+        backend (Optional[CaptureBackend]): Backend to capture with. Defaults to the platform backend.
+        quality (int): JPEG/WebP quality, 1-100. Defaults to 80.
+        max_dim (Optional[int]): Longest side of the saved image; None keeps full size.
     
     Returns:
         Optional[Tuple[str, dict]]: Tuple of (screenshot_path, screen_info), or None if failed.
     """
-    # Get screen info first
-    screen_info = _get_active_screen_info()
+    if backend is None:
+        with get_backend() as backend:
+            return capture_active_screen_with_info(output_dir, filename, backend, quality, max_dim)
+    
+    # Get screen info first; the capture below uses the same display
+    mouse = _get_mouse_position(backend)
+    display = _get_active_display(backend, mouse)
     
-    if screen_info is None:
+    if display is None:
         print("No active screen found")
         return None
+    screen_info = _display_info(display, mouse)
     
-    # Capture screenshot
+    # Capture screenshot, in the format *filename*'s extension names
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     display_type = "main" if screen_info['is_main'] else "secondary"
-    filename = f"screen_{display_type}_{timestamp}.png"
+    filename = f"screen_{display_type}_{timestamp}{os.path.splitext(filename)[1]}"
     
-    screenshot_path = capture_active_screen(output_dir=output_dir, filename=filename)
+    screenshot_path = capture_active_screen(
+        output_dir=output_dir, filename=filename, backend=backend, quality=quality, max_dim=max_dim,
+        display=display,
+    )
     print(f"Screenshot saved to: {screenshot_path}")
     
     if screenshot_path:
@@ -188,6 +291,183 @@ def capture_active_screen_with_info(output_dir: str = "~/.cache", filename: str
     return None
 
 
+###############################################################################
+# Service mode                                                                #
+###############################################################################
+
+
+class _WarmBackend(CaptureBackend):
+    """Delegate to *backend*, reusing its display list for *ttl* seconds."""
+
+    def __init__(self, backend: CaptureBackend, ttl: float) -> None:
+        self._backend = backend
+        self.name = backend.name
+        self._ttl = ttl
+        self._displays: Optional[List[dict]] = None
+        self._fetched = 0.0
+
+    def displays(self) -> List[dict]:
+        now = time.monotonic()
+        if self._displays is None or now - self._fetched > self._ttl:
+            self._displays = self._backend.displays()
+            self._fetched = now
+        return self._displays
+
+    def refresh(self) -> None:
+        """Drop the cached display list (a display was added or removed)."""
+        self._displays = None
+
+    def windows(self) -> List[dict]:
+        return self._backend.windows()
+
+    def cursor_position(self) -> Tuple[float, float]:
+        return self._backend.cursor_position()
+
+    def grab(self, region):
+        return self._backend.grab(region)
+
+    def capture_allowed(self) -> bool:
+        return self._backend.capture_allowed()
+
+    def close(self) -> None:
+        self._backend.close()
+
+
+def _handle_request(backend: _WarmBackend, req: dict) -> dict:
+    """Serve one capture request and return its ``done`` reply."""
+    t0 = time.perf_counter()
+    # one cursor/display lookup for both the reply's info and the grab
+    mouse = _get_mouse_position(backend)
+    display = _get_active_display(backend, mouse)
+    if display is None:
+        # the cursor may be on a display that appeared since the list was cached
+        backend.refresh()
+        display = _get_active_display(backend, mouse)
+    if display is None:
+        raise RuntimeError("No active screen found")
+    reply = {"id": req.get("id"), "event": "done", "info": _display_info(display, mouse)}
+    quality, max_dim = req.get("quality", 80), req.get("max_dim")
+    if req.get("inline"):
+        shot = encode_active_screen(req.get("format", "jpeg"), quality, max_dim, as_base64=True, backend=backend,
+                                    display=display)
+        if shot is None:
+            raise RuntimeError("No active screen found")
+        reply.update(mime=shot.mime, data=shot.data, size=shot.size)
+    else:
+        path = capture_active_screen(
+            output_dir=req.get("output_dir", "~/.cache"),
+            filename=req.get("filename", "recordr_screenshot.jpg"),
+            backend=backend,
+            quality=quality,
+            max_dim=max_dim,
+            display=display,
+        )
+        if path is None:
+            raise RuntimeError("No active screen found")
+        reply["path"] = path
+    reply["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return reply
+
+
+def _serve_lines(backend: _WarmBackend, lines, emit: Callable[[dict], None]) -> bool:
+    """Answer JSON-lines requests until EOF; returns True if a shutdown was requested."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get("id")
+            op = req.get("op", "capture")
+            if op == "shutdown":
+                emit({"id": req_id, "event": "done"})
+                return True
+            if op == "ping":
+                emit({"id": req_id, "event": "pong"})
+            elif op == "capture":
+                emit(_handle_request(backend, req))
+            else:
+                raise ValueError(f"unknown op: {op}")
+        except Exception as e:
+            emit({"id": req_id, "event": "error", "message": str(e)})
+    return False
+
+
+def serve(backend: CaptureBackend, socket_path: Optional[str] = None, display_ttl: float = 5.0) -> None:
+    """Run as a resident capture service speaking JSON lines.
+
+    Requests and replies (one object per line)::
+
+        {"id": 1, "op": "capture", "output_dir": "~/.cache", "filename": "recordr_screenshot.jpg"}
+        {"id": 1, "event": "done", "path": "...", "info": {...}, "ms": 41.0}
+        {"id": 2, "op": "capture", "inline": true, "format": "jpeg", "quality": 80, "max_dim": 2048}
+        {"id": 2, "event": "done", "mime": "image/jpeg", "data": "<base64>", "size": [2048, 1280],
+         "info": {...}, "ms": 38.2}
+        {"id": 3, "op": "ping"}
+        {"op": "shutdown"}
+
+    ``quality`` and ``max_dim`` apply to file captures too, whose format follows
+    the filename's extension.  ``info`` is :func:`_get_active_screen_info`'s dict; a failed request gets a
+    single ``{"event": "error", "message": ...}`` line instead.  A
+    ``{"event": "ready"}`` line marks the start of the protocol.  One backend
+    (and so one ``mss`` grabber) serves every request, and the display list is
+    reused for *display_ttl* seconds.
+
+    Args:
+        backend (CaptureBackend): Backend kept open for the life of the service.
+        socket_path (Optional[str]): Listen on this Unix socket (one connection at a
+            time) instead of stdin/stdout. Defaults to None.
+        display_ttl (float): Seconds a display list is reused. Defaults to 5.
+    """
+    warm = _WarmBackend(backend, display_ttl)
+    # Protocol lines own stdout; route every diagnostic print to stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def emitter(stream: TextIO) -> Callable[[dict], None]:
+        def emit(msg: dict) -> None:
+            stream.write(json.dumps(msg) + "\n")
+            stream.flush()
+        return emit
+
+    with warm:
+        if socket_path is None:
+            emit = emitter(out)
+            emit({"event": "ready", "pid": os.getpid()})
+            _serve_lines(warm, sys.stdin, emit)
+            return
+
+        stopping = False
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                nonlocal stopping
+                stream = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+                lines = io.TextIOWrapper(self.rfile, encoding="utf-8")
+                try:
+                    stopping = _serve_lines(warm, lines, emitter(stream)) or stopping
+                finally:
+                    stream.detach()
+                    lines.detach()
+
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{socket_path} exists and is not a socket")
+            os.remove(socket_path)      # left behind by a server that did not exit cleanly
+        with socketserver.UnixStreamServer(socket_path, Handler) as server:
+            emitter(out)({"event": "ready", "pid": os.getpid(), "socket": socket_path})
+            try:
+                while not stopping:
+                    server.handle_request()
+            finally:
+                os.remove(socket_path)
+
+
 ###############################################################################
 # Main function                                                               #
 ###############################################################################
@@ -210,22 +490,99 @@ def main() -> None:
         action='store_true',
         help='Print detailed screen information'
     )
-    
+    parser.add_argument(
+        '--backend',
+        choices=BACKENDS,
+        default=None,
+        help='Capture backend (default: $RECORDR_CAPTURE_BACKEND or the platform default)'
+    )
+    parser.add_argument(
+        '--filename',
+        type=str,
+        default="recordr_screenshot.jpg",
+        help='File name; its extension (.jpg, .png, .webp) picks the format'
+    )
+    parser.add_argument(
+        '--quality',
+        type=int,
+        default=80,
+        help='JPEG/WebP quality (1-100)'
+    )
+    parser.add_argument(
+        '--max-dim',
+        type=int,
+        default=None,
+        help='Downscale so the longest side is at most this many pixels'
+    )
+    parser.add_argument(
+        '--stdout',
+        action='store_true',
+        help='Write the encoded image to stdout instead of a file'
+    )
+    parser.add_argument(
+        '--base64',
+        action='store_true',
+        help='With --stdout: write base64 text instead of raw bytes'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Stay resident and answer JSON-lines capture requests on stdin/stdout'
+    )
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=None,
+        help='With --serve: listen on this Unix socket instead of stdin/stdout'
+    )
+    parser.add_argument(
+        '--display-ttl',
+        type=float,
+        default=5.0,
+        help='With --serve: seconds a display list is reused'
+    )
+
     args = parser.parse_args()
-    filename = "recordr_screenshot.jpg"
+    filename = args.filename
+    format_for(filename)   # reject an unsupported extension before capturing
+    
+    out = sys.stdout
+    if args.stdout:
+        # the image owns stdout; route every diagnostic print to stderr
+        sys.stdout = sys.stderr
+    
+    backend = get_backend(args.backend)
     
     # Check for screen capture permission
-    if not Quartz.CGPreflightScreenCaptureAccess():
+    if not backend.capture_allowed():
         print("Screen capture NOT allowed; requesting permission...")
         # Request permission
-        Quartz.CGRequestScreenCaptureAccess()
+        backend.request_access()
         raise PermissionError("Screen capture not allowed. Please grant permission in System Preferences.")
     
     print("Screen capture allowed for this process.")
-    
+
+    if args.serve:
+        serve(backend, socket_path=args.socket, display_ttl=args.display_ttl)
+        return
+
+    if args.stdout:
+        with backend:
+            shot = encode_active_screen(format_for(filename), args.quality, args.max_dim, args.base64, backend)
+        if shot is None:
+            sys.exit(1)
+        out.buffer.write(shot.data.encode() if args.base64 else shot.data)
+        out.flush()
+        return
+
     # Capture the screenshot
     if args.with_info:
-        result = capture_active_screen_with_info(output_dir=args.output_dir, filename=filename)
+        with backend:
+            result = capture_active_screen_with_info(
+                output_dir=args.output_dir, filename=filename, backend=backend,
+                quality=args.quality, max_dim=args.max_dim,
+            )
+        screenshot_path = result[0] if result else None
         if result:
             screenshot_path, screen_info = result
             print("\n=== Screen Information ===")
@@ -236,10 +593,14 @@ def main() -> None:
             print(f"Is Built-in Display: {screen_info['is_builtin']}")
             print(f"Mouse Position: ({screen_info['mouse_position'][0]:.0f}, {screen_info['mouse_position'][1]:.0f})")
     else:
-        screenshot_path = capture_active_screen(
-            output_dir=args.output_dir,
-            filename=filename
-        )
+        with backend:
+            screenshot_path = capture_active_screen(
+                output_dir=args.output_dir,
+                filename=filename,
+                backend=backend,
+                quality=args.quality,
+                max_dim=args.max_dim,
+            )
     
     if screenshot_path:
         print(f"\n✓ Successfully captured active screen")
@@ -115,3 +115,92 @@ SENSITIVE_DOMAINS = [
     "zocdoc.com",
     "himss.org"
 ]
+
+# Window and tab titles rarely show the domain, so ``title_filter`` also
+# recognises sites by name.  A site name alone is not enough: "Vanguard" or
+# "Medicare" turns up in news, mail and documents.  A title is flagged when it
+# names a site from SENSITIVE_SITE_NAMES *and* an account page from
+# ACCOUNT_TITLE_TERMS ("Vanguard - Log on", "Wells Fargo | Accounts"), or names
+# a patient/banking portal from SENSITIVE_PORTALS, which is specific enough on
+# its own.  All are matched case-insensitively as whole words.
+SENSITIVE_SITE_NAMES = [
+    "Bank of America",
+    "Wells Fargo",
+    "Chase",
+    "Citi",
+    "Citibank",
+    "U.S. Bank",
+    "PNC",
+    "Capital One",
+    "American Express",
+    "Amex",
+    "Navy Federal",
+    "Ally",
+    "Schwab",
+    "Fidelity",
+    "Vanguard",
+    "Robinhood",
+    "E*TRADE",
+    "Merrill",
+    "Interactive Brokers",
+    "PayPal",
+    "Venmo",
+    "Cash App",
+    "Zelle",
+    "TurboTax",
+    "H&R Block",
+    "QuickBooks",
+    "ADP",
+    "Rocket Mortgage",
+    "Navient",
+    "Nelnet",
+    "Kaiser Permanente",
+    "UnitedHealthcare",
+    "Blue Cross",
+    "Aetna",
+    "Cigna",
+    "Humana",
+    "Medicare",
+    "Medicaid",
+    "Labcorp",
+    "Quest Diagnostics",
+    "Teladoc",
+    "Zocdoc",
+]
+
+ACCOUNT_TITLE_TERMS = [
+    "sign in",
+    "sign on",
+    "log in",
+    "log on",
+    "login",
+    "logon",
+    "online banking",
+    "my account",
+    "accounts",
+    "account summary",
+    "account activity",
+    "statements",
+    "transactions",
+    "portfolio",
+    "positions",
+    "balances",
+    "transfer",
+    "pay bills",
+    "tax return",
+    "pay stub",
+    "paystub",
+    "claims",
+    "test results",
+    "lab results",
+    "member portal",
+    "patient portal",
+]
+
+SENSITIVE_PORTALS = [
+    "MyChart",
+    "FollowMyHealth",
+    "Chase Online",
+    "Wells Fargo Online",
+    "MyMedicare",
+]
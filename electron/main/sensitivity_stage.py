@@ -0,0 +1,194 @@
+"""Streaming sensitive-domain check for frames as the recorder saves them.
+
+Saved frame paths are pushed onto a bounded queue that a small OCR process
+pool drains in the background, so flagged frames are deleted (or quarantined)
+seconds after capture instead of at the nightly ``ocr_check`` pass.
+
+The stage never blocks the capture loop: when the queue is full a frame is
+dropped from the *inline* check according to ``drop_policy``.  Dropped frames
+stay on disk and are still covered by the nightly batch.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from capture_index import forget_frames
+from frame_pack import frame_exists, read_frame, remove_frame, split_ref
+from llm_variant import remove_variant
+
+DROP_POLICIES = ("drop_newest", "drop_oldest")
+ACTIONS = ("delete", "quarantine")
+
+log = logging.getLogger("Screen")
+
+
+class SensitivityStage:
+    """Background OCR stage fed by :meth:`submit`.
+
+    Args:
+        workers (int, optional): OCR worker processes. Defaults to 1.
+        queue_size (int, optional): Maximum frames waiting for OCR. Defaults to 64.
+        drop_policy (str, optional): ``"drop_newest"`` rejects new frames while the
+            queue is full, ``"drop_oldest"`` evicts the oldest waiting frame.
+            Defaults to ``"drop_newest"``.
+        action (str, optional): ``"delete"`` or ``"quarantine"`` flagged frames.
+            Defaults to ``"delete"``.
+        quarantine_dir (Optional[str], optional): Where quarantined frames go.
+            Required when *action* is ``"quarantine"``.
+        torch_threads (int, optional): Torch threads per worker. Defaults to 1.
+        roi (bool, optional): OCR only the top strip of each window the frame showed, or of
+            the frame when :meth:`submit` got no window bounds. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = 64,
+        drop_policy: str = "drop_newest",
+        action: str = "delete",
+        quarantine_dir: Optional[str] = None,
+        torch_threads: int = 1,
+        roi: bool = False,
+    ) -> None:
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}, got {drop_policy!r}")
+        if action not in ACTIONS:
+            raise ValueError(f"action must be one of {ACTIONS}, got {action!r}")
+        if action == "quarantine" and not quarantine_dir:
+            raise ValueError("quarantine_dir is required when action='quarantine'")
+
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.drop_policy = drop_policy
+        self.action = action
+        self.quarantine_dir = quarantine_dir
+        self.torch_threads = torch_threads
+        self.roi = roi
+
+        self.stats: Dict[str, int] = dict.fromkeys(
+            ("submitted", "dropped", "checked", "flagged", "errors"), 0
+        )
+        self._queue: Optional[asyncio.Queue[Tuple[str, Optional[list]]]] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._removed: List[str] = []      # flagged frames not yet recorded in the capture index
+        self._roi_config = None
+        self._check_batch = None
+
+    # ─────────────────────────────── lifecycle
+    def start(self) -> None:
+        """Start the worker pool and consumer tasks on the running loop."""
+        if self._tasks:
+            return
+        # imported lazily: only recorders with the stage enabled pay for OCR
+        import ocr_check
+
+        if self.quarantine_dir:
+            os.makedirs(self.quarantine_dir, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=ocr_check._init_worker,
+            initargs=(self.torch_threads,),
+        )
+        self._roi_config = ocr_check.RoiConfig() if self.roi else None
+        self._check_batch = ocr_check._check_batch
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the consumers and shut the pool down; queued frames are left for the nightly pass."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._forget_removed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ─────────────────────────────── producer side
+    def submit(self, path: str, bounds: Optional[list] = None) -> bool:
+        """Queue *path* for checking without blocking.
+
+        *bounds* are the frame's window bounds as the capture index records them;
+        with ``roi`` set, the top strip of each of those windows is OCR'd.
+
+        Returns:
+            bool: False if *path* itself was not queued.
+        """
+        if self._queue is None:
+            return False
+        self.stats["submitted"] += 1
+        if self._queue.full():
+            self.stats["dropped"] += 1
+            if self.drop_policy == "drop_newest":
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._queue.put_nowait((path, bounds))
+        return True
+
+    @property
+    def depth(self) -> int:
+        """Number of frames waiting for OCR."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ─────────────────────────────── consumer side
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        from domain_matcher import get_matcher
+        matcher = get_matcher()
+        while True:
+            path, bounds = await self._queue.get()
+            try:
+                if not frame_exists(path):
+                    continue
+                [(_, tokens, error, _)] = await loop.run_in_executor(
+                    self._pool, self._check_batch, [path], self._roi_config, {path: bounds} if bounds else None
+                )
+                self.stats["checked"] += 1
+                if error is not None:
+                    self.stats["errors"] += 1
+                    log.info(f"inline OCR failed for {os.path.basename(path)}: {error}")
+                    continue
+                domain = matcher.match_tokens(tokens)
+                if domain is not None:
+                    self.stats["flagged"] += 1
+                    self._handle_flagged(path, domain)
+            except Exception as e:  # keep the stage alive on I/O races
+                self.stats["errors"] += 1
+                log.info(f"inline OCR error for {os.path.basename(path)}: {e}")
+            finally:
+                self._queue.task_done()
+                if self._queue.empty():
+                    self._forget_removed()
+
+    def _handle_flagged(self, path: str, domain: str) -> None:
+        _, name = split_ref(path)
+        if self.action == "quarantine" and name is not None:
+            with open(os.path.join(self.quarantine_dir, name), "wb") as fh:
+                fh.write(read_frame(path))
+            remove_frame(path)
+        elif self.action == "quarantine":
+            remove_variant(path)
+            shutil.move(path, os.path.join(self.quarantine_dir, os.path.basename(path)))
+        else:
+            remove_frame(path)
+        self._removed.append(path)
+        log.info(f"inline OCR {self.action}d {os.path.basename(path)} ({domain})")
+
+    def _forget_removed(self) -> None:
+        """Record the frames removed since the last call in the capture index, one write per directory."""
+        removed, self._removed = self._removed, []
+        by_dir: Dict[str, List[str]] = {}
+        for path in removed:
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+        for file_dir, paths in by_dir.items():
+            forget_frames(file_dir, paths)
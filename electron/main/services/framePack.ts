@@ -0,0 +1,98 @@
+// Read-only access to the daily packfiles record.py writes with --storage pack.
+// The layout is documented in electron/main/frame_pack.py; this reader only
+// lists live frames and reads their bytes, it never writes to a pack.
+import fs from 'node:fs';
+import path from 'node:path';
+
+const PACK_PREFIX = 'frames-';
+const PACK_SUFFIX = '.pack';
+const MAGIC = Buffer.from('RCPACK1\n', 'latin1');
+const RECORD_MAGIC = 'FRM1';
+const TABLE_MAGIC = 'PIDX';
+const HEADER_SIZE = 19;        // <4sBHId: magic, flags, name_len, data_len, ts
+const TABLE_ENTRY_SIZE = 16;   // <Qd: record offset, ts
+const FOOTER_SIZE = 16;        // <QI4s: table offset, count, magic
+const FLAG_DELETED = 0x01;
+
+export type PackedFrame = {
+  name: string;
+  pack: string;
+  ts: number;          // capture time, seconds since the epoch
+  dataOffset: number;
+  size: number;
+};
+
+export const isPack = (name: string) => name.startsWith(PACK_PREFIX) && name.endsWith(PACK_SUFFIX);
+
+const readAt = (fd: number, offset: number, length: number) => {
+  const buf = Buffer.alloc(length);
+  const read = fs.readSync(fd, buf, 0, length, offset);
+  return buf.subarray(0, read);
+}
+
+// Record offsets from the footer's table, or by walking the headers of a pack
+// that is still being written (or whose writer crashed) up to a torn tail.
+const recordOffsets = (fd: number, size: number) => {
+  if (size >= MAGIC.length + FOOTER_SIZE) {
+    const footer = readAt(fd, size - FOOTER_SIZE, FOOTER_SIZE);
+    if (footer.toString('latin1', 12, 16) === TABLE_MAGIC) {
+      const tableOffset = Number(footer.readBigUInt64LE(0));
+      const count = footer.readUInt32LE(8);
+      const table = readAt(fd, tableOffset, count * TABLE_ENTRY_SIZE);
+      return Array.from({ length: count }, (_, i) => Number(table.readBigUInt64LE(i * TABLE_ENTRY_SIZE)));
+    }
+  }
+  const offsets: number[] = [];
+  let pos = MAGIC.length;
+  while (pos + HEADER_SIZE <= size) {
+    const header = readAt(fd, pos, HEADER_SIZE);
+    const end = pos + HEADER_SIZE + header.readUInt16LE(5) + header.readUInt32LE(7);
+    if (header.toString('latin1', 0, 4) !== RECORD_MAGIC || end > size) {
+      break;
+    }
+    offsets.push(pos);
+    pos = end;
+  }
+  return offsets;
+}
+
+export const listPackedFrames = (packPath: string): PackedFrame[] => {
+  const fd = fs.openSync(packPath, 'r');
+  try {
+    const size = fs.fstatSync(fd).size;
+    if (size < MAGIC.length || !readAt(fd, 0, MAGIC.length).equals(MAGIC)) {
+      console.warn(`Not a frame pack: ${packPath}`);
+      return [];
+    }
+    const frames: PackedFrame[] = [];
+    for (const offset of recordOffsets(fd, size)) {
+      const header = readAt(fd, offset, HEADER_SIZE);
+      if (header[4] & FLAG_DELETED) {
+        continue;
+      }
+      const nameLen = header.readUInt16LE(5);
+      frames.push({
+        name: readAt(fd, offset + HEADER_SIZE, nameLen).toString('utf8'),
+        pack: packPath,
+        ts: header.readDoubleLE(11),
+        dataOffset: offset + HEADER_SIZE + nameLen,
+        size: header.readUInt32LE(7),
+      });
+    }
+    return frames;
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+export const listPacks = (file_dir: string) =>
+  fs.readdirSync(file_dir).filter(isPack).sort().map(name => path.join(file_dir, name));
+
+export const readPackedFrame = (frame: PackedFrame) => {
+  const fd = fs.openSync(frame.pack, 'r');
+  try {
+    return readAt(fd, frame.dataOffset, frame.size);
+  } finally {
+    fs.closeSync(fd);
+  }
+}
@@ -2,10 +2,10 @@ import { ChildProcess } from 'node:child_process'
 import { startRecording } from './recording'
 import { setScreenRecordingNotAllowed } from '../index'
 import { spawn } from 'node:child_process'
+import { createInterface } from 'node:readline'
 import { app } from 'electron'
 import path from 'node:path'
 import fs from 'node:fs'
-import os from 'node:os'
 import { fileURLToPath } from 'node:url'
 import { callLLM } from './llm'
 import { getUser } from '../ipc/db'
@@ -15,8 +15,6 @@ import { showLongNotification } from '../ipc/ipc'
 const __dirname = path.dirname(fileURLToPath(import.meta.url))
 const APP_ROOT = path.join(__dirname, '../..')
 
-let childProcess: ChildProcess | null = null;
-
 
 
 function getScreenshot() {
@@ -37,76 +35,106 @@ function getScreenshot() {
     return path.join(process.resourcesPath, 'screenshot', 'screenshot');
 }
 
-async function takeScreenshot() {
-    console.log("Taking screenshot...");
-    const executablePath = getScreenshot();
-   
-    const screenshotPath = path.join(os.homedir(), '.cache', 'recordr_screenshot.jpg');
-  
-    return new Promise<void>((resolve, reject) => {
-        let resolved = false;
-        
-        childProcess = spawn(
-          executablePath,
-          // ["--output-dir", screenshotPath],
-          {
-            stdio: ["inherit", "inherit", "inherit"],
-          }
-        );
-      
-        childProcess.on("error", (error) => {
-          console.error("Failed to start Python script:", error);
-          childProcess = null;
-          if (!resolved) {
-              resolved = true;
-              if (error.message.includes("Screen capture not allowed")) {
-                  setScreenRecordingNotAllowed();
-              }
-              reject(error);
-          }
+// Resident `screenshot --serve` process: pays Python/mss startup once and
+// answers JSON-lines capture requests on stdin/stdout.
+type ScreenshotReply = { id: number, event: string, path?: string, mime?: string, data?: string, info?: unknown, ms?: number, message?: string };
+
+// the model fits images into 2048x2048 anyway
+const SCREENSHOT_MAX_DIM = 2048;
+
+let screenshotServer: ChildProcess | null = null;
+let serverReady: Promise<ChildProcess> | null = null;
+let nextRequestId = 1;
+const pendingShots = new Map<number, { resolve: (reply: ScreenshotReply) => void, reject: (error: Error) => void }>();
+
+function failPending(error: Error) {
+    for (const { reject } of pendingShots.values()) reject(error);
+    pendingShots.clear();
+}
+
+function startScreenshotServer(): Promise<ChildProcess> {
+    if (serverReady) return serverReady;
+    serverReady = new Promise<ChildProcess>((resolve, reject) => {
+        const child = spawn(getScreenshot(), ["--serve"], { stdio: ["pipe", "pipe", "inherit"] });
+        let ready = false;
+        // let the next call spawn a new server, unless this one was already replaced
+        const forget = () => {
+            if (screenshotServer !== child) return;
+            screenshotServer = null;
+            serverReady = null;
+        };
+        const lines = createInterface({ input: child.stdout! });
+        lines.on("line", (line) => {
+            let msg: ScreenshotReply & { pid?: number };
+            try {
+                msg = JSON.parse(line);
+            } catch {
+                console.log(`[screenshot] ${line}`); // startup output before the protocol begins
+                return;
+            }
+            if (!ready && msg.event === "ready") {
+                ready = true;
+                console.log(`Screenshot server ready (pid ${msg.pid})`);
+                resolve(child);
+                return;
+            }
+            const pending = pendingShots.get(msg.id);
+            if (!pending) return;
+            pendingShots.delete(msg.id);
+            if (msg.event === "error") pending.reject(new Error(msg.message));
+            else pending.resolve(msg);
         });
-      
-        childProcess.on("exit", (code) => {
-          console.log(`Python script exited with code ${code}`);
-          
-          if (code !== 0) {
-              childProcess = null;
-              if (!resolved) {
-                  resolved = true;
-                  reject(new Error(`Python script exited with code ${code}`));
-              }
-              return;
-          }
-          
-          // Wait for the file to exist
-          const checkFile = () => {
-              if (resolved) return;
-              
-              if (fs.existsSync(screenshotPath)) {
-                  console.log(`Screenshot saved to: ${screenshotPath}`);
-                  childProcess = null;
-                  resolved = true;
-                  resolve();
-              } else {
-                  // Check again after a short delay
-                  setTimeout(checkFile, 100);
-              }
-          };
-          
-          // Start checking immediately
-          checkFile();
-          
-          // Timeout after 1 seconds
-          setTimeout(() => {
-              if (!resolved) {
-                  childProcess = null;
-                  resolved = true;
-                  reject(new Error("Timeout waiting for screenshot file to be created"));
-              }
-          }, 1000);
+        child.on("error", (error) => {
+            console.error("Failed to start screenshot server:", error);
+            if (error.message.includes("Screen capture not allowed")) {
+                setScreenRecordingNotAllowed();
+            }
+            forget();
+            if (!ready) reject(error);
+            failPending(error);
         });
+        child.on("exit", (code) => {
+            console.log(`Screenshot server exited with code ${code}`);
+            forget();
+            const error = new Error(`Screenshot server exited with code ${code}`);
+            if (!ready) reject(error);
+            failPending(error);
+        });
+        screenshotServer = child;
+    });
+    return serverReady;
+}
+
+async function takeScreenshot(timeoutMs = 5000): Promise<ScreenshotReply> {
+    console.log("Taking screenshot...");
+    const server = await startScreenshotServer();
+    const id = nextRequestId++;
+    return new Promise<ScreenshotReply>((resolve, reject) => {
+        const timer = setTimeout(() => {
+            pendingShots.delete(id);
+            reject(new Error("Timeout waiting for screenshot"));
+        }, timeoutMs);
+        pendingShots.set(id, {
+            resolve: (reply) => { clearTimeout(timer); resolve(reply); },
+            reject: (error) => { clearTimeout(timer); reject(error); },
+        });
+        // encoded in memory and returned as base64: no file round-trip
+        server.stdin!.write(JSON.stringify({
+            id,
+            op: "capture",
+            inline: true,
+            format: "jpeg",
+            quality: 80,
+            max_dim: SCREENSHOT_MAX_DIM,
+        }) + "\n");
     });
 }
+
+export function stopScreenshotServer() {
+    screenshotServer?.stdin?.end();
+    screenshotServer = null;
+    serverReady = null;
+}
  
 export async function inferActions() {
     console.log("Inferring actions...");
@@ -135,25 +163,15 @@ export async function inferActions() {
     `
     
 
-    if (childProcess !== null) {
-        // stop existing process (recording)
-        childProcess.kill();
-        childProcess = null;
-    } 
-
-    await takeScreenshot();
-    const fpath = path.join(os.homedir(), '.cache', 'recordr_screenshot.jpg');
-    console.log(`Reading screenshot from: ${fpath}`);
-    
-    const imageBuffer = fs.readFileSync(fpath);
-    const base64Image = imageBuffer.toString("base64");
+    const shot = await takeScreenshot();
+    console.log(`Screenshot captured in ${shot.ms} ms (${shot.info ? JSON.stringify(shot.info) : 'no screen info'})`);
     
     const content = [
         { type: "text", text: prompt },
         {
           type: "image_url",
           image_url: {
-            "url": `data:image/jpeg;base64,${base64Image}`,
+            "url": `data:${shot.mime};base64,${shot.data}`,
           },
         }
     ]
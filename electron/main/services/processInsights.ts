@@ -11,6 +11,7 @@ import { WINDOW_SIZE, CONTEXT_SIZE, SESSION_GAP, MODEL_SELECTION, DEV_MODEL_SELE
 import { zodResponseFormat } from 'openai/helpers/zod';
 import { parseModelJson } from './jsonParse';
 import { startPreprocess } from './preprocessFiles';
+import { listPacks, listPackedFrames, readPackedFrame } from './framePack';
 
 dotenv.config();
 
@@ -26,39 +27,66 @@ const OBSERVATION_SCHEMA = z.object({
 });
 
 
-const getImages = (files: string[], file_dir: string) => {
-  return files.map(file => {
-    const filePath = path.join(file_dir, file);
-    if (!fs.existsSync(filePath)) {
-      console.warn(`File not found: ${filePath}`);
+// record.py writes .jpg by default and .webp with --format webp
+const FRAME_EXTENSIONS = ['.jpg', '.webp'];
+const mimeType = (file: string) => path.extname(file) === '.webp' ? 'image/webp' : 'image/jpeg';
+
+// record.py --llm-variants caches a downscaled JPEG's base64 in .llm/<stem>.b64
+const LLM_VARIANT_DIR = '.llm';
+
+// A loose frame file, or a frame record.py --storage pack appended to a daily pack
+type Frame = { name: string; mtime: Date; read: () => Buffer };
+
+const listFrames = (file_dir: string): Frame[] => {
+    const loose = fs.readdirSync(file_dir)
+        .filter(name => FRAME_EXTENSIONS.includes(path.extname(name)))
+        .map(name => {
+            const filePath = path.join(file_dir, name);
+            return { name, mtime: fs.statSync(filePath).mtime, read: () => fs.readFileSync(filePath) };
+        });
+    const looseNames = new Set(loose.map(frame => frame.name));
+    const packed = listPacks(file_dir)
+        .flatMap(listPackedFrames)
+        .filter(frame => !looseNames.has(frame.name))   // also unpacked with `frame_pack.py unpack --keep`
+        .map(frame => ({ name: frame.name, mtime: new Date(frame.ts * 1000), read: () => readPackedFrame(frame) }));
+    return [...loose, ...packed];
+}
+
+const getImages = (frames: Frame[], file_dir: string) => {
+  return frames.map(frame => {
+    const file = frame.name;
+    const variantPath = path.join(file_dir, LLM_VARIANT_DIR, `${path.parse(file).name}.b64`);
+    if (fs.existsSync(variantPath)) {
+      return {
+        type: "image_url",
+        image_url: {
+          "url": `data:image/jpeg;base64,${fs.readFileSync(variantPath, 'utf8')}`,
+        },
+      };
+    }
+    let imageBuffer: Buffer;
+    try {
+      imageBuffer = frame.read();
+    } catch (error) {
+      console.warn(`Frame not found: ${file}`, error);
       return null;
     }
-    const imageBuffer = fs.readFileSync(filePath);
     return {
       type: "image_url",
       image_url: {
-        "url": `data:image/jpeg;base64,${imageBuffer.toString("base64")}`,
+        "url": `data:${mimeType(file)};base64,${imageBuffer.toString("base64")}`,
       },
     };
   }).filter(img => img !== null);
 }
 
 const splitDays = async(file_dir: string) => {
-    const files_by_days: { [key: string]: string[] } = {};
+    const files_by_days: { [key: string]: Frame[] } = {};
     console.log("file_dir: ", file_dir);
-    const file_names = fs.readdirSync(file_dir);
-    const files_with_stats = file_names.map(name => ({
-        name,
-        path: path.join(file_dir, name),
-        mtime: fs.statSync(path.join(file_dir, name)).mtime
-        }));
-    const sorted_files = files_with_stats
-        .filter(file => file.name.endsWith('.jpg'))
-        .sort((a, b) => a.mtime.getTime() - b.mtime.getTime()) // Sort by modification time, oldest first
-        .map(file => file.name);
+    const sorted_files = listFrames(file_dir)
+        .sort((a, b) => a.mtime.getTime() - b.mtime.getTime()); // Sort by modification time, oldest first
     for (const file of sorted_files) {
-        const file_time = fs.statSync(path.join(file_dir, file)).mtime;
-        const day = file_time.toISOString().split('T')[0];
+        const day = file.mtime.toISOString().split('T')[0];
         if (!files_by_days[day]) {
             files_by_days[day] = [];
         }
@@ -67,14 +95,14 @@ const splitDays = async(file_dir: string) => {
     return files_by_days;
 }
 
-const processTraces = async(sorted_files: string[], file_dir: string) => {
+const processTraces = async(sorted_files: Frame[], file_dir: string) => {
     // process all of the files in the session
     const sessions = [];
 
-    let lastFile = fs.statSync(path.join(file_dir, sorted_files[0])).mtime;
-    let currentSession: string[] = [];
+    let lastFile = sorted_files[0].mtime;
+    let currentSession: Frame[] = [];
     for (const sf of sorted_files) {
-    let updateTime = fs.statSync(path.join(file_dir, sf)).mtime;
+    let updateTime = sf.mtime;
     let timeDiff = updateTime.getTime() - lastFile.getTime();
     if (timeDiff < SESSION_GAP) {
         currentSession.push(sf);
@@ -102,8 +130,8 @@ const processTraces = async(sorted_files: string[], file_dir: string) => {
         end_idx = Math.min(idx + WINDOW_SIZE, session.length);
         const session_files = session.slice(idx, end_idx);
         const session_images = getImages(session_files, file_dir);
-        const first_file = fs.statSync(path.join(file_dir, session[idx])).mtime;
-        const last_file = fs.statSync(path.join(file_dir, session[end_idx - 1])).mtime
+        const first_file = session[idx].mtime;
+        const last_file = session[end_idx - 1].mtime
         const timeStamp = `${first_file.toLocaleTimeString()} - ${last_file.toLocaleTimeString()}`
         timestamps.push(timeStamp)
 
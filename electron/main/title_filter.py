@@ -0,0 +1,119 @@
+"""Pre-capture privacy filter on window titles.
+
+``ocr_check`` and the inline :class:`~sensitivity_stage.SensitivityStage`
+find banking and health sites only after a frame has been grabbed, encoded
+and written.  The window list the recorder already fetches for its skip
+checks carries each window's title (``kCGWindowName``, the tab title for
+browsers), so :class:`TitleFilter` tests those titles first and the recorder
+skips the grab altogether when one matches.
+
+A title is flagged when it mentions a listed domain (``domain_matcher``, the
+same compiled matcher ``ocr_check`` uses), names a listed site together with
+an account page ("Vanguard - Log on"), or names a patient or banking portal
+(see ``sensitive_domains``).  A site name on its own is not enough, so a news
+tab or document that mentions "Medicare" does not stop capture.
+
+Each check is a few regex scans over a few short strings, microseconds
+against the hundreds of milliseconds a captured, encoded, stored and later
+OCR'd frame costs.  OCR stays the backstop for sites whose titles give
+nothing away.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from domain_matcher import DomainMatcher, get_matcher
+from sensitive_domains import ACCOUNT_TITLE_TERMS, SENSITIVE_PORTALS, SENSITIVE_SITE_NAMES
+
+SCOPES = ("front", "visible")
+
+
+class _Phrases:
+    """Case-insensitive whole-word search for any of *phrases*, compiled once."""
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        self._canonical = {p.lower(): p for p in phrases if p}
+        self._pattern = _phrase_pattern(tuple(self._canonical)) if self._canonical else None
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first phrase found in *text*, as listed, or None."""
+        m = self._pattern.search(text) if self._pattern is not None else None
+        return self._canonical[m.group(0).lower()] if m is not None else None
+
+
+@lru_cache(maxsize=None)
+def _phrase_pattern(phrases: Tuple[str, ...]) -> re.Pattern:
+    """One case-insensitive alternation of *phrases*, matched as whole words."""
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])", re.IGNORECASE)
+
+
+class TitleFilter:
+    """Decide from the visible windows' titles whether a capture must be skipped.
+
+    Args:
+        scope (str, optional): ``"front"`` checks only the frontmost application window,
+            ``"visible"`` every window at least partly visible. Defaults to "visible".
+        sites (Optional[Iterable[str]], optional): Site names flagged together with an
+            account term. Defaults to ``sensitive_domains.SENSITIVE_SITE_NAMES``.
+        terms (Optional[Iterable[str]], optional): Account-page terms. Defaults to
+            ``sensitive_domains.ACCOUNT_TITLE_TERMS``.
+        portals (Optional[Iterable[str]], optional): Names flagged on their own. Defaults to
+            ``sensitive_domains.SENSITIVE_PORTALS``.
+        matcher (Optional[DomainMatcher], optional): Domain matcher for titles that show a
+            host name. Defaults to the process-wide :func:`domain_matcher.get_matcher`.
+    """
+
+    def __init__(
+        self,
+        scope: str = "visible",
+        sites: Optional[Iterable[str]] = None,
+        terms: Optional[Iterable[str]] = None,
+        portals: Optional[Iterable[str]] = None,
+        matcher: Optional[DomainMatcher] = None,
+    ) -> None:
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {SCOPES}, got {scope!r}")
+        self.scope = scope
+        self._sites = _Phrases(SENSITIVE_SITE_NAMES if sites is None else sites)
+        self._terms = _Phrases(ACCOUNT_TITLE_TERMS if terms is None else terms)
+        self._portals = _Phrases(SENSITIVE_PORTALS if portals is None else portals)
+        self._matcher = matcher if matcher is not None else get_matcher()
+        self._last_windows: Optional[list] = None
+        self._last_rule: Optional[str] = None
+
+    def match(self, text: str) -> Optional[str]:
+        """Return the rule *text* trips (``"domain:<domain>"`` or ``"title:<site>"``), or None."""
+        domain = self._matcher.search(text)
+        if domain is not None:
+            return f"domain:{domain}"
+        portal = self._portals.search(text)
+        if portal is not None:
+            return f"title:{portal}"
+        site = self._sites.search(text)
+        if site is not None and self._terms.search(text) is not None:
+            return f"title:{site}"
+        return None
+
+    def check(self, windows: List[tuple[dict, float]]) -> Optional[str]:
+        """Return the first rule a window in *windows* trips, front to back, or None.
+
+        *windows* is a ``(window_info, visible_ratio)`` list as the recorder's window
+        snapshot returns it; a snapshot that is checked again is answered from cache.
+        """
+        if windows is self._last_windows:
+            return self._last_rule
+        rule = None
+        for info, ratio in windows:
+            if self.scope == "front" and info.get("kCGWindowLayer", 0) != 0:
+                continue      # menu bar, status items, overlays
+            if ratio > 0:
+                rule = self.match(f"{info.get('kCGWindowOwnerName', '')}\n{info.get('kCGWindowName') or ''}")
+                if rule is not None:
+                    break
+            if self.scope == "front":
+                break
+        self._last_windows, self._last_rule = windows, rule
+        return rule
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The recorder scripts are standalone modules, not an installed package.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "electron", "main"))
@@ -0,0 +1,90 @@
+import pytest
+
+from domain_matcher import DomainMatcher, _legacy_check, _synthetic_frames, get_matcher, normalize
+from sensitive_domains import SENSITIVE_DOMAINS
+
+# How OCR'd screens and window titles show a host name; each must be flagged
+# for every listed domain, as the per-domain regex loop flagged it.
+TEMPLATES = (
+    "{d}",
+    "Log in at {d}, then pay",
+    "Welcome to {d}. Please sign in",
+    "Welcome to {d}.Please sign in",
+    "{d}.Checkout",
+    "https://www.{d}/login?next=%2F",
+    "secure.{d} - Sign In",
+    "(see {d})",
+    "Statement from {d}; due 05/01",
+    "Hello, {d}",
+)
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return DomainMatcher(SENSITIVE_DOMAINS)
+
+
+@pytest.mark.parametrize("text", [
+    "Log in at chase.com, then pay",
+    "Welcome to chase.com. Please sign in",
+    "Welcome to chase.com.",
+    "chase.com! then",
+    "paypal.com.Checkout",
+])
+def test_sentence_punctuation_and_trailing_words(matcher, text):
+    assert matcher.search(text) is not None
+
+
+@pytest.mark.parametrize("text, domain", [
+    ("chase . com", "chase.com"),
+    ("chase , com", "chase.com"),
+    ("www . paypal.com", "paypal.com"),
+])
+def test_spaced_separators(matcher, text, domain):
+    assert matcher.search(text) == domain
+
+
+def test_ocr_rn_read_for_m(matcher):
+    assert normalize("bankofarnerica.com") == "bankofamerica.com"
+    assert matcher.search("bankofarnerica.com") == "bankofamerica.com"
+
+
+def test_subdomain_matches_listed_domain(matcher):
+    assert matcher.search("online.secure.chase.com") == "chase.com"
+
+
+@pytest.mark.parametrize("text", [
+    "chase.community",
+    "purchase.com",
+    "53xcom",
+    "chase com",
+    "",
+])
+def test_label_boundaries(matcher, text):
+    assert matcher.search(text) is None
+
+
+def test_finditer_reports_every_hit(matcher):
+    assert list(matcher.finditer("chase.com, then paypal.com.")) == ["chase.com", "paypal.com"]
+
+
+def test_version_tracks_domain_list():
+    assert DomainMatcher(["a.com"]).version == DomainMatcher(["a.com"]).version
+    assert DomainMatcher(["a.com"]).version != DomainMatcher(["a.com", "b.com"]).version
+    assert get_matcher() is get_matcher()
+
+
+@pytest.mark.parametrize("template", TEMPLATES)
+def test_parity_with_regex_loop_on_domains(matcher, template):
+    missed = []
+    for domain in SENSITIVE_DOMAINS:
+        text = template.format(d=domain)
+        assert _legacy_check(text, SENSITIVE_DOMAINS)
+        if matcher.search(text) is None:
+            missed.append(text)
+    assert missed == []
+
+
+def test_parity_with_regex_loop_on_benign_text(matcher):
+    for text in _synthetic_frames(300, 120):
+        assert (matcher.search(text) is not None) == _legacy_check(text, SENSITIVE_DOMAINS)
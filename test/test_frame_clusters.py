@@ -0,0 +1,175 @@
+import json
+import os
+import random
+
+import pytest
+from PIL import Image
+
+from capture_index import CaptureIndex, IndexEntry
+from frame_clusters import (
+    HASH_INDEX_NAME, BKTree, HashIndex, HashRecord, cluster_directory, cluster_session, list_frames,
+)
+from frame_hash import hamming
+from frame_pack import PackWriter
+
+TS = 1_790_000_000.0
+
+
+def noise(seed, size=(64, 48)):
+    rng = random.Random(seed)
+    return Image.frombytes("L", size, rng.randbytes(size[0] * size[1])).convert("RGB")
+
+
+def write_frames(tmp_path, seeds, start=0):
+    """Save one noise frame per seed as ``<ts>_before.png``, one second apart."""
+    names = []
+    for i, seed in enumerate(seeds, start):
+        name = f"{TS + i:.5f}_before.png"
+        noise(seed).save(tmp_path / name)
+        os.utime(tmp_path / name, (TS + i, TS + i))
+        names.append(name)
+    return names
+
+
+def update(tmp_path):
+    index = HashIndex(str(tmp_path))
+    return index, index.update(list_frames(str(tmp_path), "scan"), workers=1)
+
+
+def stored_lines(tmp_path):
+    return (tmp_path / HASH_INDEX_NAME).read_text().splitlines()
+
+
+@pytest.mark.parametrize("radius", [0, 3, 8, 20])
+def test_bktree_matches_brute_force(radius):
+    rng = random.Random(radius)
+    base = [rng.getrandbits(64) for _ in range(20)]
+    # clumps of near neighbours around a few bases, plus far-off keys
+    keys = [b ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for b in base for _ in range(10)]
+    keys += [rng.getrandbits(64) for _ in range(100)]
+    tree = BKTree()
+    for i, key in enumerate(keys):
+        tree.add(key, i)
+    assert len(tree) == len(keys)
+    for query in base + keys[:30] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = sorted((hamming(query, k), i) for i, k in enumerate(keys) if hamming(query, k) <= radius)
+        assert sorted(tree.search(query, radius)) == expected
+
+
+def test_index_appends_new_frames_and_reloads(tmp_path):
+    write_frames(tmp_path, range(3))
+    index, hashed = update(tmp_path)
+    assert hashed == 3 and len(stored_lines(tmp_path)) == 3
+
+    names = write_frames(tmp_path, [10], start=3)
+    reloaded, hashed = update(tmp_path)
+    assert hashed == 1
+    assert len(stored_lines(tmp_path)) == 4
+    assert {n: r.hash for n, r in reloaded.records.items() if n != names[0]} == {
+        n: r.hash for n, r in index.records.items()
+    }
+    assert update(tmp_path)[1] == 0
+
+
+def test_torn_tail_is_dropped_and_rewritten(tmp_path):
+    write_frames(tmp_path, range(3))
+    update(tmp_path)
+    with open(tmp_path / HASH_INDEX_NAME, "a") as fh:
+        fh.write('{"name":"x.png","ts":1')            # an interrupted append
+
+    index = HashIndex(str(tmp_path))
+    assert len(index.records) == 3
+    assert index.update(list_frames(str(tmp_path), "scan"), workers=1) == 0
+    lines = stored_lines(tmp_path)
+    assert len(lines) == 3 and all(json.loads(line)["name"].endswith(".png") for line in lines)
+
+
+def test_deleted_frames_are_compacted_away(tmp_path):
+    names = write_frames(tmp_path, range(6))
+    update(tmp_path)
+    for name in names[:4]:
+        os.remove(tmp_path / name)
+
+    index, hashed = update(tmp_path)
+    assert hashed == 0
+    assert sorted(index.records) == names[4:]
+    assert sorted(json.loads(line)["name"] for line in stored_lines(tmp_path)) == names[4:]
+    assert sorted(HashIndex(str(tmp_path)).records) == names[4:]
+
+
+def test_replaced_frame_is_hashed_again(tmp_path):
+    names = write_frames(tmp_path, range(3))
+    index, _ = update(tmp_path)
+    old = index.records[names[1]].hash
+
+    noise(99).save(tmp_path / names[1])
+    index, hashed = update(tmp_path)
+    assert hashed == 1
+    assert index.records[names[1]].hash != old
+    assert HashIndex(str(tmp_path)).records[names[1]].hash == index.records[names[1]].hash
+
+
+def test_records_without_identity_are_hashed_again(tmp_path):
+    write_frames(tmp_path, range(2))
+    update(tmp_path)
+    lines = [json.loads(line) for line in stored_lines(tmp_path)]
+    (tmp_path / HASH_INDEX_NAME).write_text(
+        "".join(json.dumps({k: rec[k] for k in ("name", "ts", "hash")}) + "\n" for rec in lines)
+    )
+    assert update(tmp_path)[1] == 2
+    assert update(tmp_path)[1] == 0
+
+
+def test_packed_frames_are_indexed(tmp_path):
+    writer = PackWriter(str(tmp_path))
+    for i in range(3):
+        path = tmp_path / "tmp.png"
+        noise(i).save(path)
+        writer.append(f"{TS + i:.5f}_before.png", TS + i, path.read_bytes())
+        os.remove(path)
+    writer.close()
+
+    index, hashed = update(tmp_path)
+    assert hashed == 3
+    assert [r.ts for r in index.between()] == [TS, TS + 1, TS + 2]
+    assert update(tmp_path)[1] == 0
+
+
+def test_index_source_skips_deleted_frames(tmp_path):
+    names = write_frames(tmp_path, range(3))
+    index = CaptureIndex(str(tmp_path))
+    for i, name in enumerate(names):
+        index.add(IndexEntry(TS + 10 + i, name, "before", "1", 1, "click", 0, 0, [], None))
+    os.remove(tmp_path / names[0])
+
+    frames = list(list_frames(str(tmp_path), "index"))
+    assert [(f.name, ts) for f, ts in frames] == [(names[1], TS + 11), (names[2], TS + 12)]
+    assert frames[0][0].size == os.path.getsize(tmp_path / names[1])
+
+
+def rec(i, h):
+    return HashRecord(f"{i}.png", TS + i, h)
+
+
+def test_cluster_compares_against_first_frame():
+    # a slow scroll: every frame is 3 bits from the previous one
+    flips = [0, 0b111, 0b111 << 3, 0b111 << 6, 0b111 << 9]
+    h, hashes = 0, []
+    for f in flips:
+        h ^= f
+        hashes.append(h)
+    clusters = cluster_session([rec(i, h) for i, h in enumerate(hashes)], radius=4)
+    assert [[m.name for m in c.members] for c in clusters] == [["0.png", "1.png"], ["2.png", "3.png"], ["4.png"]]
+    assert [c.representative.name for c in clusters] == ["1.png", "3.png", "4.png"]
+
+
+def test_frame_joins_nearest_cluster():
+    records = [rec(0, 0), rec(1, 0xFF), rec(2, 0x07), rec(3, 0xFE)]     # 0x07 is within 5 bits of both
+    clusters = cluster_session(records, radius=5)
+    assert [[m.name for m in c.members] for c in clusters] == [["0.png", "2.png"], ["1.png", "3.png"]]
+
+
+def test_cluster_directory_groups_near_duplicates(tmp_path):
+    write_frames(tmp_path, [1, 1, 2, 2, 1])
+    [session] = cluster_directory(str(tmp_path), source="scan", workers=1)
+    assert [len(c.members) for c in session] == [2, 3]
@@ -0,0 +1,162 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+from PIL import Image
+
+import frame_pack
+from frame_pack import (
+    FOOTER, MAGIC, PackReader, PackWriter, frame_exists, list_packs, make_ref, open_frame, read_frame,
+    remove_frame, split_ref,
+)
+
+MAIN_DIR = os.path.join(os.path.dirname(__file__), "..", "electron", "main")
+TS = 1_790_000_000.0
+
+
+def png(color, size=(8, 6)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def fill(tmp_path, n=3, close=True):
+    """Append *n* frames to a pack in *tmp_path*; returns their refs and bytes."""
+    writer = PackWriter(str(tmp_path))
+    frames = [(f"{TS + i:.5f}_before.png", TS + i, png((40 * i, 0, 0))) for i in range(n)]
+    refs = [writer.append(name, ts, data) for name, ts, data in frames]
+    if close:
+        writer.close()
+    else:
+        writer.sync()
+    return writer, refs, [data for _, _, data in frames]
+
+
+def only_pack(tmp_path):
+    [pack] = list_packs(str(tmp_path))
+    return pack
+
+
+@pytest.mark.parametrize("sealed", [True, False])
+def test_append_then_read_back(tmp_path, sealed):
+    writer, refs, blobs = fill(tmp_path, close=sealed)
+    with PackReader(only_pack(tmp_path)) as reader:
+        assert [bytes(reader.frame_bytes(i)) for i in reader.frames()] == blobs
+        assert reader.frames(TS + 1, TS + 2) == [1]
+    assert [read_frame(r) for r in refs] == blobs
+    with open(only_pack(tmp_path), "rb") as fh:
+        assert fh.read().endswith(b"PIDX") == sealed
+    writer.close()
+
+
+def test_reopen_cuts_torn_tail(tmp_path):
+    writer, _, blobs = fill(tmp_path, close=False)
+    pack = only_pack(tmp_path)
+    with open(pack, "ab") as fh:
+        fh.write(b"FRM1\x00\x10")        # a crash mid-record
+    with PackReader(pack) as reader:
+        assert len(reader) == 3
+    os.close(writer._fd)                 # the crashed writer never seals
+
+    writer = PackWriter(str(tmp_path))
+    writer.append(f"{TS + 3:.5f}_after.png", TS + 3, b"new")
+    writer.close()
+    with PackReader(pack) as reader:
+        assert [bytes(reader.frame_bytes(i)) for i in reader.frames()] == blobs + [b"new"]
+
+
+def test_reopen_sealed_pack_appends_and_reseals(tmp_path):
+    fill(tmp_path)
+    pack = only_pack(tmp_path)
+    size = os.path.getsize(pack)
+    writer = PackWriter(str(tmp_path))
+    writer.append(f"{TS + 3:.5f}_after.png", TS + 3, b"new")
+    writer.close()
+    with open(pack, "rb") as fh:
+        data = fh.read()
+    assert data.startswith(MAGIC) and data.endswith(b"PIDX")
+    assert len(data) > size
+    with PackReader(pack) as reader:
+        assert len(reader.frames()) == 4
+
+
+def test_missing_footer_is_read_by_walking_records(tmp_path):
+    _, _, blobs = fill(tmp_path)
+    pack = only_pack(tmp_path)
+    with open(pack, "r+b") as fh:
+        fh.truncate(os.path.getsize(pack) - FOOTER.size)   # footer gone, table left as junk
+    with PackReader(pack) as reader:
+        assert [bytes(reader.frame_bytes(i)) for i in reader.frames()] == blobs
+
+
+def test_cached_reader_follows_growing_pack(tmp_path):
+    writer = PackWriter(str(tmp_path))
+    for i in range(5):
+        ref = writer.append(f"{TS + i:.5f}_before.png", TS + i, bytes([i]) * 4)
+        assert read_frame(ref) == bytes([i]) * 4
+    pack = only_pack(tmp_path)
+    reader = frame_pack._readers[pack]
+    assert reader.refresh() == 0                 # nothing new: nothing rescanned
+    writer.close()
+    assert reader.refresh() == 0                 # the footer adds no records
+
+    writer = PackWriter(str(tmp_path))           # reopening cuts the footer off
+    ref = writer.append(f"{TS + 5:.5f}_before.png", TS + 5, b"late")
+    assert read_frame(ref) == b"late"
+    assert frame_pack._readers[pack] is reader
+    assert len(reader) == 6 and len(reader.frames()) == 6
+    writer.close()
+
+
+def test_remove_zero_fills_frame(tmp_path):
+    _, refs, blobs = fill(tmp_path)
+    remove_frame(refs[1])
+    assert not frame_exists(refs[1])
+    assert frame_exists(refs[0])
+    with open(only_pack(tmp_path), "rb") as fh:
+        data = fh.read()
+    assert blobs[1] not in data
+    assert blobs[0] in data and blobs[2] in data
+    with PackReader(only_pack(tmp_path)) as reader:
+        assert reader.frames() == [0, 2]
+        with pytest.raises(KeyError):
+            reader.frame_bytes(1)
+
+
+def test_open_frame_accepts_refs_and_paths(tmp_path):
+    _, refs, _ = fill(tmp_path)
+    assert split_ref(refs[0]) == (only_pack(tmp_path), f"{TS:.5f}_before.png")
+    with open_frame(refs[2]) as img:
+        assert img.size == (8, 6)
+        assert img.getpixel((0, 0)) == (80, 0, 0)
+    loose = tmp_path / "loose.png"
+    loose.write_bytes(png((0, 0, 255)))
+    with open_frame(str(loose)) as img:
+        assert img.getpixel((0, 0)) == (0, 0, 255)
+    with pytest.raises(FileNotFoundError):
+        read_frame(make_ref(only_pack(tmp_path), "missing.png"))
+
+
+def cli(*args):
+    proc = subprocess.run(
+        [sys.executable, "frame_pack.py", *args], cwd=MAIN_DIR, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout
+
+
+def test_cli_round_trip(tmp_path):
+    blobs = {f"{TS + i:.5f}_before.png": png((0, 30 * i, 0)) for i in range(4)}
+    for name, data in blobs.items():
+        (tmp_path / name).write_bytes(data)
+
+    assert cli("pack", str(tmp_path)) == "packed 4 frame(s)\n"
+    assert [p for p in os.listdir(tmp_path)] == [os.path.basename(only_pack(tmp_path))]
+    assert "4 live / 4 frames" in cli("ls", str(tmp_path))
+
+    assert cli("unpack", str(tmp_path)) == "unpacked 4 frame(s)\n"
+    assert list_packs(str(tmp_path)) == []
+    assert {name: (tmp_path / name).read_bytes() for name in os.listdir(tmp_path)} == blobs
+    assert os.path.getmtime(tmp_path / f"{TS:.5f}_before.png") == pytest.approx(TS)
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+import pytest
+
+import input_coalescer
+from input_coalescer import EventCoalescer
+
+
+class Clock:
+    """Stand-in for ``time.monotonic`` the test moves by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(input_coalescer, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def make(loop, interval=0.05):
+    """A coalescer with two monitors split at x=100; returns it and its delivery list."""
+    got = []
+    coalescer = EventCoalescer(loop, lambda *event: got.append(event), lambda x, y: 0 if x < 100 else 1, interval)
+    return coalescer, got
+
+
+def pump(loop, seconds=0.0):
+    loop.run_until_complete(asyncio.sleep(seconds))
+
+
+def test_moves_collapse_per_monitor_keeping_first_time(loop, clock):
+    coalescer, got = make(loop)
+    for i in range(5):
+        clock.now = 100.0 + i
+        coalescer.on_move(10 + i, 20)
+        coalescer.on_move(200 + i, 30)
+    pump(loop)
+    assert got == [(14, 20, "move", 100.0), (204, 30, "move", 100.0)]
+
+
+def test_pending_move_precedes_click_and_scroll(loop, clock):
+    coalescer, got = make(loop, interval=10.0)
+    coalescer.on_move(1, 1)
+    pump(loop)                                   # first move goes out at once
+    clock.now += 0.01
+    coalescer.on_move(2, 2)                      # held back for the interval
+    clock.now += 0.01
+    coalescer.on_click(3, 3, "left", True)
+    coalescer.on_click(3, 3, "left", False)      # releases are not events
+    clock.now += 0.01
+    coalescer.on_move(4, 4)
+    coalescer.on_scroll(5, 5, 0, -1)
+    pump(loop)
+    assert [(x, typ) for x, _, typ, _ in got] == [(1, "move"), (2, "move"), (3, "click"), (4, "move"), (5, "scroll")]
+    assert got[1][3] == pytest.approx(100.01)
+
+
+def test_at_most_one_wakeup_per_interval(loop, clock):
+    coalescer, got = make(loop, interval=0.05)
+    for i in range(100):
+        coalescer.on_move(i % 50, 0)
+    assert coalescer.wakeups == 1
+    pump(loop)
+    assert len(got) == 1
+
+    clock.now += 0.01
+    for i in range(100):
+        coalescer.on_move(i % 50, 0)
+    assert coalescer.wakeups == 2
+    pump(loop)
+    assert len(got) == 1                         # waits out the rest of the interval
+    pump(loop, 0.08)
+    assert got[-1] == (49, 0, "move", pytest.approx(100.01))
+    assert coalescer.wakeups == 2
+
+
+def test_counts_raw_and_delivered_from_listener_thread(loop):
+    coalescer, got = make(loop, interval=0.01)
+
+    def listener():
+        for i in range(2000):
+            coalescer.on_move(i % 300, 0)
+            if i % 500 == 0:
+                coalescer.on_click(i % 300, 0, "left", True)
+        coalescer.on_scroll(0, 0, 0, 1)
+
+    thread = threading.Thread(target=listener)
+    thread.start()
+    while thread.is_alive():
+        pump(loop, 0.005)
+    thread.join()
+    pump(loop, 0.05)
+
+    stats = coalescer.stats
+    assert stats["raw"] == {"move": 2000, "click": 4, "scroll": 1}
+    assert coalescer.raw_total() == 2005
+    assert stats["delivered"]["click"] == 4 and stats["delivered"]["scroll"] == 1
+    assert 0 < stats["delivered"]["move"] < 2000
+    assert sum(stats["delivered"].values()) == len(got)
+    assert [e[2] for e in got][-1] == "scroll"
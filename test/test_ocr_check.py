@@ -0,0 +1,15 @@
+from ocr_check import RoiConfig, _roi_boxes
+
+
+def test_roi_without_bounds_reads_top_of_frame():
+    assert _roi_boxes(1000, 500, RoiConfig(strip_frac=0.1)) == [(0, 0, 1000, 50)]
+
+
+def test_roi_reads_top_strip_of_each_window():
+    windows = [[0.5, 0.5, 1.0, 1.0], [0.0, 0.2, 0.5, 0.25]]
+    assert _roi_boxes(1000, 500, RoiConfig(strip_frac=0.1), windows) == [(0, 100, 500, 125), (500, 250, 1000, 300)]
+
+
+def test_roi_ignores_windows_off_the_frame():
+    roi = RoiConfig(strip_frac=0.1)
+    assert _roi_boxes(1000, 500, roi, [[0.0, 1.0, 1.0, 1.0]]) == [(0, 0, 1000, 50)]
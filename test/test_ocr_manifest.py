@@ -0,0 +1,136 @@
+import os
+
+import pytest
+from PIL import Image
+
+import ocr_check
+from domain_matcher import DomainMatcher
+from ocr_manifest import MANIFEST_NAME, OcrManifest, scan_images
+
+EXTENSIONS = {".png"}
+
+
+def frame_files(tmp_path):
+    return {f.name: f for f in scan_images(str(tmp_path), EXTENSIONS)}
+
+
+def write_frames(tmp_path, *names):
+    for i, name in enumerate(names):
+        Image.new("RGB", (4, 4), (i, 0, 0)).save(tmp_path / name)
+    return frame_files(tmp_path)
+
+
+def test_unchanged_frame_is_a_hit_across_reloads(tmp_path):
+    frame = write_frames(tmp_path, "a.png")["a.png"]
+    manifest = OcrManifest(str(tmp_path))
+    assert manifest.tokens_for(frame) is None
+    manifest.mark_cleared(frame, ["example.com"], "v1")
+    manifest.save()
+
+    manifest = OcrManifest(str(tmp_path))
+    assert len(manifest) == 1
+    assert manifest.tokens_for(frame_files(tmp_path)["a.png"]) == ["example.com"]
+    assert manifest.cleared_by(frame) == "v1"
+
+
+def test_changed_frame_is_invalidated(tmp_path):
+    frame = write_frames(tmp_path, "a.png")["a.png"]
+    manifest = OcrManifest(str(tmp_path))
+    manifest.mark_cleared(frame, [], "v1")
+
+    os.utime(frame.path, ns=(frame.mtime_ns, frame.mtime_ns + 1_000_000))
+    assert manifest.tokens_for(frame_files(tmp_path)["a.png"]) is None
+
+    Image.new("RGB", (40, 40)).save(frame.path)
+    os.utime(frame.path, ns=(frame.mtime_ns, frame.mtime_ns))   # same mtime, new size
+    assert manifest.tokens_for(frame_files(tmp_path)["a.png"]) is None
+
+
+def test_roi_entries_do_not_satisfy_full_lookups(tmp_path):
+    frame = write_frames(tmp_path, "a.png")["a.png"]
+    manifest = OcrManifest(str(tmp_path))
+    manifest.mark_cleared(frame, ["x.com"], "v1", "roi-unverified")
+    assert manifest.tokens_for(frame) is None
+    assert manifest.tokens_for(frame, "roi-unverified") == ["x.com"]
+    assert manifest.mode_of(frame) == "roi-unverified"
+
+
+def test_truncated_manifest_starts_empty_and_is_rewritten(tmp_path, capsys):
+    frame = write_frames(tmp_path, "a.png")["a.png"]
+    manifest = OcrManifest(str(tmp_path))
+    manifest.mark_cleared(frame, ["example.com"], "v1")
+    manifest.save()
+    path = tmp_path / MANIFEST_NAME
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 2])
+
+    manifest = OcrManifest(str(tmp_path))
+    assert "Ignoring unreadable OCR manifest" in capsys.readouterr().out
+    assert len(manifest) == 0 and manifest.tokens_for(frame) is None
+    manifest.mark_cleared(frame, [], "v2")
+    manifest.save()
+    assert OcrManifest(str(tmp_path)).cleared_by(frame) == "v2"
+
+
+def test_prune_and_forget(tmp_path):
+    frames = write_frames(tmp_path, "a.png", "b.png", "c.png")
+    manifest = OcrManifest(str(tmp_path))
+    for frame in frames.values():
+        manifest.mark_cleared(frame, [], "v1")
+    manifest.prune({"a.png", "b.png"})
+    manifest.forget("b.png")
+    manifest.save()
+    assert [n for n in frames if OcrManifest(str(tmp_path)).tokens_for(frames[n]) is not None] == ["a.png"]
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Replace OCR with a lookup in ``tokens``; ``calls`` lists every batch OCR'd."""
+    tokens, calls = {}, []
+
+    def iter_verdicts(paths, *args, **kwargs):
+        calls.append(sorted(os.path.basename(p) for p in paths))
+        for path in paths:
+            yield path, tokens[os.path.basename(path)], None, 16
+
+    monkeypatch.setattr(ocr_check, "_iter_verdicts", iter_verdicts)
+    return tokens, calls
+
+
+def use_domains(monkeypatch, *domains):
+    monkeypatch.setattr(ocr_check, "get_matcher", lambda: DomainMatcher(domains))
+
+
+def test_new_domain_list_rematches_stored_tokens_without_ocr(tmp_path, monkeypatch, fake_ocr):
+    tokens, calls = fake_ocr
+    write_frames(tmp_path, "a.png", "b.png")
+    tokens.update({"a.png": ["news.example.org"], "b.png": ["mybank.com"]})
+
+    use_domains(monkeypatch, "otherbank.com")
+    assert ocr_check.ocr_check(str(tmp_path)) == 0
+    assert calls == [["a.png", "b.png"]]
+
+    assert ocr_check.ocr_check(str(tmp_path)) == 0               # same list: nothing to do
+    assert calls == [["a.png", "b.png"], []]
+
+    use_domains(monkeypatch, "otherbank.com", "mybank.com")
+    assert ocr_check.ocr_check(str(tmp_path)) == 1
+    assert calls[-1] == []                                       # re-matched, not re-OCR'd
+    assert sorted(frame_files(tmp_path)) == ["a.png"]
+    manifest = OcrManifest(str(tmp_path))
+    assert len(manifest) == 1
+    assert manifest.cleared_by(frame_files(tmp_path)["a.png"]) == DomainMatcher(["otherbank.com", "mybank.com"]).version
+
+
+def test_changed_frame_is_ocrd_again(tmp_path, monkeypatch, fake_ocr):
+    tokens, calls = fake_ocr
+    write_frames(tmp_path, "a.png", "b.png")
+    tokens.update({"a.png": [], "b.png": []})
+    use_domains(monkeypatch, "mybank.com")
+    ocr_check.ocr_check(str(tmp_path))
+
+    Image.new("RGB", (8, 8)).save(tmp_path / "b.png")
+    tokens["b.png"] = ["mybank.com"]
+    assert ocr_check.ocr_check(str(tmp_path)) == 1
+    assert calls[-1] == ["b.png"]
+    assert sorted(frame_files(tmp_path)) == ["a.png"]
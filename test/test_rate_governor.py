@@ -0,0 +1,70 @@
+import pytest
+
+from rate_governor import RateGovernor
+
+QUIET = dict(change=0.0, input_rate=0.0, cpu=0.1)
+BUSY = dict(change=1.0, input_rate=100.0, cpu=0.1)
+
+
+def run(governor, ticks, **measurements):
+    return [governor.update(**measurements) for _ in range(ticks)][-1]
+
+
+def test_fps_stays_within_bounds():
+    governor = RateGovernor(min_fps=2, max_fps=15)
+    assert run(governor, 50, **BUSY).fps == pytest.approx(15)
+    assert max(d.fps for d in governor.decisions) <= 15
+    assert run(governor, 50, change=0.0, input_rate=0.0, cpu=50.0).fps == 2
+    assert min(d.fps for d in governor.decisions) >= 2
+
+    governor.reset(fps=100, debounce=-1)
+    assert (governor.fps, governor.debounce) == (15, 0.5)
+
+
+def test_cpu_over_budget_cuts_fps_at_once():
+    governor = RateGovernor(cpu_budget=0.5)
+    governor.reset(fps=12, debounce=1)
+    decision = governor.update(change=1.0, input_rate=100.0, cpu=1.0)
+    assert decision.throttled
+    assert decision.fps == pytest.approx(6)          # 12 * 0.5 / 1.0, unsmoothed
+
+    decision = governor.update(change=1.0, input_rate=100.0, cpu=0.4)
+    assert not decision.throttled
+    assert 6 < decision.fps < 15                     # recovers gradually
+
+
+def test_static_screen_decays_to_min_fps_and_max_debounce():
+    governor = RateGovernor(min_fps=2, max_fps=15, min_debounce=0.5, max_debounce=3)
+    governor.reset(fps=15, debounce=0.5)
+    fps = [governor.update(**QUIET).fps for _ in range(20)]
+    assert fps == sorted(fps, reverse=True)
+    assert governor.fps == pytest.approx(2, abs=1e-3)
+    assert governor.debounce == pytest.approx(3, abs=1e-3)
+
+
+def test_full_activity_rises_to_max_fps_and_min_debounce():
+    governor = RateGovernor(min_fps=2, max_fps=15, min_debounce=0.5, max_debounce=3, change_full=0.05, input_full=20)
+    fps = [governor.update(change=0.05, input_rate=0.0, cpu=0.1).fps for _ in range(20)]
+    assert fps == sorted(fps)
+    assert governor.fps == pytest.approx(15, abs=1e-3)
+    assert governor.debounce == pytest.approx(0.5, abs=1e-3)
+
+    governor.reset(fps=2, debounce=3)
+    run(governor, 20, change=0.0, input_rate=20.0, cpu=0.1)      # input alone is enough too
+    assert governor.fps == pytest.approx(15, abs=1e-3)
+
+
+def test_partial_activity_settles_in_between():
+    governor = RateGovernor(min_fps=2, max_fps=12, min_debounce=1, max_debounce=3)
+    run(governor, 40, change=0.025, input_rate=0.0, cpu=0.1)
+    assert governor.fps == pytest.approx(7)
+    assert governor.debounce == pytest.approx(2)
+
+
+def test_rejects_inverted_bounds():
+    with pytest.raises(ValueError):
+        RateGovernor(min_fps=10, max_fps=5)
+    with pytest.raises(ValueError):
+        RateGovernor(min_debounce=2, max_debounce=1)
+    with pytest.raises(ValueError):
+        RateGovernor(cpu_budget=0)
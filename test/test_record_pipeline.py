@@ -0,0 +1,234 @@
+import asyncio
+import os
+import time
+
+import pytest
+from PIL import Image
+
+import record
+from capture_backend import SyntheticBackend
+from capture_index import CaptureIndexReader
+from frame_encoder import FrameEncoder
+from title_filter import TitleFilter
+
+TWO_MONITORS = ((0, 0, 320, 200), (320, 0, 320, 200))
+
+
+class FastScreen(record.Screen):
+    _DEBOUNCE_SEC = 0.1
+
+
+class SlowAfterBackend(SyntheticBackend):
+    """Grabs take *delay* seconds once ``slow`` is set, like a loaded window server."""
+
+    def __init__(self, *args, delay=0.4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.slow = False
+
+    def grab(self, region):
+        if self.slow:
+            time.sleep(self.delay)
+        return super().grab(region)
+
+
+class SlowEncoder(FrameEncoder):
+    """Every encode takes *delay* seconds; ``peak`` is the most that ran at once."""
+
+    def __init__(self, delay=0.3, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.active = self.peak = 0
+
+    async def encode(self, frame, path):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return await super().encode(frame, path)
+        finally:
+            self.active -= 1
+
+
+def run_session(tmp_path, backend, script, **screen_options):
+    """Run a Screen on *backend*, drive it with ``script(backend)``, return (screen, files)."""
+    screen_options.setdefault("dedupe", None)
+    screen = FastScreen(str(tmp_path), backend=backend, **screen_options)
+
+    async def main():
+        screen.start()
+        await asyncio.sleep(0.2)        # let the ring fill
+        await first_frames(screen)
+        await script(backend)
+        await asyncio.sleep(0.3)        # last debounce
+        screen.stop()
+        await screen.wait()
+
+    asyncio.run(main())
+    return screen, sorted(f for f in os.listdir(tmp_path) if not f.startswith("."))
+
+
+async def first_frames(screen, timeout=5.0):
+    """Wait until every monitor has a frame in the ring; events before that are dropped."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ring = screen._ring
+        if ring is not None and screen._mons and all(ring.latest(i) for i in range(1, len(screen._mons) + 1)):
+            return
+        await asyncio.sleep(0.01)
+
+
+async def burst(backend, x, y, n=30):
+    for i in range(n):
+        backend.move(x + i % 5, y)
+        if i % 10 == 0:
+            backend.click(x, y)
+        if i % 7 == 0:
+            backend.scroll(x, y)
+        await asyncio.sleep(0.001)
+
+
+def test_burst_is_one_interaction(tmp_path):
+    async def script(b):
+        await burst(b, 10, 10)
+
+    screen, files = run_session(tmp_path, SyntheticBackend(displays=TWO_MONITORS), script)
+    assert screen.interaction_stats["opened"] == 1
+    assert screen.interaction_stats["flushed"] == 1
+    assert [f.rsplit("_", 1)[1] for f in files] == ["before.jpg", "after.jpg"]
+
+
+def test_monitor_switch_starts_new_interaction(tmp_path):
+    async def script(b):
+        b.click(10, 10)
+        await asyncio.sleep(0.02)
+        b.click(330, 10)
+
+    screen, files = run_session(tmp_path, SyntheticBackend(displays=TWO_MONITORS), script)
+    assert screen.interaction_stats["opened"] == 2
+    assert screen.interaction_stats["flushed"] == 2
+    assert len(files) == 4
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 4])
+def test_bursts_during_slow_flush_are_not_lost(tmp_path, max_in_flight):
+    async def script(b):
+        b.slow = True
+        for _ in range(3):
+            await burst(b, 10, 10, n=10)
+            await asyncio.sleep(0.15)   # debounce fires, flush stalls in the after-grab
+        await asyncio.sleep(3 * b.delay)
+
+    backend = SlowAfterBackend(displays=TWO_MONITORS)
+    screen, files = run_session(tmp_path, backend, script, max_in_flight=max_in_flight)
+    assert screen.interaction_stats["opened"] == 3
+    assert screen.interaction_stats["flushed"] == 3
+    assert len(files) == 6
+
+
+def test_same_monitor_writes_overlap(tmp_path):
+    async def script(b):
+        for _ in range(3):
+            b.click(10, 10)
+            await asyncio.sleep(0.15)   # debounce fires, the flush's writes stall in the encoder
+        await asyncio.sleep(0.5)
+
+    encoder = SlowEncoder()
+    screen, files = run_session(tmp_path, SyntheticBackend(displays=TWO_MONITORS), script, encoder=encoder)
+    assert screen.interaction_stats["flushed"] == 3
+    assert len(files) == 6
+    assert encoder.peak > 2             # writes of consecutive interactions ran together
+
+
+def test_dedupe_reference_chains_across_overlapping_flushes(tmp_path):
+    async def script(b):
+        for _ in range(2):
+            b.click(10, 10)
+            await asyncio.sleep(0.15)
+        await asyncio.sleep(0.3)
+
+    backend = SyntheticBackend(displays=TWO_MONITORS, frame_fn=lambda region, n: 7)
+    screen, files = run_session(tmp_path, backend, script, dedupe="drop", encoder=SlowEncoder(delay=0.2))
+    entries = CaptureIndexReader(str(tmp_path)).entries
+    assert len(files) == 1
+    assert [e.dedupe for e in entries] == [None, "drop", "drop", "drop"]
+    assert {e.path for e in entries} == set(files)
+    assert screen.dedupe_stats == {"saved": 1, "dropped": 3, "linked": 0}
+
+
+def test_before_frame_predates_after_frame(tmp_path):
+    # every grab is one grey level brighter than the previous one
+    backend = SyntheticBackend(displays=TWO_MONITORS, frame_fn=lambda region, n: min(250, 4 * n))
+
+    async def script(b):
+        b.click(10, 10)
+
+    _, files = run_session(tmp_path, backend, script)
+    before, after = (Image.open(tmp_path / f).getpixel((0, 0))[0] for f in files)
+    assert before < after
+
+
+def test_guarded_app_suppresses_interactions(tmp_path):
+    secret = {"kCGWindowOwnerName": "Secret", "kCGWindowBounds": {"X": 0, "Y": 0, "Width": 100, "Height": 100}}
+    backend = SyntheticBackend(displays=TWO_MONITORS, windows=[secret])
+
+    async def script(b):
+        await burst(b, 10, 10)
+
+    screen, files = run_session(tmp_path, backend, script, skip_when_visible="Secret")
+    assert screen.interaction_stats["opened"] == 0
+    assert files == []
+
+
+def test_index_records_windows_at_capture_time(tmp_path):
+    window = {"kCGWindowOwnerName": "Safari", "kCGWindowBounds": {"X": 0, "Y": 0, "Width": 100, "Height": 100}}
+    backend = SyntheticBackend(displays=TWO_MONITORS, windows=[window])
+
+    async def script(b):
+        await burst(b, 10, 10)
+        b.window_list = [dict(window, kCGWindowOwnerName="Slack")]   # switch apps before the after-grab
+
+    run_session(tmp_path, backend, script)
+    entries = CaptureIndexReader(str(tmp_path)).entries
+    assert [(e.tag, e.windows) for e in entries] == [("before", ["Safari"]), ("after", ["Slack"])]
+    # 100x100 points in the corner of a 320x200 monitor
+    assert [e.bounds for e in entries] == [[[0.0, 0.0, 0.3125, 0.5]]] * 2
+
+
+@pytest.mark.parametrize("title, rule", [
+    ("Accounts - secure.chase.com", "domain:chase.com"),
+    ("MyChart - Test Results", "title:MyChart"),
+])
+def test_sensitive_title_skips_grabs(tmp_path, title, rule):
+    bank = {"kCGWindowOwnerName": "Safari", "kCGWindowName": title,
+            "kCGWindowBounds": {"X": 0, "Y": 0, "Width": 100, "Height": 100}}
+    backend = SyntheticBackend(displays=TWO_MONITORS, windows=[bank])
+
+    async def script(b):
+        await burst(b, 10, 10)
+
+    screen, files = run_session(tmp_path, backend, script, title_filter=TitleFilter())
+    assert backend.grabs == 0
+    assert files == []
+    assert set(screen.skip_stats) == {rule}
+
+
+def test_title_filter_scope():
+    def win(title, layer=0):
+        return ({"kCGWindowOwnerName": "Safari", "kCGWindowName": title, "kCGWindowLayer": layer}, 1.0)
+
+    windows = [win("Menu bar", layer=25), win("Inbox"), win("Wells Fargo - Sign On")]
+    assert TitleFilter(scope="visible").check(windows) == "title:Wells Fargo"
+    assert TitleFilter(scope="front").check(windows) is None
+    assert TitleFilter().check([win("chase.community forum"), win("Vanguardian notes")]) is None
+
+
+@pytest.mark.parametrize("title, rule", [
+    ("Vanguard - Log on", "title:Vanguard"),
+    ("Accounts | Capital One", "title:Capital One"),
+    ("MyChart - Home", "title:MyChart"),
+    ("Medicare enrollment opens next week - The Times", None),
+    ("Notes on PayPal and Zelle fees - Google Docs", None),
+])
+def test_site_names_need_an_account_page(title, rule):
+    assert TitleFilter().match(title) == rule
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+MAIN_DIR = os.path.join(os.path.dirname(__file__), "..", "electron", "main")
+
+# Seconds a cold ``<entry point> --help`` may take, interpreter start included.
+# Override with RECORDR_STARTUP_BUDGET on slow machines.
+STARTUP_BUDGET = float(os.environ.get("RECORDR_STARTUP_BUDGET", "1.5"))
+
+# Loaded on first use only; importing any of them at startup costs seconds
+# (torch) or touches platform frameworks before the arguments are even parsed.
+LAZY_MODULES = ("easyocr", "torch", "numpy", "certifi", "mss", "Quartz", "pynput", "shapely")
+
+ENTRY_POINTS = ("record.py", "screenshot.py", "ocr_check.py")
+
+PROBE = """
+import json, runpy, sys
+sys.argv = [sys.argv[1], "--help"]
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps(sorted(m for m in {lazy!r} if m in sys.modules)))
+"""
+
+
+def _cold_start(script):
+    env = {k: v for k, v in os.environ.items() if k != "RECORDR_IMPORT_REPORT"}
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE.format(lazy=LAZY_MODULES), script],
+        cwd=MAIN_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    elapsed = time.perf_counter() - t0
+    assert proc.returncode == 0, proc.stderr
+    return elapsed, json.loads(proc.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("script", ENTRY_POINTS)
+def test_entry_point_defers_heavy_imports(script):
+    _, loaded = _cold_start(script)
+    assert loaded == []
+
+
+@pytest.mark.parametrize("script", ENTRY_POINTS)
+def test_entry_point_starts_within_budget(script):
+    _cold_start(script)                       # warm the OS file cache
+    elapsed = min(_cold_start(script)[0] for _ in range(3))
+    assert elapsed <= STARTUP_BUDGET, f"{script} --help took {elapsed:.2f}s (budget {STARTUP_BUDGET}s)"
+
+
+def test_import_report_lists_modules():
+    env = dict(os.environ, RECORDR_IMPORT_REPORT="1")
+    proc = subprocess.run(
+        [sys.executable, "screenshot.py", "--help"],
+        cwd=MAIN_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "import report" in proc.stderr
+    assert "frame_image" in proc.stderr
@@ -0,0 +1,45 @@
+import pytest
+
+from visibility import synthetic_stack, visible_ratios
+
+
+def test_single_window_fully_visible():
+    assert visible_ratios([(10, 20, 100, 50)]) == [1.0]
+
+
+def test_window_behind_identical_window_is_hidden():
+    assert visible_ratios([(0, 0, 100, 100), (0, 0, 100, 100)]) == [1.0, 0.0]
+
+
+def test_partial_overlap():
+    # back window is covered on its left half
+    assert visible_ratios([(0, 0, 50, 100), (0, 0, 100, 100)]) == [1.0, 0.5]
+
+
+def test_hole_between_two_front_windows():
+    front = [(0, 0, 40, 100), (60, 0, 40, 100)]
+    assert visible_ratios(front + [(0, 0, 100, 100)])[-1] == pytest.approx(0.2)
+
+
+def test_degenerate_rectangles():
+    assert visible_ratios([(0, 0, 0, 10), (0, 0, 10, -1), (0, 0, 10, 10)]) == [0.0, 0.0, 1.0]
+
+
+def test_empty_stack():
+    assert visible_ratios([]) == []
+
+
+def _brute_force(rects):
+    covered = set()
+    out = []
+    for x, y, w, h in rects:
+        cells = {(i, j) for i in range(x, x + w) for j in range(y, y + h)}
+        out.append(len(cells - covered) / len(cells) if cells else 0.0)
+        covered |= cells
+    return out
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_brute_force(seed):
+    rects = synthetic_stack(40, screen=(120, 80), seed=seed)
+    assert visible_ratios(rects) == pytest.approx(_brute_force(rects))